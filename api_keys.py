@@ -0,0 +1,276 @@
+"""
+네이버 검색 API 키 풀 — 애플리케이션 여러 개의 일일 할당량을 나눠 쓰기
+
+키 하나(애플리케이션 1개)의 하루 25,000회 한도가 추적 처리량의 상한이 되지 않도록
+설정 화면에서 키를 여러 개 등록해 두고 호출마다 남은 할당량 기준으로 골라 쓴다.
+- 용도(role)  : interactive(화면 요청) / background(자동·수동 추적) / any(둘 다)
+                화면 요청은 interactive → any → background 순, 추적은 background·any 키만 사용
+                (추적이 화면용 할당량을 다 써 버리지 않도록)
+- 선택        : 남은 할당량(daily_quota - 오늘 사용량)에 비례한 가중 무작위 → 키 수에 비례해 처리량 증가
+- 사용량      : 호출마다 프로세스 메모리에 쌓았다가 _FLUSH_SEC 간격으로 DB 에 합산 (KST 날짜 바뀌면 0부터)
+- 자동 제외   : 429 일일 한도 초과(errorCode 010) → 그날 소진 처리 / 429 초당 제한 → KEY_RATE_COOLDOWN_SEC
+                401·403 인증 오류 → KEY_AUTH_COOLDOWN_SEC 동안 쉼 (last_error 에 사유 기록)
+- 풀이 비어 있거나 모든 키가 쉬는 중이면 기존 단일 키(환경변수 NAVER_CLIENT_ID/SECRET → settings 테이블)
+"""
+import os
+import time
+import random
+import atexit
+import logging
+import threading
+from datetime import datetime, timedelta, timezone
+
+from db import get_conn
+
+logger = logging.getLogger(__name__)
+
+KEY_DAILY_QUOTA       = int(os.environ.get("KEY_DAILY_QUOTA", 25000))
+KEY_RATE_COOLDOWN_SEC = float(os.environ.get("KEY_RATE_COOLDOWN_SEC", 10))
+KEY_AUTH_COOLDOWN_SEC = float(os.environ.get("KEY_AUTH_COOLDOWN_SEC", 3600))
+
+ROLES = ("any", "interactive", "background")
+# 용도별로 쓸 수 있는 키 role (앞쪽 우선)
+_ROUTES = {
+    "interactive": (("interactive", "any"), ("background",)),
+    "background":  (("background", "any"),),
+}
+QUOTA_ERROR_CODE = "010"     # 네이버 오픈API 429 — 일일 호출 한도 초과 (012 = 초당 제한)
+
+_KST = timezone(timedelta(hours=9))
+_TS_FMT = "%Y-%m-%d %H:%M:%S"
+_FLUSH_SEC = 2.0             # 사용량 DB 기록 간격
+_CACHE_SEC = 2.0             # 키 목록 재조회 간격
+
+_lock = threading.Lock()
+_pending = {}                # credential id → 아직 DB 에 합산하지 않은 호출 수
+_cache = {"at": 0.0, "rows": None}
+_last_flush = 0.0
+
+
+def _today() -> str:
+    return datetime.now(_KST).strftime("%Y-%m-%d")
+
+
+def _now() -> str:
+    return datetime.now().strftime(_TS_FMT)
+
+
+# ────────────────────────────────────────────
+# 조회
+# ────────────────────────────────────────────
+def _rows(fresh: bool = False) -> list[dict]:
+    """등록된 키 전체 (used_today 는 오늘 날짜 기준, 이 프로세스의 미기록 사용량 포함)"""
+    now = time.monotonic()
+    rows = _cache["rows"]
+    if fresh or rows is None or now - _cache["at"] > _CACHE_SEC:
+        conn = get_conn()
+        try:
+            rows = [dict(r) for r in conn.execute("SELECT * FROM api_credentials ORDER BY id").fetchall()]
+        finally:
+            conn.close()
+        today = _today()
+        for r in rows:
+            if r["usage_date"] != today:
+                r["used_today"] = 0
+        _cache.update(at=now, rows=rows)
+    return [{**r, "used_today": r["used_today"] + _pending.get(r["id"], 0)} for r in rows]
+
+
+def _state(r: dict) -> str:
+    if not r["enabled"]:
+        return "disabled"
+    if r["used_today"] >= r["daily_quota"]:
+        return "exhausted"
+    if (r["cooldown_until"] or 0) > time.time():
+        return "cooldown"
+    return "active"
+
+
+def pick(purpose: str = "interactive", exclude=()) -> dict | None:
+    """용도에 맞는 사용 가능한 키 하나 (남은 할당량 비례 가중 무작위) / 없으면 None"""
+    try:
+        rows = _rows()
+    except Exception as e:                # 테이블 없음 등 → 단일 키로
+        logger.debug(f"[ApiKeys] 풀 조회 실패: {e}")
+        return None
+    for roles in _ROUTES.get(purpose, _ROUTES["interactive"]):
+        cands = [r for r in rows if r["role"] in roles and r["client_id"] not in exclude
+                 and _state(r) == "active"]
+        if cands:
+            return random.choices(cands, weights=[r["daily_quota"] - r["used_today"] for r in cands])[0]
+    return None
+
+
+def legacy_keys() -> tuple[str, str]:
+    """기존 단일 키 — 환경변수 NAVER_CLIENT_ID/SECRET → 없으면 settings 테이블"""
+    env_id     = os.environ.get("NAVER_CLIENT_ID", "")
+    env_secret = os.environ.get("NAVER_CLIENT_SECRET", "")
+    if env_id and env_secret:
+        return env_id, env_secret
+    conn = get_conn()
+    rows = {r["key"]: r["value"] for r in
+            conn.execute("SELECT key,value FROM settings WHERE key IN ('client_id','client_secret')").fetchall()}
+    conn.close()
+    return rows.get("client_id", ""), rows.get("client_secret", "")
+
+
+def get_api_keys(purpose: str = "interactive") -> tuple[str, str]:
+    """(client_id, client_secret) — 풀에서 용도에 맞는 키, 없으면 기존 단일 키"""
+    cred = pick(purpose)
+    if cred:
+        return cred["client_id"], cred["client_secret"]
+    return legacy_keys()
+
+
+def route(client_id: str, client_secret: str) -> tuple[str, str]:
+    """호출 직전 키 확인 — 풀의 키가 소진/쉬는 중이면 같은 용도의 다른 키로 교체 (풀 밖의 키는 그대로)"""
+    try:
+        row = next((r for r in _rows() if r["client_id"] == client_id), None)
+    except Exception:
+        return client_id, client_secret
+    if row is None or _state(row) == "active":
+        return client_id, client_secret
+    alt = pick("interactive" if row["role"] == "interactive" else "background", exclude=(client_id,))
+    return (alt["client_id"], alt["client_secret"]) if alt else (client_id, client_secret)
+
+
+def pool_size() -> int:
+    try:
+        return sum(1 for r in _rows() if r["enabled"])
+    except Exception:
+        return 0
+
+
+# ────────────────────────────────────────────
+# 사용량 / 실패 기록
+# ────────────────────────────────────────────
+def record(client_id: str, kind: str | None = None, error_code: str | None = None):
+    """API 호출 1회 기록 (kind: None = 성공, rate_limit / auth 면 해당 키를 잠시 제외)"""
+    try:
+        row = next((r for r in _rows() if r["client_id"] == client_id), None)
+    except Exception:
+        return
+    if row is None:
+        return
+    with _lock:
+        _pending[row["id"]] = _pending.get(row["id"], 0) + 1
+    if kind == "rate_limit" and error_code == QUOTA_ERROR_CODE:
+        _mark(row, "일일 한도 초과", exhausted=True)
+    elif kind == "rate_limit":
+        _mark(row, "초당 호출 제한 (429)", cooldown=KEY_RATE_COOLDOWN_SEC)
+    elif kind == "auth":
+        _mark(row, "인증 실패 (401/403) — 키를 확인하세요", cooldown=KEY_AUTH_COOLDOWN_SEC)
+    if time.monotonic() - _last_flush > _FLUSH_SEC:
+        flush()
+
+
+def _mark(row: dict, reason: str, cooldown: float = 0, exhausted: bool = False):
+    conn = get_conn()
+    try:
+        if exhausted:
+            conn.execute("""
+                UPDATE api_credentials SET used_today = MAX(CASE WHEN usage_date = ? THEN used_today ELSE 0 END,
+                                                            daily_quota),
+                       usage_date = ?, last_error = ? WHERE id = ?
+            """, (_today(), _today(), f"{_now()} {reason}", row["id"]))
+        else:
+            conn.execute("UPDATE api_credentials SET cooldown_until = ?, last_error = ? WHERE id = ?",
+                         (time.time() + cooldown, f"{_now()} {reason}", row["id"]))
+        conn.commit()
+    finally:
+        conn.close()
+    _cache["rows"] = None
+    logger.warning(f"[ApiKeys] '{row['label'] or row['client_id'][:6]}' 제외 — {reason}"
+                   + ("" if exhausted else f" ({cooldown:.0f}초)"))
+
+
+def flush():
+    """미기록 사용량을 DB 에 합산"""
+    global _last_flush
+    with _lock:
+        pending = {k: v for k, v in _pending.items() if v}
+        _pending.clear()
+        _last_flush = time.monotonic()
+    if not pending:
+        return
+    today, now = _today(), _now()
+    conn = get_conn()
+    try:
+        conn.executemany("""
+            UPDATE api_credentials SET
+                used_today   = CASE WHEN usage_date = ? THEN used_today + ? ELSE ? END,
+                usage_date   = ?, last_used_at = ?
+            WHERE id = ?
+        """, [(today, n, n, today, now, cid) for cid, n in pending.items()])
+        conn.commit()
+    except Exception as e:
+        logger.warning(f"[ApiKeys] 사용량 기록 실패: {e}")
+        with _lock:
+            for cid, n in pending.items():
+                _pending[cid] = _pending.get(cid, 0) + n
+        return
+    finally:
+        conn.close()
+    _cache["rows"] = None
+
+
+atexit.register(lambda: _pending and flush())
+
+
+# ────────────────────────────────────────────
+# 설정 화면
+# ────────────────────────────────────────────
+def status() -> list[dict]:
+    """설정 화면 / API 응답용 — 비밀키는 앞 4자리만"""
+    out = []
+    for r in _rows(fresh=True):
+        state = _state(r)
+        out.append({
+            "id": r["id"], "label": r["label"] or "", "client_id": r["client_id"],
+            "secret_hint": (r["client_secret"] or "")[:4] + "…", "role": r["role"],
+            "daily_quota": r["daily_quota"], "used_today": r["used_today"],
+            "remaining": max(0, r["daily_quota"] - r["used_today"]), "enabled": bool(r["enabled"]),
+            "state": state,
+            "cooldown_sec": max(0, round((r["cooldown_until"] or 0) - time.time())) if state == "cooldown" else 0,
+            "last_error": r["last_error"] or "", "last_used_at": r["last_used_at"] or "",
+        })
+    return out
+
+
+def add(label: str, client_id: str, client_secret: str, role: str = "any",
+        daily_quota: int = KEY_DAILY_QUOTA):
+    """키 등록 (같은 Client ID 는 비밀키 / 용도 / 한도만 갱신) — 잘못된 값은 ValueError"""
+    if not client_id or not client_secret:
+        raise ValueError("Client ID 와 Client Secret 을 모두 입력하세요.")
+    if role not in ROLES:
+        raise ValueError(f"알 수 없는 용도: {role}")
+    if daily_quota <= 0:
+        raise ValueError("일일 한도는 1 이상이어야 합니다.")
+    conn = get_conn()
+    conn.execute("""
+        INSERT INTO api_credentials (label, client_id, client_secret, role, daily_quota) VALUES (?,?,?,?,?)
+        ON CONFLICT(client_id) DO UPDATE SET label = excluded.label, client_secret = excluded.client_secret,
+            role = excluded.role, daily_quota = excluded.daily_quota, enabled = 1,
+            cooldown_until = 0, last_error = NULL
+    """, (label, client_id, client_secret, role, daily_quota))
+    conn.commit()
+    conn.close()
+    _cache["rows"] = None
+
+
+def set_enabled(cred_id: int, enabled: bool):
+    """사용/중지 전환 — 다시 켜면 쉬는 시간과 오류 기록도 초기화"""
+    conn = get_conn()
+    conn.execute("UPDATE api_credentials SET enabled = ?, cooldown_until = 0, last_error = NULL WHERE id = ?",
+                 (1 if enabled else 0, cred_id))
+    conn.commit()
+    conn.close()
+    _cache["rows"] = None
+
+
+def remove(cred_id: int):
+    conn = get_conn()
+    conn.execute("DELETE FROM api_credentials WHERE id = ?", (cred_id,))
+    conn.commit()
+    conn.close()
+    _cache["rows"] = None
@@ -5,11 +5,32 @@ Flask 웹 애플리케이션 v6 - 다중 광고주 탭 UI  # redeploy-trigger
 - 모든 버튼 AJAX 동작
 - 매일 오전 11시 자동 순위 추적
 """
-from flask import Flask, render_template, request, jsonify, redirect, url_for, flash
-import threading, logging, os, re
-from datetime import datetime
+from flask import (Flask, Response, render_template, request, jsonify, redirect, url_for, flash,
+                   stream_with_context, g, template_rendered, before_render_template)
+import threading, logging, os, re, json, time
+import requests
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from urllib.parse import quote
+from datetime import datetime, timedelta
 from db import init_db, get_conn
-from engine import parse_product_info, track_client, search_shopping
+from engine import parse_product_info, search_shopping, MatchIndex, decode_items
+from tracking import run_all_tracking
+from api_keys import get_api_keys
+import naver_http
+import place_parser
+import meta_cache
+import shop_cache
+import singleflight
+import api_keys
+import bulk_import
+import jobs
+import track_runs
+import leader
+import metrics
+import profiling
+import track_schedule
+import check_policy
+from place_parser import is_spot_category
 
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.cron import CronTrigger
@@ -20,65 +41,6 @@ logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
 
-# ──────────────────────────────────────────────────────────────────────────────
-# 네이버 플레이스 "주변 > 명소" 카테고리 화이트리스트 (v2 - 누락 카테고리 보완)
-# 실제 네이버 TripSummary category 값 기준으로 필터링
-# ──────────────────────────────────────────────────────────────────────────────
-SPOT_WHITELIST = {
-    # 공원류
-    "근린공원", "자연공원", "도시공원", "체육공원", "소공원", "어린이공원",
-    "문화공원", "역사공원", "수변공원", "생태공원", "국립공원", "도립공원",
-    "도시,테마공원", "테마공원",
-    # 광장·산책·체험
-    "광장", "산책로", "체험마을", "농어촌체험마을",
-    # 문화시설
-    "미술관", "박물관", "갤러리", "갤러리,화랑", "갤러리·화랑",
-    "전시관", "전시장", "공연장", "콘서트홀", "아트센터", "아트홀",
-    "복합문화공간", "문화센터", "문화회관", "시민회관",
-    "도서관", "기념관", "이벤트홀",
-    # 역사·유적·유산
-    "사찰", "절", "성당", "교회", "전통사찰",
-    "세계문화유산", "유적지", "문화재", "역사유적지", "사적지",
-    "향교", "서원", "궁궐", "왕릉",
-    "국가유산", "국가문화유산", "국가문화재", "천연기념물", "사적",
-    # 종교시설 (관광명소로서)
-    "천주교", "기독교", "개신교", "불교", "원불교",
-    # 지역명소·관광
-    "지역명소", "관광명소", "랜드마크", "관광안내소", "관광지",
-    # 자연
-    "산", "계곡", "폭포", "해수욕장", "강", "호수", "저수지", "연못",
-    "수목원", "식물원", "수족관", "동물원", "자연보호구역", "생태관",
-    "섬", "갯벌", "습지", "온천",
-    # 테마·체험
-    "테마파크", "워터파크", "아쿠아리움", "과학관", "천문대", "어린이과학관",
-    # 기타 명소
-    "등대", "전망대", "케이블카", "모노레일",
-}
-
-SPOT_KEYWORDS = [
-    "공원", "미술관", "박물관", "갤러리", "공연장", "전시",
-    "문화센터", "문화회관", "도서관", "기념관",
-    "유산", "유적", "문화재", "사찰", "향교", "궁궐", "왕릉",
-    "수목원", "식물원", "동물원",
-    "테마파크", "워터파크", "아쿠아리움", "과학관", "천문대",
-    "명소", "관광", "랜드마크", "이벤트홀",
-    "체험마을", "전망대",
-]
-
-def is_spot_category(category: str) -> bool:
-    """네이버 '주변 > 명소' 탭에 표시되는 카테고리인지 판별 (v2)"""
-    if not category:
-        return False
-    # 콤마/중점으로 분리된 복합 카테고리 처리 (예: "절,사찰", "호수,연못,저수지")
-    parts = [p.strip() for p in category.replace("·", ",").split(",")]
-    for part in parts:
-        if part in SPOT_WHITELIST:
-            return True
-        for kw in SPOT_KEYWORDS:
-            if kw in part:
-                return True
-    return False
-
 app.secret_key = os.environ.get("SECRET_KEY", "naver_rank_agency_2025")
 
 # ── 캐시 방지: HTML 페이지는 항상 최신 버전 서빙 ──
@@ -90,22 +52,142 @@ def no_cache(response):
         response.headers["Expires"]       = "0"
     return response
 
-tracking_status = {}
-global_tracking = {"running": False, "last_run": None}
+
+# ── 라우트 처리 시간 지표 (/metrics) ──
+@app.before_request
+def _metrics_start():
+    g.metrics_t0 = time.perf_counter()
+
+
+@app.after_request
+def _metrics_observe(response):
+    t0 = g.pop("metrics_t0", None)
+    if t0 is not None:
+        route = request.url_rule.rule if request.url_rule else "<unmatched>"
+        metrics.ROUTE_SECONDS.observe(time.perf_counter() - t0, method=request.method,
+                                      route=route, status=str(response.status_code))
+    return response
+
+
+# ── 요청 프로파일링 (PROFILE_REQUESTS=1 일 때만, profiling.py) ──
+@app.before_request
+def _profile_start():
+    if profiling.ENABLED:
+        g.profile = profiling.begin(request.method, request.full_path.rstrip("?"),
+                                    force=request.args.get("_profile") == "1")
+
+
+@app.after_request
+def _profile_end(response):
+    rec = g.pop("profile", None)
+    if rec is not None:
+        route = request.url_rule.rule if request.url_rule else "<unmatched>"
+        total_ms, saved = profiling.end(rec, route, response.status_code)
+        response.headers["Server-Timing"] = profiling.server_timing(rec, total_ms)
+        if saved:
+            response.headers["X-Profile-Id"] = saved
+            logger.info(f"[Profile] {request.method} {route} {total_ms:.0f}ms → /debug/profiles/{saved}")
+    return response
+
+
+@template_rendered.connect_via(app)
+def _profile_render_done(sender, template, context, **extra):
+    t0 = g.pop("render_t0", None) if profiling.ENABLED else None
+    if t0 is not None:
+        profiling.add("render", time.perf_counter() - t0)
+
+
+@before_render_template.connect_via(app)
+def _profile_render_start(sender, template, context, **extra):
+    if profiling.ENABLED:
+        g.render_t0 = time.perf_counter()
+
+
+@app.route("/debug/profiles")
+def debug_profiles():
+    """저장된 느린 요청 프로파일 목록 (PROFILE_REQUESTS=1 일 때만)"""
+    if not profiling.ENABLED:
+        return jsonify({"error": "PROFILE_REQUESTS=1 로 실행해야 합니다."}), 404
+    return render_template("profiles.html", profiles=profiling.list_profiles(), profile=None,
+                           slow_ms=profiling.PROFILE_SLOW_MS, categories=profiling.CATEGORIES)
+
+
+@app.route("/debug/profiles/<profile_id>")
+def debug_profile(profile_id):
+    """프로파일 상세 — ?format=collapsed 면 collapsed stack 텍스트 (speedscope / flamegraph.pl)"""
+    if not profiling.ENABLED:
+        return jsonify({"error": "PROFILE_REQUESTS=1 로 실행해야 합니다."}), 404
+    prof = profiling.load(profile_id)
+    if not prof:
+        return jsonify({"error": "프로파일이 없습니다."}), 404
+    if request.args.get("format") == "collapsed":
+        body = "".join(f"{stack} {n}\n" for stack, n in prof["samples"].items())
+        return Response(body, mimetype="text/plain",
+                        headers={"Content-Disposition": f"attachment; filename={profile_id}.collapsed.txt"})
+    if request.args.get("format") == "json":
+        return jsonify(prof)
+    return render_template("profiles.html", profile=prof, profiles=None,
+                           top=profiling.top_functions(prof["samples"]),
+                           stacks=list(prof["samples"].items())[:30],
+                           categories=profiling.CATEGORIES)
+
+
+@app.route("/metrics")
+def metrics_endpoint():
+    """Prometheus 지표 — 모든 gunicorn 워커 합산 (metrics.py)"""
+    return Response(metrics.render(), mimetype="text/plain; version=0.0.4; charset=utf-8")
+
 
 # ────────────────────────────────────────────
 # 공통 헬퍼
 # ────────────────────────────────────────────
-def get_api_keys():
-    env_id     = os.environ.get("NAVER_CLIENT_ID", "")
-    env_secret = os.environ.get("NAVER_CLIENT_SECRET", "")
-    if env_id and env_secret:
-        return env_id, env_secret
-    conn = get_conn()
-    rows = {r["key"]: r["value"] for r in
-            conn.execute("SELECT key,value FROM settings WHERE key IN ('client_id','client_secret')").fetchall()}
-    conn.close()
-    return rows.get("client_id", ""), rows.get("client_secret", "")
+def _want_refresh():
+    """?refresh=1 → 캐시 무시하고 재조회"""
+    return request.args.get("refresh", "").lower() in ("1", "true", "yes")
+
+
+# 스트리밍 응답에서 결과 없이 이만큼 지나면 ping 이벤트 전송 (프록시 유휴 연결 끊김 방지)
+STREAM_PING_SEC = 15
+
+
+def _iter_concurrent(fn, items, workers):
+    """items 를 병렬로 fn 처리 → 끝나는 순서대로 (인덱스, 결과) yield
+
+    STREAM_PING_SEC 동안 끝난 작업이 없으면 (None, None) 을 yield 한다.
+    제너레이터가 중간에 닫히면(클라이언트 연결 끊김) 아직 시작 안 한 작업은 취소.
+    """
+    if not items:
+        return
+    ex = ThreadPoolExecutor(max_workers=min(workers, len(items)))
+    try:
+        pending = {ex.submit(profiling.bind(fn), item): i for i, item in enumerate(items)}
+        while pending:
+            done, _ = wait(pending, timeout=STREAM_PING_SEC, return_when=FIRST_COMPLETED)
+            if not done:
+                yield None, None
+            for f in done:
+                yield pending.pop(f), f.result()
+    finally:
+        ex.shutdown(wait=False, cancel_futures=True)
+
+
+def _stream_response(events):
+    """(type, payload) 이벤트 → NDJSON(기본) 또는 SSE 스트리밍 응답
+
+    ?format=sse 또는 Accept: text/event-stream 이면 SSE("event: type / data: json"),
+    아니면 한 줄에 {"type": ..., ...} 하나씩.
+    """
+    sse = (request.args.get("format") == "sse"
+           or "text/event-stream" in request.headers.get("Accept", ""))
+
+    def gen():
+        for kind, payload in events:
+            body = json.dumps({"type": kind, **payload}, ensure_ascii=False)
+            yield f"event: {kind}\ndata: {body}\n\n" if sse else body + "\n"
+
+    return Response(stream_with_context(gen()),
+                    mimetype="text/event-stream" if sse else "application/x-ndjson",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
 
 
 def get_client_data(cid):
@@ -136,6 +218,7 @@ def get_client_data(cid):
                 WHERE product_id = p.product_id
                   AND client_id  = p.client_id
                   AND keyword    = k.keyword
+                  AND status     = 'ok'           -- 확인 실패(API 오류)는 최신 순위로 보지 않음
             )
         )
         WHERE p.client_id=?
@@ -170,76 +253,157 @@ def get_client_data(cid):
 
 
 # ────────────────────────────────────────────
-# 전체 추적
+# 전체 추적 — 실행 로직은 tracking.py (CLI main.py 와 공용)
 # ────────────────────────────────────────────
-def run_all_tracking(source="manual"):
-    if global_tracking["running"]:
+def scheduled_job():
+    if track_schedule.get_config()["mode"] != "burst":
         return
-    api_id, api_secret = get_api_keys()
-    if not api_id:
-        logger.warning("[추적] API 키 미설정")
+    # 리더 교체 직후 이전 리더와 같은 회차를 다시 실행하지 않도록 날짜 단위로 실행권 확인
+    slot = datetime.now(KST).strftime("%Y-%m-%d")
+    if not leader.claim_slot("daily_track", slot):
+        logger.info(f"⏰ 자동 스케줄 {slot} 회차는 이미 실행됨 — 건너뜀")
         return
+    logger.info("⏰ 자동 스케줄 실행")
+    threading.Thread(target=lambda: run_all_tracking("schedule"), daemon=True).start()
 
+
+def _schedule_units():
+    """window 모드 작업 단위 — 광고주별 {cid, name, cadence, weight(상품×키워드 조합 수)}"""
     conn = get_conn()
-    clients = conn.execute("SELECT id,name FROM clients").fetchall()
+    rows = conn.execute("""
+        SELECT c.id, c.name, COALESCE(c.track_cadence, 'daily') AS cadence,
+               (SELECT COUNT(*) FROM products p WHERE p.client_id=c.id) *
+               (SELECT COUNT(*) FROM keywords k WHERE k.client_id=c.id) AS weight
+        FROM clients c
+    """).fetchall()
     conn.close()
-    if not clients:
+    return [{"cid": r["id"], "name": r["name"], "cadence": r["cadence"], "weight": r["weight"]}
+            for r in rows if r["weight"]]
+
+
+def scheduled_window_tick():
+    """window 모드 — 1분마다 시작 시각이 지난 광고주 작업을 찾아 순서대로 추적
+
+    스케줄러 스레드에서 동기 실행 (max_instances=1) 이라 이전 tick 이 끝나기 전엔 다음 tick 이 돌지 않는다.
+    """
+    cfg = track_schedule.get_config()
+    if cfg["mode"] != "window" or track_runs.status()["running"]:
+        return
+    due = track_schedule.due_units(datetime.now(KST), _schedule_units(), cfg)
+    claimed = [u for u in due if leader.claim_slot(track_schedule.unit_job_id(u["cid"]), u["slot"])]
+    if claimed:
+        logger.info(f"⏰ 분산 스케줄 실행 — {', '.join(u['name'] for u in claimed)}")
+        run_all_tracking("window", client_ids=[u["cid"] for u in claimed])
         return
 
-    global_tracking["running"] = True
-    logger.info(f"[추적 시작] {source} | {len(clients)}개 광고주")
-    try:
-        for cl in clients:
-            cid = cl["id"]
-            conn2 = get_conn()
-            prods = [dict(r) for r in conn2.execute(
-                "SELECT product_id,catalog_id,url_product_id,mall_name,product_name FROM products WHERE client_id=?", (cid,)
-            ).fetchall()]
-            kws = [r["keyword"] for r in conn2.execute(
-                "SELECT keyword FROM keywords WHERE client_id=?", (cid,)
-            ).fetchall()]
-            conn2.close()
-            if not prods or not kws:
-                continue
-            tracking_status[cid] = "running"
-            try:
-                results = track_client(api_id, api_secret, cid, prods, kws, max_pages=10)
-                conn3 = get_conn()
-                for r in results:
-                    conn3.execute("""
-                        INSERT INTO rank_history
-                        (client_id,product_id,product_name,keyword,rank,
-                         lprice,mall_name,product_type,matched_id,checked_at)
-                        VALUES (?,?,?,?,?,?,?,?,?,?)
-                    """, (r["client_id"], r["product_id"], r["product_name"],
-                          r["keyword"], r["rank"], r.get("lprice"), r.get("mall_name"),
-                          r.get("product_type"), r.get("matched_id"), r["checked_at"]))
-                conn3.commit()
-                conn3.close()
-                tracking_status[cid] = "done"
-                logger.info(f"  ✅ {cl['name']} 완료 ({len(results)}건)")
-            except Exception as e:
-                tracking_status[cid] = f"error:{e}"
-                logger.error(f"  ❌ {cl['name']} 오류: {e}")
-        global_tracking["last_run"] = datetime.now().strftime("%Y-%m-%d %H:%M")
-    finally:
-        global_tracking["running"] = False
+    # 할 일이 없는 tick: 슬롯 중간을 지났으면 daily 광고주의 변동 큰 조합만 한 번 더 (hot pass)
+    now = datetime.now(KST)
+    slot = track_schedule.current_slot(now, cfg)
+    if not check_policy.ADAPTIVE or not slot or now < slot[0] + (slot[1] - slot[0]) / 2:
+        return
+    daily_ids = [u["cid"] for u in _schedule_units() if u["cadence"] != "hourly"]
+    if daily_ids and leader.claim_slot("track:hot", f"{now:%Y-%m-%d} {slot[0]:%H:%M}"):
+        run_all_tracking("hot", client_ids=daily_ids, hot=True)
 
 
-def scheduled_job():
-    logger.info("⏰ 자동 스케줄 실행")
-    threading.Thread(target=lambda: run_all_tracking("schedule"), daemon=True).start()
+def next_schedule_run():
+    """대시보드 표시용 다음 자동 추적 시각 ("MM/DD HH:MM" / "-")"""
+    if track_schedule.get_config()["mode"] == "window":
+        nxt = track_schedule.next_due(datetime.now(KST), _schedule_units(), track_schedule.get_config())
+    else:
+        job = scheduler.get_job("daily_track") if scheduler else None
+        nxt = job.next_run_time if job else None
+    return nxt.astimezone(KST).strftime("%m/%d %H:%M") if nxt else "-"
 
 
 # ────────────────────────────────────────────
-# APScheduler
+# 앱 기동 — create_app() 은 gunicorn --preload 마스터(fork 전)에서 불려도 안전하도록
+# 스레드를 만들지 않고, 스케줄러 / 리더 선출 / 워밍업은 fork 이후 start_background() 에서 시작
 # ────────────────────────────────────────────
 KST = pytz.timezone("Asia/Seoul")
-scheduler = BackgroundScheduler(timezone=KST)
-scheduler.add_job(scheduled_job, CronTrigger(hour=11, minute=0, timezone=KST),
-                  id="daily_track", replace_existing=True)
-scheduler.start()
-logger.info("⏰ 스케줄러 시작 — 매일 KST 11:00")
+scheduler = None          # start_background() 에서 워커 프로세스마다 생성
+scheduler_leader = None
+
+# 워밍업 — background: fork 후 워커마다 백그라운드 스레드 / preload: create_app() 에서 동기 (fork 전, 메모리 공유)
+# off: 하지 않음 (첫 요청이 import 비용을 떠안음)
+APP_WARMUP = os.environ.get("APP_WARMUP", "background")
+WARMUP_MODULES = ("openpyxl", "openpyxl.styles", "openpyxl.utils", "bs4", "xlsx_safe")
+WARMUP_TEMPLATES = ("base.html", "index.html", "client_detail.html", "settings.html")
+
+_app_ready = False
+_background_pid = None
+_background_lock = threading.Lock()
+
+
+def warm_up():
+    """첫 요청이 무거운 모듈 import / 템플릿 컴파일 / DB 파일 첫 읽기를 떠안지 않도록 미리 수행"""
+    import importlib
+    t0 = time.perf_counter()
+    for name in WARMUP_MODULES:
+        try:
+            importlib.import_module(name)
+        except ImportError as e:
+            logger.warning(f"[워밍업] {name} import 실패: {e}")
+    for name in WARMUP_TEMPLATES:
+        app.jinja_env.get_template(name)
+    conn = get_conn()
+    conn.execute("SELECT COUNT(*) FROM clients").fetchone()
+    conn.close()
+    logger.info(f"[워밍업] 완료 {(time.perf_counter() - t0) * 1000:.0f}ms")
+
+
+def create_app():
+    """WSGI 앱 팩토리 — DB 스키마 준비 (+ APP_WARMUP=preload 면 워밍업). 여러 번 불려도 1번만 수행
+
+    gunicorn.conf.py 는 preload_app 으로 마스터에서 이 함수를 한 번 부르고,
+    워커마다 post_worker_init 에서 start_background() 를 부른다.
+    """
+    global _app_ready
+    if _app_ready:
+        return app
+    metrics.defer_threads()   # fork 전 마스터에서 지표 flush 스레드가 생기지 않도록
+    with app.app_context():
+        init_db()   # 리더 임대 테이블이 필요하므로 스케줄러보다 먼저
+    if APP_WARMUP == "preload":
+        warm_up()
+    _app_ready = True
+    return app
+
+
+def start_background():
+    """워커 프로세스 백그라운드 작업 — APScheduler(paused) + 리더 선출(leader.py, 리더만 resume) + 워밍업
+
+    프로세스당 1번 (fork 된 워커는 pid 가 달라 다시 시작). gunicorn.conf.py 없이 띄워도
+    첫 요청의 _ensure_background 가 대신 호출한다.
+    """
+    global scheduler, scheduler_leader, _background_pid
+    with _background_lock:
+        if _background_pid == os.getpid():
+            return
+        _background_pid = os.getpid()
+    create_app()
+    metrics.defer_threads(False)
+
+    scheduler = BackgroundScheduler(timezone=KST)
+    scheduler.add_job(scheduled_job, CronTrigger(hour=11, minute=0, timezone=KST),
+                      id="daily_track", replace_existing=True,
+                      misfire_grace_time=600, coalesce=True)   # 리더 교체 중 놓친 회차도 10분 안이면 실행
+    scheduler.add_job(scheduled_window_tick, CronTrigger(minute="*", timezone=KST),
+                      id="window_track", replace_existing=True,
+                      max_instances=1, coalesce=True, misfire_grace_time=30)
+    scheduler.start(paused=True)
+    scheduler_leader = leader.SchedulerLeader(scheduler)
+    scheduler_leader.start()
+    logger.info(f"⏰ 스케줄러 시작 — 매일 KST 11:00 / window 모드 1분 tick "
+                f"({'리더' if scheduler_leader.is_leader else '대기'}, pid={os.getpid()})")
+    if APP_WARMUP == "background":
+        threading.Thread(target=warm_up, name="warmup", daemon=True).start()
+
+
+@app.before_request
+def _ensure_background():
+    if _background_pid != os.getpid():
+        start_background()
 
 
 # ════════════════════════════════════════════
@@ -248,7 +412,9 @@ logger.info("⏰ 스케줄러 시작 — 매일 KST 11:00")
 @app.route("/")
 def index():
     conn = get_conn()
-    clients = [dict(r) for r in conn.execute("SELECT id,name,memo FROM clients ORDER BY id").fetchall()]
+    clients = [dict(r) for r in conn.execute(
+        "SELECT id,name,memo,COALESCE(track_cadence,'daily') AS track_cadence FROM clients ORDER BY id"
+    ).fetchall()]
     conn.close()
 
     # 광고주가 하나도 없으면 빈 상태로 시작 (자동 생성 X)
@@ -261,14 +427,12 @@ def index():
             "keywords": keywords,
         }
 
-    job = scheduler.get_job("daily_track")
-    next_run = job.next_run_time.astimezone(KST).strftime("%m/%d %H:%M") if job and job.next_run_time else "-"
-
     return render_template("index.html",
                            clients=clients,
                            client_data=client_data,
-                           global_tracking=global_tracking,
-                           next_run=next_run)
+                           global_tracking=track_runs.status(),
+                           schedule=track_schedule.get_config(),
+                           next_run=next_schedule_run())
 
 
 # ════════════════════════════════════════════
@@ -303,6 +467,19 @@ def delete_client(cid):
     return jsonify({"ok": True})
 
 
+@app.route("/clients/<int:cid>/cadence", methods=["POST"])
+def set_client_cadence(cid):
+    """window 모드 자동 추적 주기 (daily / hourly)"""
+    cadence = ((request.get_json(silent=True) or {}).get("cadence") or request.form.get("cadence", "")).strip()
+    if cadence not in track_schedule.CADENCES:
+        return jsonify({"error": "cadence 는 daily 또는 hourly 입니다."}), 400
+    conn = get_conn()
+    conn.execute("UPDATE clients SET track_cadence=? WHERE id=?", (cadence, cid))
+    conn.commit()
+    conn.close()
+    return jsonify({"ok": True, "cadence": cadence})
+
+
 # ════════════════════════════════════════════
 # 상품 CRUD (AJAX)
 # ════════════════════════════════════════════
@@ -319,25 +496,22 @@ def add_product(cid):
         conn.close()
         return jsonify({"error": "존재하지 않는 광고주입니다."}), 404
 
-    info           = parse_product_info(product_url)
-    product_id     = info.get("product_id", "") or product_url
-    catalog_id     = info.get("catalog_id", "")
-    url_product_id = info.get("product_id", "")
-    display_name   = product_name or product_id
+    f = bulk_import.product_fields(product_url, product_name)
 
     try:
         conn.execute("""
             INSERT OR IGNORE INTO products
             (client_id,product_url,product_id,catalog_id,url_product_id,mall_name,product_name)
             VALUES (?,?,?,?,?,?,?)
-        """, (cid, product_url, product_id, catalog_id, url_product_id, "", display_name))
+        """, (cid, product_url, f["product_id"], f["catalog_id"], f["url_product_id"], "", f["product_name"]))
         conn.commit()
         pid = conn.execute("SELECT last_insert_rowid()").fetchone()[0]
     except Exception as e:
         conn.close()
         return jsonify({"error": str(e)}), 500
     conn.close()
-    return jsonify({"ok": True, "pid": pid, "product_id": product_id, "product_name": display_name, "product_url": product_url})
+    return jsonify({"ok": True, "pid": pid, "product_id": f["product_id"], "product_name": f["product_name"],
+                    "product_url": product_url})
 
 
 @app.route("/clients/<int:cid>/products/<int:pid>/delete", methods=["POST"])
@@ -363,22 +537,18 @@ def add_keyword(cid):
         conn.close()
         return jsonify({"error": "존재하지 않는 광고주입니다."}), 404
 
-    kws = [k.strip() for k in re.split(r"[,\n]+", raw) if k.strip()]
-    added = []
-    for kw in kws:
-        try:
-            conn.execute("INSERT OR IGNORE INTO keywords (client_id,keyword) VALUES (?,?)", (cid, kw))
-            added.append(kw)
-        except Exception:
-            pass
+    kws = list(dict.fromkeys(k.strip() for k in re.split(r"[,\n]+", raw) if k.strip()))
+    marks = ",".join("?" * len(kws))
+    existing = {r["keyword"] for r in conn.execute(
+        f"SELECT keyword FROM keywords WHERE client_id=? AND keyword IN ({marks})", (cid, *kws)).fetchall()}
+    added = [kw for kw in kws if kw not in existing]
+    conn.executemany("INSERT OR IGNORE INTO keywords (client_id,keyword) VALUES (?,?)", [(cid, kw) for kw in added])
     conn.commit()
 
-    # 추가된 keyword id 목록
-    kid_map = {}
-    for kw in added:
-        row = conn.execute("SELECT id FROM keywords WHERE client_id=? AND keyword=?", (cid, kw)).fetchone()
-        if row:
-            kid_map[kw] = row["id"]
+    # 추가된 keyword id 목록 (한 번에 조회)
+    kid_map = {r["keyword"]: r["id"] for r in conn.execute(
+        f"SELECT id, keyword FROM keywords WHERE client_id=? AND keyword IN ({marks})", (cid, *kws)).fetchall()
+        if r["keyword"] in added}
     conn.close()
     return jsonify({"ok": True, "added": added, "kid_map": kid_map})
 
@@ -392,12 +562,66 @@ def delete_keyword(cid, kid):
     return jsonify({"ok": True})
 
 
+# ════════════════════════════════════════════
+# 일괄 등록 (CSV / XLSX) — bulk_import.py
+# ════════════════════════════════════════════
+def _bulk_import(default_cid=None):
+    """업로드 파일 → 광고주 / 상품 / 키워드 일괄 등록 + 행별 보고
+
+    form: file (CSV / XLSX), dry_run=1 (기록하지 않고 보고만), create_clients=0 (없는 광고주는 오류 처리)
+    """
+    file = request.files.get("file")
+    if not file or not file.filename:
+        return jsonify({"error": "CSV 또는 XLSX 파일을 첨부하세요."}), 400
+    dry_run = request.form.get("dry_run") == "1"
+    try:
+        rows = bulk_import.read_rows(file.read(), file.filename)
+    except bulk_import.ImportFileError as e:
+        return jsonify({"error": str(e)}), 400
+
+    conn = get_conn()
+    try:
+        if default_cid is not None and not conn.execute("SELECT id FROM clients WHERE id=?", (default_cid,)).fetchone():
+            return jsonify({"error": "존재하지 않는 광고주입니다."}), 404
+        p = bulk_import.plan(conn, rows, default_cid, create_clients=request.form.get("create_clients", "1") == "1")
+        if not dry_run:
+            bulk_import.apply(conn, p)
+    finally:
+        conn.close()
+
+    report = p["report"]
+    summary = {
+        "rows":               len(rows),
+        "clients_added":      len(p["new_clients"]),
+        "products_added":     sum(1 for r in report if r["product"] == "added"),
+        "products_duplicate": sum(1 for r in report if r["product"] == "duplicate"),
+        "products_invalid":   sum(1 for r in report if r["product"] == "invalid"),
+        "keywords_added":     sum(len(r["keywords_added"]) for r in report),
+        "keywords_duplicate": sum(len(r["keywords_duplicate"]) for r in report),
+        "errors":             sum(1 for r in report if r["error"]),
+    }
+    logger.info(f"[일괄 등록] {file.filename} {summary}" + (" (dry-run)" if dry_run else ""))
+    return jsonify({"ok": True, "dry_run": dry_run, "summary": summary, "report": report})
+
+
+@app.route("/clients/import", methods=["POST"])
+def import_clients():
+    """여러 광고주 일괄 등록 — 파일에 광고주 열 필요 (없는 광고주는 새로 생성)"""
+    return _bulk_import()
+
+
+@app.route("/clients/<int:cid>/import", methods=["POST"])
+def import_client_items(cid):
+    """광고주 한 곳에 상품 / 키워드 일괄 등록 — 광고주 열이 비어 있는 행은 이 광고주로"""
+    return _bulk_import(cid)
+
+
 # ════════════════════════════════════════════
 # 추적
 # ════════════════════════════════════════════
 @app.route("/track/now", methods=["POST"])
 def track_now():
-    if global_tracking["running"]:
+    if track_runs.status()["running"]:
         return jsonify({"error": "이미 추적 중입니다."}), 409
     threading.Thread(target=lambda: run_all_tracking("manual"), daemon=True).start()
     return jsonify({"ok": True, "message": "추적을 시작했습니다."})
@@ -405,7 +629,46 @@ def track_now():
 
 @app.route("/track/status")
 def track_status():
-    return jsonify({"running": global_tracking["running"], "last_run": global_tracking["last_run"]})
+    """추적 상태 (어느 워커가 응답해도 같은 값 — tracking_runs 테이블 기준)"""
+    return jsonify(track_runs.status())
+
+
+TRACK_EVENTS_POLL_SEC = 1.0   # 서버 측 DB 확인 간격
+TRACK_EVENTS_MAX_SEC  = 300   # 스트림 1회 최대 유지 시간 (이후 EventSource 가 자동 재연결)
+TRACK_EVENTS_IDLE_SEC = 5     # 실행 중인 run 이 없을 때 시작을 기다리는 시간 (전체 추적 버튼 직후 대비)
+
+
+@app.route("/track/events")
+def track_events():
+    """추적 진행 상황 Server-Sent Events
+
+    상태가 바뀔 때마다 event: progress (data = /track/status 와 같은 JSON),
+    실행 중 → 종료로 바뀌면 event: done. 변화가 없으면 15초마다 주석(keep-alive).
+    TRACK_EVENTS_IDLE_SEC 안에 실행 중인 run 이 없으면 event: idle 후 바로 종료
+    (대시보드 탭이 gthread 요청 스레드를 계속 붙잡지 않도록 — 클라이언트는 idle 에서 close)
+    """
+    def gen():
+        yield "retry: 3000\n\n"
+        last, was_running = None, None
+        started = last_sent = time.monotonic()
+        while time.monotonic() - started < TRACK_EVENTS_MAX_SEC:
+            st = track_runs.status()
+            if not st["running"] and not was_running and time.monotonic() - started >= TRACK_EVENTS_IDLE_SEC:
+                yield f"event: idle\ndata: {json.dumps(st, ensure_ascii=False)}\n\n"
+                return
+            body = json.dumps(st, ensure_ascii=False)
+            if body != last:
+                event = "done" if was_running and not st["running"] else "progress"
+                yield f"event: {event}\ndata: {body}\n\n"
+                last, last_sent = body, time.monotonic()
+            elif time.monotonic() - last_sent >= STREAM_PING_SEC:
+                yield ": ping\n\n"
+                last_sent = time.monotonic()
+            was_running = st["running"]
+            time.sleep(TRACK_EVENTS_POLL_SEC)
+
+    return Response(stream_with_context(gen()), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
 
 
 # ════════════════════════════════════════════
@@ -422,7 +685,8 @@ def api_search_products():
         return jsonify({"error": "Naver API 키를 먼저 설정해주세요."})
     try:
         start    = (page - 1) * 20 + 1
-        data     = search_shopping(api_id, api_secret, q, display=20, start=start)
+        data     = search_shopping(api_id, api_secret, q, display=20, start=start,
+                                   use_cache=not _want_refresh())
         items_raw = data.get("items", [])
         total     = data.get("total", 0)
         items = []
@@ -457,7 +721,7 @@ def api_history():
     conn = get_conn()
     rows = [{"rank": r["rank"], "date": r["checked_at"][:16]} for r in conn.execute("""
         SELECT rank, checked_at FROM rank_history
-        WHERE product_id=? AND keyword=?
+        WHERE product_id=? AND keyword=? AND status = 'ok'
           AND checked_at >= datetime('now','-30 days','localtime')
         ORDER BY checked_at ASC LIMIT 60
     """, (product_id, keyword)).fetchall()]
@@ -480,8 +744,99 @@ def settings():
         conn.close()
         flash("API 키가 저장되었습니다.", "success")
         return redirect(url_for("settings"))
-    api_id, api_secret = get_api_keys()
-    return render_template("settings.html", client_id=api_id, client_secret=api_secret)
+    api_id, api_secret = api_keys.legacy_keys()
+    return render_template("settings.html", client_id=api_id, client_secret=api_secret,
+                           schedule=track_schedule.get_config(), shop_cache=_shop_cache_stats(),
+                           api_pool=api_keys.status(), api_roles=API_ROLE_LABELS)
+
+
+API_ROLE_LABELS = {"any": "공용", "interactive": "화면 요청", "background": "순위 추적"}
+
+
+@app.route("/settings/api-keys", methods=["POST"])
+def settings_api_key_add():
+    """키 풀에 애플리케이션 키 등록 (같은 Client ID 면 갱신)"""
+    try:
+        api_keys.add(request.form.get("label", "").strip(),
+                     request.form.get("client_id", "").strip(),
+                     request.form.get("client_secret", "").strip(),
+                     request.form.get("role", "any"),
+                     int(request.form.get("daily_quota") or api_keys.KEY_DAILY_QUOTA))
+    except ValueError as e:
+        flash(str(e), "error")
+        return redirect(url_for("settings"))
+    flash("API 키가 풀에 등록되었습니다.", "success")
+    return redirect(url_for("settings"))
+
+
+@app.route("/settings/api-keys/<int:kid>/toggle", methods=["POST"])
+def settings_api_key_toggle(kid):
+    api_keys.set_enabled(kid, request.form.get("enabled") == "1")
+    return redirect(url_for("settings"))
+
+
+@app.route("/settings/api-keys/<int:kid>/delete", methods=["POST"])
+def settings_api_key_delete(kid):
+    api_keys.remove(kid)
+    flash("API 키를 풀에서 삭제했습니다.", "success")
+    return redirect(url_for("settings"))
+
+
+@app.route("/api/api-keys")
+def api_api_keys():
+    """키 풀 현황 — 키별 오늘 사용량 / 남은 할당량 / 상태(active·cooldown·exhausted·disabled)"""
+    api_keys.flush()
+    pool = api_keys.status()
+    return jsonify({"keys": pool, "remaining": sum(k["remaining"] for k in pool if k["state"] == "active")})
+
+
+def _shop_cache_stats():
+    """쇼핑 API 응답 캐시 현황 + 적중 수 (모든 워커 합산, 서버 시작 이후)"""
+    counts = {}
+    for labels, v in metrics.collect().get(shop_cache.CACHE_TOTAL.name, {}).items():
+        counts[json.loads(labels)["result"]] = int(v)
+    hits = counts.get("hit", 0) + counts.get("hit_superset", 0)
+    lookups = hits + counts.get("miss", 0)
+    return {**shop_cache.stats(), **counts, "hit_rate": round(hits / lookups * 100, 1) if lookups else None}
+
+
+@app.route("/api/shop-cache")
+def api_shop_cache():
+    return jsonify(_shop_cache_stats())
+
+
+@app.route("/api/shop-cache/clear", methods=["POST"])
+def api_shop_cache_clear():
+    n = shop_cache.clear()
+    if request.is_json:
+        return jsonify({"ok": True, "removed": n})
+    flash(f"쇼핑 API 캐시 {n}건을 비웠습니다.", "success")
+    return redirect(url_for("settings"))
+
+
+@app.route("/settings/schedule", methods=["POST"])
+def settings_schedule():
+    try:
+        track_schedule.save_config(request.form.get("mode", "burst"),
+                                   request.form.get("start", ""), request.form.get("end", ""))
+    except ValueError as e:
+        flash(str(e), "error")
+        return redirect(url_for("settings"))
+    flash("자동 추적 스케줄이 저장되었습니다.", "success")
+    return redirect(url_for("settings"))
+
+
+@app.route("/api/schedule/plan")
+def api_schedule_plan():
+    """window 모드 오늘 실행 계획 — [{cid, name, cadence, weight, due, deadline}]"""
+    cfg = track_schedule.get_config()
+    units = track_schedule.plan(_schedule_units(), datetime.now(KST), cfg)
+    return jsonify({
+        **cfg,
+        "units": [{"cid": u["cid"], "name": u["name"], "cadence": u["cadence"], "weight": u["weight"],
+                   "due": u["due"].strftime("%H:%M"), "deadline": u["deadline"].strftime("%H:%M")}
+                  for u in units],
+    })
 
 
 
@@ -503,65 +858,37 @@ def automation():
 # 데이터 시작행: 3 (헤더 2행)
 # ════════════════════════════════════════════
 
-@app.route("/api/fetch-store-name")
-def api_fetch_store_name():
-    """업체명 조회: keyword+PID로 Shopping API mallName 우선, 실패시 크롤링
-    ?slug=xxx&pid=123&keyword=장뇌삼
-    """
-    import requests as req
-    slug    = request.args.get("slug", "").strip()
-    pid     = request.args.get("pid", "").strip()
-    keyword = request.args.get("keyword", "").strip()
+# 업체명 일괄 조회 시 동시에 처리할 검색/크롤링 수 (호스트별 상한은 naver_http)
+STORE_BATCH_WORKERS = 6
 
-    if not slug:
-        return jsonify({"ok": False, "name": "", "error": "slug 없음"})
 
+def _shopping_items(query):
+    """Shopping API 상위 30개 (sort=sim, 제외 필터 없음) — 키 미설정/실패 시 []"""
     client_id, client_secret = get_api_keys()
-    headers_naver = {
-        "X-Naver-Client-Id":     client_id,
-        "X-Naver-Client-Secret": client_secret,
-    }
-
-    def shopping_mall_name(query, pid_to_match):
-        """Shopping API로 query 검색, pid_to_match 매칭 후 mallName 반환"""
-        if not client_id or not query:
-            return None
-        try:
-            import urllib.parse
-            api_url = (f"https://openapi.naver.com/v1/search/shop.json"
-                       f"?query={urllib.parse.quote(query)}&display=30&sort=sim")
-            resp = req.get(api_url, headers=headers_naver, timeout=8)
-            if resp.status_code != 200:
-                return None
-            items = resp.json().get("items", [])
-            for item in items:
-                item_pid = str(item.get("productId", ""))
-                link = item.get("link", "")
-                m = re.search(r'/products/(\d+)', link)
-                link_pid = m.group(1) if m else ""
-                if pid_to_match and (pid_to_match == item_pid or pid_to_match == link_pid):
-                    mall = item.get("mallName", "").strip()
-                    if mall and len(mall) <= 30:
-                        return mall
-        except Exception as e:
-            logger.warning(f"[ShoppingAPI] query={query} 오류: {e}")
-        return None
+    if not client_id or not query:
+        return []
+    data = search_shopping(client_id, client_secret, query, display=30, exclude=None)
+    return (data or {}).get("items", [])
 
-    # 1) keyword + PID 매칭 → mallName (가장 정확)
-    if keyword and pid:
-        name = shopping_mall_name(keyword, pid)
-        if name:
-            logger.info(f"[StoreNameFetch] kw-match slug={slug} kw={keyword} -> {name}")
-            return jsonify({"ok": True, "name": name, "slug": slug, "source": "api-kw"})
 
-    # 2) slug로 검색 + PID 매칭 → mallName
-    if slug and pid:
-        name = shopping_mall_name(slug, pid)
-        if name:
-            logger.info(f"[StoreNameFetch] slug-match slug={slug} -> {name}")
-            return jsonify({"ok": True, "name": name, "slug": slug, "source": "api-slug"})
-
-    # 3) 크롤링 폴백
+def _mall_name_for_pid(items, pid_to_match):
+    """검색 결과에서 pid(productId 또는 link 의 /products/{id}) 매칭 → mallName"""
+    if not pid_to_match:
+        return None
+    for item in items:
+        item_pid = str(item.get("productId", ""))
+        link = item.get("link", "")
+        m = re.search(r'/products/(\d+)', link)
+        link_pid = m.group(1) if m else ""
+        if pid_to_match == item_pid or pid_to_match == link_pid:
+            mall = item.get("mallName", "").strip()
+            if mall and len(mall) <= 30:
+                return mall
+    return None
+
+
+def _crawl_store_name(slug):
+    """smartstore.naver.com/{slug} 크롤링 → (name, source) / 실패 시 (None, None)"""
     crawl_headers = {
         "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
                       "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
@@ -570,7 +897,7 @@ def api_fetch_store_name():
     }
     try:
         profile_url = f"https://smartstore.naver.com/{slug}"
-        resp = req.get(profile_url, headers=crawl_headers, timeout=8, allow_redirects=True)
+        resp = naver_http.get(profile_url, headers=crawl_headers, timeout=8, allow_redirects=True)
         html = resp.text
         for pat in [
             r'<meta[^>]+property=["\']og:title["\'][^>]+content=["\']([^"\']+)["\']',
@@ -582,100 +909,332 @@ def api_fetch_store_name():
                 name = raw.split(':')[0].strip() if ':' in raw else raw
                 if name and len(name) <= 30:
                     logger.info(f"[StoreNameFetch] crawl-og slug={slug} -> {name}")
-                    return jsonify({"ok": True, "name": name, "slug": slug, "source": "crawl"})
+                    return name, "crawl"
         m_title = re.search(r'<title[^>]*>([^<]+)</title>', html)
         if m_title:
             raw = m_title.group(1).strip()
             name = raw.split(':')[0].strip() if ':' in raw else raw
             if name and len(name) <= 30:
                 logger.info(f"[StoreNameFetch] crawl-title slug={slug} -> {name}")
-                return jsonify({"ok": True, "name": name, "slug": slug, "source": "crawl-title"})
+                return name, "crawl-title"
     except Exception as e:
         logger.warning(f"[StoreNameFetch] crawl 실패: {e}")
+    return None, None
 
-    # 4) 최종 폴백: slug가 영어만(업체명 미확인) 경우 '원부 상품' 반환
+
+def _store_name_fallback(slug):
+    """API/크롤링 모두 실패 시 응답 dict"""
+    # slug가 영어만(업체명 미확인) 경우 '원부 상품' 반환
     # 예: idbag → '원부 상품' (한글 업체명 미노출)
     is_english_only = bool(slug) and bool(re.match(r'^[a-zA-Z0-9_\-]+$', slug))
     if is_english_only:
         logger.info(f"[StoreNameFetch] english-slug fallback slug={slug} → 원부 상품")
-        return jsonify({"ok": False, "name": "", "slug": slug, "source": "원부상품",
-                        "is_origin": True})
+        return {"ok": False, "name": "", "slug": slug, "source": "원부상품",
+                "is_origin": True}
 
     logger.info(f"[StoreNameFetch] fallback slug={slug}")
-    return jsonify({"ok": False, "name": slug, "slug": slug, "source": "slug"})
+    return {"ok": False, "name": slug, "slug": slug, "source": "slug"}
+
+
+def _resolve_store_name(slug, pid, keyword):
+    """업체명 조회: keyword+PID로 Shopping API mallName 우선, 실패시 크롤링
+    Returns: /api/fetch-store-name 응답 dict ({ok, name, slug, source[, is_origin]})
+    """
+    # 1) keyword + PID 매칭 → mallName (가장 정확)
+    if keyword and pid:
+        name = _mall_name_for_pid(_shopping_items(keyword), pid)
+        if name:
+            logger.info(f"[StoreNameFetch] kw-match slug={slug} kw={keyword} -> {name}")
+            return {"ok": True, "name": name, "slug": slug, "source": "api-kw"}
+
+    # 2) slug로 검색 + PID 매칭 → mallName
+    if slug and pid:
+        name = _mall_name_for_pid(_shopping_items(slug), pid)
+        if name:
+            logger.info(f"[StoreNameFetch] slug-match slug={slug} -> {name}")
+            return {"ok": True, "name": name, "slug": slug, "source": "api-slug"}
+
+    # 3) 크롤링 폴백
+    name, source = _crawl_store_name(slug)
+    if name:
+        return {"ok": True, "name": name, "slug": slug, "source": source}
+
+    # 4) 최종 폴백
+    return _store_name_fallback(slug)
+
+
+def _resolve_store_names_batch(todo):
+    """여러 (slug, pid) 업체명을 한 번에 해석 — _resolve_store_name 과 같은 우선순위
+
+    todo: {(slug, pid): keyword}
+    같은 검색어의 Shopping API 검색, 같은 slug 의 검색/크롤링은 각각 1회만 수행하고
+    그 결과를 해당 검색어/slug 를 쓰는 모든 pid 에 공유한다.
+    Returns: {(slug, pid): 응답 dict}
+    """
+    results = {}
+    pending = dict(todo)
+    with ThreadPoolExecutor(max_workers=STORE_BATCH_WORKERS) as ex:
+        # 1) keyword + PID — 고유 검색어당 1회
+        kws = list(dict.fromkeys(kw for (slug, pid), kw in pending.items() if kw and pid))
+        items_by_kw = dict(zip(kws, ex.map(profiling.bind(_shopping_items), kws)))
+        for (slug, pid), kw in list(pending.items()):
+            name = _mall_name_for_pid(items_by_kw.get(kw, []), pid) if kw and pid else None
+            if name:
+                results[(slug, pid)] = {"ok": True, "name": name, "slug": slug, "source": "api-kw"}
+                del pending[(slug, pid)]
+
+        # 2) slug + PID — 고유 slug당 1회
+        slugs = list(dict.fromkeys(slug for (slug, pid) in pending if slug and pid))
+        items_by_slug = dict(zip(slugs, ex.map(profiling.bind(_shopping_items), slugs)))
+        for (slug, pid) in list(pending):
+            name = _mall_name_for_pid(items_by_slug.get(slug, []), pid) if pid else None
+            if name:
+                results[(slug, pid)] = {"ok": True, "name": name, "slug": slug, "source": "api-slug"}
+                del pending[(slug, pid)]
+
+        # 3) 크롤링 — 고유 slug당 1회, 4) 최종 폴백
+        slugs = list(dict.fromkeys(slug for (slug, pid) in pending))
+        crawled = dict(zip(slugs, ex.map(profiling.bind(_crawl_store_name), slugs)))
+        for (slug, pid) in pending:
+            name, source = crawled.get(slug, (None, None))
+            results[(slug, pid)] = ({"ok": True, "name": name, "slug": slug, "source": source}
+                                    if name else _store_name_fallback(slug))
+
+    logger.info(f"[StoreNameBatch] {len(todo)}건 | 검색어 {len(kws)}개 | 크롤링 {len(slugs)}개")
+    return results
+
+
+@app.route("/api/fetch-store-name")
+def api_fetch_store_name():
+    """업체명 조회 (store_name_cache 우선, refresh=1 이면 재조회)
+    ?slug=xxx&pid=123&keyword=장뇌삼
+
+    - 성공(mallName/크롤링): 30일 캐시
+    - '원부 상품'(영문 slug) / slug 폴백: 짧은 TTL 로 negative 캐시
+    - 만료 후 재조회가 실패하면 이전 성공 값을 그대로 쓰고 TTL 연장
+    """
+    slug    = request.args.get("slug", "").strip()
+    pid     = request.args.get("pid", "").strip()
+    keyword = request.args.get("keyword", "").strip()
+
+    if not slug:
+        return jsonify({"ok": False, "name": "", "error": "slug 없음"})
+
+    entry = None if _want_refresh() else meta_cache.get_store(slug, pid, keyword)
+    if entry is not None:
+        return jsonify({**entry["result"], "cached": True})
+    return jsonify(_store_cache_result(slug, pid, keyword, _resolve_store_name(slug, pid, keyword)))
+
+
+@app.route("/api/fetch-store-names", methods=["POST"])
+def api_fetch_store_names():
+    """업체명 일괄 조회 (automation 발주 파싱용)
+    POST {rows: [{slug, pid, keyword}], refresh: false}
+    Returns: {ok, results: [/api/fetch-store-name 과 같은 구조 — rows 순서 그대로]}
+
+    동일 (slug, pid)는 한 번만 해석하고, 캐시에 없는 것만 _resolve_store_names_batch 로 처리
+    """
+    data    = request.get_json(force=True) or {}
+    rows    = data.get("rows", [])
+    refresh = bool(data.get("refresh"))
+
+    keys, kw_by_key, answers, todo = [], {}, {}, {}
+    for row in rows:
+        slug = str(row.get("slug") or "").strip()
+        pid  = str(row.get("pid") or "").strip()
+        kw   = str(row.get("keyword") or "").strip()
+        key  = (slug, pid)
+        keys.append(key)
+        if slug:
+            kw_by_key[key] = kw_by_key.get(key) or kw     # 첫 번째로 들어온 검색어 우선
+    for key, kw in kw_by_key.items():
+        entry = None if refresh else meta_cache.get_store(*key, kw)
+        if entry is not None:
+            answers[key] = {**entry["result"], "cached": True}
+        else:
+            todo[key] = kw
+
+    if todo:
+        for (slug, pid), result in _resolve_store_names_batch(todo).items():
+            answers[(slug, pid)] = _store_cache_result(slug, pid, todo[(slug, pid)], result)
+
+    results = [answers.get(k) or {"ok": False, "name": "", "error": "slug 없음"} for k in keys]
+    return jsonify({"ok": True, "results": results})
+
+
+def _store_cache_result(slug, pid, keyword, result):
+    """새로 해석한 업체명 결과를 캐시에 저장하고 응답 dict 반환 (cached 필드 포함)"""
+    if not result.get("ok"):
+        # 재검증 실패 → 만료된 성공 값이 있으면 그것을 유지 (업체명은 거의 안 바뀜)
+        stale = meta_cache.get_store(slug, pid, include_expired=True)
+        if stale is not None and stale["ok"]:
+            meta_cache.put_store(slug, pid, stale["result"])
+            logger.info(f"[StoreNameFetch] 재조회 실패 → 기존 값 유지 slug={slug} -> {stale['result'].get('name')}")
+            return {**stale["result"], "cached": True}
+    meta_cache.put_store(slug, pid, result, keyword)
+    return {**result, "cached": False}
+
+
+CHECK_RANK_WORKERS     = 4    # 고유 키워드 동시 조회 수 (openapi 호스트 한도와 동일)
+CHECK_RANK_DISPLAY     = 30   # 업무 자동화 순위 확인 범위 (상위 30개)
+CHECK_RANK_LIMIT       = 15   # 이 순위 밖(또는 미노출)이면 rank_blocked
+CHECK_RANK_HISTORY_MIN = float(os.environ.get("CHECK_RANK_HISTORY_MIN", 60))  # 0 이면 사용 안 함
+
+
+def _check_rank_product(pid, url):
+    """발주 행(pid, url) → engine.MatchIndex 용 product dict"""
+    info = parse_product_info(url) if url else {}
+    return {
+        "product_id":      pid or info.get("product_id"),
+        "catalog_id":      info.get("catalog_id"),
+        "url_product_id":  info.get("url_product_id"),
+        # 스마트스토어 URL 이 아니어도 link 의 /products/{pid} 와 정확히 같으면 매칭
+        "link_product_id": pid,
+        "mall_name":       "",
+    }
+
+
+def _recent_tracked_ranks(pairs):
+    """최근 추적 실행(rank_history)에서 (pid, keyword) 순위 조회
+
+    CHECK_RANK_HISTORY_MIN 분 이내 기록만 사용. 실시간 조회도 추적과 같은 검색 조건
+    (exclude=used:rental, sort=sim)이라 순위가 그대로 호환되고, 추적은 더 넓은 범위를 보므로
+    CHECK_RANK_DISPLAY 위 밖이거나 미발견이면 0(상위 30 밖)으로 환산.
+    Returns: {(pid, keyword): rank}
+    """
+    if CHECK_RANK_HISTORY_MIN <= 0 or not pairs:
+        return {}
+    since = (datetime.now() - timedelta(minutes=CHECK_RANK_HISTORY_MIN)).strftime("%Y-%m-%d %H:%M:%S")
+    conn = get_conn()
+    found = {}
+    for pid, kw in pairs:
+        row = conn.execute("""
+            SELECT rank FROM rank_history
+            WHERE product_id=? AND keyword=? AND checked_at >= ? AND status = 'ok'
+            ORDER BY checked_at DESC LIMIT 1
+        """, (pid, kw, since)).fetchone()
+        if row:
+            r = row["rank"]
+            found[(pid, kw)] = r if r and r <= CHECK_RANK_DISPLAY else 0
+    conn.close()
+    return found
+
+
+def _iter_check_rank(jobs, refresh, client_id, client_secret):
+    """/api/check-rank 처리 — 키워드 결과가 나오는 대로 ("result", {...}) yield,
+    마지막에 ("summary", {ok, results, rank_blocked})
+
+    - 최근 추적 결과(rank_history)가 있으면 그대로 사용 (source: "history")
+    - 나머지는 고유 키워드당 Shopping API 1회만 병렬 호출 (추적과 같은 검색 조건 — 추적이
+      받아 둔 display=100 페이지가 캐시에 있으면 그 상위 30개를 씀) 후
+      같은 결과에 모든 PID 를 engine.MatchIndex 로 대조 (source: "api")
+    """
+    rows = []   # [(pid, url, product, [kw, ...])]
+    for job in jobs:
+        pid = str(job.get("pid", "") or "")
+        url = job.get("url", "")
+        rows.append((pid, url, _check_rank_product(pid, url), job.get("keywords", [])))
+
+    pairs = {(pid, kw) for pid, _, _, kws in rows for kw in kws if kw and pid}
+    history = {} if refresh else _recent_tracked_ranks(pairs)
+
+    results = [{"pid": pid, "url": url, "keywords": [None] * len(kws)} for pid, url, _, kws in rows]
+    waiting = {}   # kw → [(job, kw 위치)] (API 조회 대상)
+    for j, (pid, _, _, kws) in enumerate(rows):
+        for k, kw in enumerate(kws):
+            if kw and (pid, kw) not in history:
+                waiting.setdefault(kw, []).append((j, k))
+                continue
+            if not kw:
+                r = {"keyword": kw, "rank": None}
+            else:
+                r = {"keyword": kw, "rank": history[(pid, kw)], "source": "history"}
+            results[j]["keywords"][k] = r
+            yield "result", {"job": j, "index": k, "pid": pid, **r}
+
+    def fetch(kw):
+        res = search_shopping(client_id, client_secret, kw, display=CHECK_RANK_DISPLAY,
+                              use_cache=not refresh)
+        if res is None:
+            logger.warning(f"[CheckRank] kw={kw} 조회 실패")
+            return None
+        return MatchIndex(decode_items(res.get("items", [])))
+
+    keywords = list(waiting)
+    for i, index in _iter_concurrent(fetch, keywords, CHECK_RANK_WORKERS):
+        if i is None:
+            yield "ping", {}
+            continue
+        for j, k in waiting[keywords[i]]:
+            pos = index.find(rows[j][2]) if index is not None else None
+            rank = None if index is None else (pos + 1 if pos is not None else 0)
+            r = {"keyword": keywords[i], "rank": rank, "source": "api"}
+            results[j]["keywords"][k] = r
+            yield "result", {"job": j, "index": k, "pid": rows[j][0], **r}
+
+    logger.info(f"[CheckRank] {len(pairs)}쌍 | API 키워드 {len(keywords)}개 | 추적 기록 {len(history)}쌍")
+    rank_blocked = any(r["rank"] is not None and (r["rank"] <= 0 or r["rank"] > CHECK_RANK_LIMIT)
+                       for job in results for r in job["keywords"])
+    yield "summary", {"ok": True, "results": results, "rank_blocked": rank_blocked}
 
 
 @app.route("/api/check-rank", methods=["POST"])
 def api_check_rank():
-    """키워드별 네이버 쇼핑 순위 확인 — top15 이내 여부 반환"""
-    import requests as req
-    data  = request.get_json(force=True)
-    jobs  = data.get("jobs", [])   # [{pid, url, keywords:[]}]
+    """키워드별 네이버 쇼핑 순위 확인 — 상위 30 이내 순위 반환 (0 = 30위 밖, None = 조회 실패)
+
+    POST {jobs: [{pid, url, keywords: []}], refresh: false}
+    Returns: {ok, results: [{pid, url, keywords: [{keyword, rank, source}]}], rank_blocked}
+    """
+    data    = request.get_json(force=True) or {}
+    jobs    = data.get("jobs", [])   # [{pid, url, keywords:[]}]
     client_id, client_secret = get_api_keys()
 
     if not client_id:
         return jsonify({"ok": False, "error": "API 키가 설정되지 않았습니다."})
 
-    def get_rank(pid, keyword):
-        """Naver Shopping API로 PID 순위 조회"""
-        headers = {
-            "X-Naver-Client-Id":     client_id,
-            "X-Naver-Client-Secret": client_secret,
-        }
-        try:
-            url = (f"https://openapi.naver.com/v1/search/shop.json"
-                   f"?query={req.utils.quote(keyword)}&display=30&sort=sim")
-            resp = req.get(url, headers=headers, timeout=8)
-            if resp.status_code != 200:
-                return None
-            items = resp.json().get("items", [])
-            for i, item in enumerate(items):
-                # productId 또는 link에서 PID 추출
-                item_pid = str(item.get("productId", ""))
-                link = item.get("link", "")
-                m = re.search(r'/products/(\d+)', link)
-                link_pid = m.group(1) if m else ""
-                if pid and (pid == item_pid or pid == link_pid):
-                    return i + 1
-            return 0  # 30위 이내 없음
-        except Exception as e:
-            logger.warning(f"[CheckRank] kw={keyword} 오류: {e}")
-            return None
+    summary = {}
+    for kind, payload in _iter_check_rank(jobs, bool(data.get("refresh")), client_id, client_secret):
+        if kind == "summary":
+            summary = payload
+    return jsonify(summary)
 
-    results = []
-    for job in jobs:
-        pid = str(job.get("pid", ""))
-        kws = job.get("keywords", [])
-        url = job.get("url", "")
-        kw_results = []
-        for kw in kws:
-            rank = get_rank(pid, kw) if kw else None
-            kw_results.append({"keyword": kw, "rank": rank})
-        results.append({"pid": pid, "url": url, "keywords": kw_results})
 
-    return jsonify({"ok": True, "results": results})
+@app.route("/api/check-rank/stream", methods=["POST"])
+def api_check_rank_stream():
+    """/api/check-rank 스트리밍 버전 — 키워드 결과가 나오는 대로 전송
+
+    기본 NDJSON(한 줄 = 이벤트 1개), ?format=sse 또는 Accept: text/event-stream 이면 SSE.
+    이벤트: start {total} → result {job, index, pid, keyword, rank, source} ...
+            → summary {ok, results, rank_blocked}  (대기 중 ping, 요청 오류 시 error)
+    """
+    data = request.get_json(force=True) or {}
+    jobs = data.get("jobs", [])
+    client_id, client_secret = get_api_keys()
+
+    def events():
+        if not client_id:
+            yield "error", {"ok": False, "error": "API 키가 설정되지 않았습니다."}
+            return
+        yield "start", {"total": sum(len(job.get("keywords", [])) for job in jobs)}
+        yield from _iter_check_rank(jobs, bool(data.get("refresh")), client_id, client_secret)
+    return _stream_response(events())
 
 
 # ════════════════════════════════════════════
 # Excel 새 파일 내보내기 (v15 구조)
 # ════════════════════════════════════════════
-@app.route("/api/automation/excel-export", methods=["POST"])
-def api_excel_export():
-    """캠페인 데이터를 새 .xlsx로 내보내기 — v15 컬럼 구조
+def _build_export_workbook(campaigns, export_type="shop", progress=None):
+    """캠페인 데이터로 새 워크북 생성 — v15 컬럼 구조
     A(1)=구분, B(2)=WEB, C(3)=시작일, D(4)=종료일,
     E(5)=총예산, F(6)=총예산수식, G(7)=일예산수식, H(8)=포인트(수식),
     I(9)=검색어, J(10)=미션내용, K(11)=정답,
     L(12)=힌트URL, M(13)=업체명, N(14)=일유입목표, O(15)=글자수수식
     병합: A,C,D,E,F,G,H,N,O → 5행씩
+    export_type: 'shop' or 'place' / progress(done, total): 캠페인 단위 진행률 콜백
     """
     import openpyxl
     from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
     from openpyxl.utils import get_column_letter
-    from io import BytesIO
-
-    data = request.get_json(force=True)
-    campaigns = data.get("campaigns", [])
-    export_type = data.get("type", "shop")  # 'shop' or 'place'
 
     wb = openpyxl.Workbook()
     ws = wb.active
@@ -721,6 +1280,8 @@ def api_excel_export():
 
     row_num = 2  # 1행=헤더, 데이터는 2행부터 (new file기준)
     for ci, camp in enumerate(campaigns):
+        if progress:
+            progress(ci, len(campaigns))
         rows_data = camp.get("rows", [])
         camp_start_row = row_num
         is_first_camp = (ci == 0)
@@ -792,43 +1353,54 @@ def api_excel_export():
             except Exception:
                 pass
 
+    return wb
+
+
+@app.route("/api/automation/excel-export", methods=["POST"])
+def api_excel_export():
+    """캠페인 데이터를 새 .xlsx로 내보내기 (동기) — 큰 작업은 POST /api/jobs/excel-export"""
+    data = request.get_json(force=True)
+    wb = _build_export_workbook(data.get("campaigns", []), data.get("type", "shop"))
+    return _xlsx_response(wb, "campaign.xlsx")
+
+
+XLSX_MIMETYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+
+def _xlsx_response(wb, out_name):
+    """워크북 → 첨부 다운로드 응답 (한글 파일명은 RFC 5987 filename*)"""
+    from io import BytesIO
     output = BytesIO()
-    wb.save(output)
-    output.seek(0)
-    return output.read(), 200, {
-        "Content-Type": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        "Content-Disposition": "attachment; filename=campaign.xlsx"
+    with profiling.span("excel"):
+        wb.save(output)
+    return output.getvalue(), 200, {
+        "Content-Type": XLSX_MIMETYPE,
+        "Content-Disposition": "attachment; filename*=UTF-8''" + quote(out_name, safe=''),
     }
 
 
-def _load_workbook_safe(path_or_bytes):
-    """조건부 서식 XML 오류를 우회하여 워크북 로드"""
-    import zipfile, re as _re
+@profiling.timed("excel")
+def _load_workbook_safe(src):
+    """조건부 서식 XML 오류를 우회하여 워크북 로드
+
+    src: 파일 경로, 바이너리 파일 객체(업로드 stream), bytes 모두 허용.
+    조건부 서식 제거는 xlsx_safe.sanitize_xlsx 가 스트리밍으로 처리한다.
+    """
     from io import BytesIO as _BytesIO
     import openpyxl as _opx
+    from xlsx_safe import sanitize_xlsx
 
-    if isinstance(path_or_bytes, str):
-        with open(path_or_bytes, 'rb') as _f:
-            raw = _f.read()
-    elif isinstance(path_or_bytes, (bytes, bytearray)):
-        raw = bytes(path_or_bytes)
-    else:
-        raw = path_or_bytes.read()
+    if isinstance(src, (bytes, bytearray)):
+        src = _BytesIO(bytes(src))
 
-    buf = _BytesIO()
-    with zipfile.ZipFile(_BytesIO(raw), 'r') as zin:
-        with zipfile.ZipFile(buf, 'w', zipfile.ZIP_DEFLATED) as zout:
-            for item in zin.infolist():
-                data = zin.read(item.filename)
-                if item.filename.startswith('xl/worksheets/') and item.filename.endswith('.xml'):
-                    text = data.decode('utf-8')
-                    text = _re.sub(r'<conditionalFormatting[^>]*>.*?</conditionalFormatting>',
-                                   '', text, flags=_re.DOTALL)
-                    text = _re.sub(r'<conditionalFormatting[^/]*/>', '', text)
-                    data = text.encode('utf-8')
-                zout.writestr(item, data)
-    buf.seek(0)
-    return _opx.load_workbook(buf)
+    buf, stats = sanitize_xlsx(src)
+    logger.info(f"[XLSX] 조건부서식 정리: 시트 {stats['sheets']}개, "
+                f"{stats['bytes_in'] // 1024}KB → {stats['bytes_out'] // 1024}KB, "
+                f"제거 {stats['removed']}건, {stats['elapsed_ms']}ms")
+    try:
+        return _opx.load_workbook(buf)
+    finally:
+        buf.close()
 
 
 
@@ -837,24 +1409,17 @@ def _load_workbook_safe(path_or_bytes):
 # 플레이스 미션 자동화 API 섹션
 # ════════════════════════════════════════════════════════════
 
-@app.route("/api/fetch-place-name")
-def api_fetch_place_name():
-    """플레이스 URL에서 업체명 추출
-    ?url=https://m.place.naver.com/restaurant/1326727196/home
-    """
-    import requests as req
-    from bs4 import BeautifulSoup as _BS4
-    place_url = request.args.get("url", "").strip()
-    if not place_url:
-        return jsonify({"ok": False, "error": "url 파라미터 없음"})
+def _transient_status(resp) -> bool:
+    """일시 장애 응답 (429 / 5xx) — 다시 요청하면 될 수 있으므로 negative 캐시 대상 아님"""
+    return resp.status_code == 429 or resp.status_code >= 500
 
-    m = re.search(r'naver\.com/[^/?#]+/(\d+)', place_url)
-    if not m:
-        return jsonify({"ok": False, "error": "플레이스 URL에서 ID를 찾을 수 없음"})
 
-    pid = m.group(1)
-    cat_m = re.search(r'naver\.com/([^/?]+)', place_url)
-    cat = cat_m.group(1) if cat_m else "place"
+def _scrape_place_name(pid, cat):
+    """m.place 홈에서 업체명 추출 → (name, source) / 추출 실패 시 (None, None)
+
+    타임아웃 / 연결 오류 / 429·5xx 는 requests.RequestException 으로 올려보냄 (_fresh_place 가 캐시하지 않음)
+    """
+    from bs4 import BeautifulSoup as _BS4
 
     headers_m = {
         "User-Agent": "Mozilla/5.0 (iPhone; CPU iPhone OS 16_0 like Mac OS X) AppleWebKit/605.1.15",
@@ -862,11 +1427,15 @@ def api_fetch_place_name():
         "Referer": "https://m.place.naver.com/",
     }
 
+    fetch_url = f"https://m.place.naver.com/{cat}/{pid}/home"
+    resp = naver_http.get(fetch_url, headers=headers_m, timeout=10)
+    if _transient_status(resp):
+        raise requests.HTTPError(f"HTTP {resp.status_code}", response=resp)
+
     try:
-        fetch_url = f"https://m.place.naver.com/{cat}/{pid}/home"
-        resp = req.get(fetch_url, headers=headers_m, timeout=10)
         resp.encoding = "utf-8"
-        soup = _BS4(resp.content, "html.parser", from_encoding="utf-8")
+        with profiling.span("parse"):
+            soup = _BS4(resp.content, "html.parser", from_encoding="utf-8")
 
         # 방법1: Apollo State에서 PlaceDetailBase 추출
         for script in soup.find_all("script"):
@@ -876,29 +1445,118 @@ def api_fetch_place_name():
                 if nm:
                     name = nm.group(1).strip()
                     logger.info(f"[PlaceName] Apollo 추출: {name}")
-                    return jsonify({"ok": True, "name": name, "pid": pid, "source": "apollo"})
+                    return name, "apollo"
 
         # 방법2: og:title
         og = soup.find("meta", property="og:title")
         if og and og.get("content"):
             name = og["content"].replace(": 네이버 지도","").replace("- 네이버 지도","").strip()
             if name and len(name) < 40:
-                return jsonify({"ok": True, "name": name, "pid": pid, "source": "og"})
+                return name, "og"
 
         # 방법3: title 태그
         title = soup.find("title")
         if title and title.string:
             name = title.string.replace(": 네이버 지도","").replace("- 네이버 지도","").strip()
-            return jsonify({"ok": True, "name": name, "pid": pid, "source": "title"})
+            return name, "title"
 
     except Exception as e:
-        logger.warning(f"[PlaceName] 오류: {e}")
+        logger.warning(f"[PlaceName] 파싱 오류: {e}")
 
-    return jsonify({"ok": False, "pid": pid, "error": "업체명 추출 실패"})
+    return None, None
 
 
-@app.route("/api/fetch-place-spots")
-def api_fetch_place_spots():
+def _parse_place_url(place_url, default_cat):
+    """플레이스 URL → (place_id, category) / ID 없으면 (None, None)"""
+    m = re.search(r'naver\.com/[^/?#]+/(\d+)', place_url)
+    if not m:
+        return None, None
+    cat_m = re.search(r'naver\.com/([^/?]+)', place_url)
+    return m.group(1), (cat_m.group(1) if cat_m else default_cat)
+
+
+def _fresh_place(pid, cat, kind, scrape):
+    """스크래핑 → place_cache 저장 후 항목 반환
+    같은 (pid, cat, kind) 를 동시에 요청하면 한 번만 스크래핑 (다른 워커 진행 중이면 끝난 뒤 캐시에서 읽음)
+    네트워크 / 일시 장애(requests.RequestException)는 실패 항목만 돌려주고 캐시하지 않음 — 다음 요청이 바로 재시도
+    """
+    def load():
+        try:
+            value, method = scrape(pid, cat)
+        except requests.RequestException as e:
+            logger.warning(f"[Place:{kind}] 일시 장애, 캐시 안 함 ({pid}): {e}")
+            return {"ok": False, "value": None, "method": "", "transient": True,
+                    "fetched_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
+        return meta_cache.put_place(pid, cat, kind, value, method)
+    return singleflight.do(f"place_{kind}", f"{pid}|{cat}", load,
+                           lookup=lambda: meta_cache.get_place(pid, cat, kind))
+
+
+def _place_name_response(pid, entry, cached):
+    if entry["ok"]:
+        return {"ok": True, "name": entry["value"], "pid": pid, "source": entry["method"],
+                "cached": cached, "fetched_at": entry["fetched_at"]}
+    return {"ok": False, "pid": pid,
+            "error": "네이버 응답 지연 — 잠시 후 다시 시도" if entry.get("transient") else "업체명 추출 실패",
+            "cached": cached, "fetched_at": entry["fetched_at"]}
+
+
+@app.route("/api/fetch-place-name")
+def api_fetch_place_name():
+    """플레이스 URL에서 업체명 추출 (place_cache 우선, refresh=1 이면 재조회)
+    ?url=https://m.place.naver.com/restaurant/1326727196/home
+    """
+    place_url = request.args.get("url", "").strip()
+    if not place_url:
+        return jsonify({"ok": False, "error": "url 파라미터 없음"})
+
+    pid, cat = _parse_place_url(place_url, "place")
+    if not pid:
+        return jsonify({"ok": False, "error": "플레이스 URL에서 ID를 찾을 수 없음"})
+
+    entry = None if _want_refresh() else meta_cache.get_place(pid, cat, "name")
+    cached = entry is not None
+    if not cached:
+        entry = _fresh_place(pid, cat, "name", _scrape_place_name)
+    return jsonify(_place_name_response(pid, entry, cached))
+
+
+@app.route("/api/fetch-place-names", methods=["POST"])
+def api_fetch_place_names():
+    """플레이스 업체명 일괄 조회 (automation 플레이스 발주 파싱용)
+    POST {urls: ["https://m.place.naver.com/restaurant/1326727196/home", ...], refresh: false}
+    Returns: {ok, results: [/api/fetch-place-name 과 같은 구조 — urls 순서 그대로]}
+
+    동일 (place_id, category)는 한 번만 조회, 캐시에 없는 것만 병렬 스크래핑
+    """
+    data    = request.get_json(force=True) or {}
+    urls    = data.get("urls", [])
+    refresh = bool(data.get("refresh"))
+
+    keys, answers, todo = [], {}, []
+    for u in urls:
+        pid, cat = _parse_place_url(str(u or "").strip(), "place")
+        keys.append((pid, cat))
+        if not pid or (pid, cat) in answers or (pid, cat) in todo:
+            continue
+        entry = None if refresh else meta_cache.get_place(pid, cat, "name")
+        if entry is not None:
+            answers[(pid, cat)] = _place_name_response(pid, entry, True)
+        else:
+            todo.append((pid, cat))
+
+    if todo:
+        with ThreadPoolExecutor(max_workers=min(STORE_BATCH_WORKERS, len(todo))) as ex:
+            entries = list(ex.map(profiling.bind(lambda k: _fresh_place(*k, "name", _scrape_place_name)), todo))
+        for (pid, cat), entry in zip(todo, entries):
+            answers[(pid, cat)] = _place_name_response(pid, entry, False)
+
+    results = [answers.get(k) or {"ok": False, "error": "플레이스 URL에서 ID를 찾을 수 없음"}
+               for k in keys]
+    return jsonify({"ok": True, "results": results})
+
+
+def _scrape_place_spots(pid, cat):
     """플레이스 명소(가볼만한곳) 목록 자동 추출
 
     핵심 원칙:
@@ -910,24 +1568,10 @@ def api_fetch_place_spots():
     1. 모바일 around?filter=100  → ROOT_QUERY trips 순서 그대로 (가장 정확)
     2. 모바일 around (일반)      → ROOT_QUERY trips + 카테고리 필터링
     3. GraphQL getTrips          → 마지막 fallback (IP 캐싱 이슈 있음)
-    """
-    import requests as req
-    import json as _json
-
-    place_url = request.args.get("url", "").strip()
-    nth = max(1, int(request.args.get("nth", 15)))  # nth=0 버그 방지 (0이하 → 1로 처리)
-
-    if not place_url:
-        return jsonify({"ok": False, "error": "url 파라미터 없음"})
-
-    m = re.search(r'naver\.com/[^/?#]+/(\d+)', place_url)
-    if not m:
-        return jsonify({"ok": False, "error": "플레이스 ID 추출 실패"})
-    pid = m.group(1)
-
-    cat_m = re.search(r'naver\.com/([^/?]+)', place_url)
-    cat = cat_m.group(1) if cat_m else "restaurant"
 
+    Returns: (spots, method_used) — 실패 시 ([], "")
+    모든 방법이 네트워크 오류 / 429·5xx 로만 끝났으면 requests.RequestException (_fresh_place 가 캐시하지 않음)
+    """
     headers_m = {
         "User-Agent": "Mozilla/5.0 (iPhone; CPU iPhone OS 16_0 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/16.0 Mobile/15E148 Safari/604.1",
         "Accept-Language": "ko-KR,ko;q=0.9",
@@ -941,6 +1585,7 @@ def api_fetch_place_spots():
 
     spots = []
     method_used = ""
+    answered = False    # 일시 장애가 아닌 응답을 하나라도 받았는지
 
     # ──────────────────────────────────────────────────────────────────────
     # 방법 1: 모바일 around (filter=100 우선 → 일반 around fallback)
@@ -957,41 +1602,37 @@ def api_fetch_place_spots():
             r_around = None
             for _retry in range(2):
                 try:
-                    r_around = req.get(tab_url, headers=headers_m, timeout=15)
+                    r_around = naver_http.get(tab_url, headers=headers_m, timeout=15)
                     break
                 except Exception as _retry_err:
                     logger.warning(f"[PlaceSpots] retry {_retry+1}/2 ({tab_url}): {_retry_err}")
                     _time.sleep(1)
-            if r_around is None or r_around.status_code != 200:
+            if r_around is None:
+                continue
+            answered = answered or not _transient_status(r_around)
+            if r_around.status_code != 200:
                 continue
             r_around.encoding = "utf-8"
             text = r_around.text
 
-            apollo_idx = text.find("__APOLLO_STATE__")
-            if apollo_idx == -1:
-                continue
-            brace_pos = text.find("{", apollo_idx)
-            state, _ = _json.JSONDecoder().raw_decode(text[brace_pos:])
-
             # ROOT_QUERY trips items 순서로 추출 (순서 보장 필수)
-            rq = state.get("ROOT_QUERY", {})
+            # Apollo State 전체가 아닌 trips + 참조 엔트리만 디코딩
+            trip_items = place_parser.extract_trip_items(text)
+            if trip_items is None:
+                continue
             ordered_spots = []
-            for key, val in rq.items():
-                if "trips" in key.lower() and isinstance(val, dict):
-                    for ref_item in val.get("items", []):
-                        ref_key = ref_item.get("__ref", "")
-                        item = state.get(ref_key, {})
-                        name = item.get("name", "")
-                        category = item.get("category", "")
-                        if not name or name in ordered_spots:
-                            continue
-                        if use_filter:
-                            # filter=100: 네이버가 이미 명소 필터링 → 추가 필터 없이 그대로
-                            ordered_spots.append(name)
-                        else:
-                            # 일반 around: 카테고리 화이트리스트 필터링
-                            if is_spot_category(category):
-                                ordered_spots.append(name)
+            for item in trip_items:
+                name = item.get("name", "")
+                category = item.get("category", "")
+                if not name or name in ordered_spots:
+                    continue
+                if use_filter:
+                    # filter=100: 네이버가 이미 명소 필터링 → 추가 필터 없이 그대로
+                    ordered_spots.append(name)
+                else:
+                    # 일반 around: 카테고리 화이트리스트 필터링
+                    if is_spot_category(category):
+                        ordered_spots.append(name)
 
             if ordered_spots:
                 spots = ordered_spots
@@ -1007,28 +1648,22 @@ def api_fetch_place_spots():
     # ──────────────────────────────────────────────────────────────────────
     if not spots:
         try:
-            pc_home = req.get(
+            pc_home = naver_http.get(
                 f"https://pcmap.place.naver.com/{cat}/{pid}/home",
                 headers={**headers_pc, "Referer": f"https://pcmap.place.naver.com/{cat}/{pid}/home"},
                 timeout=15,
             )
+            answered = answered or not _transient_status(pc_home)
             if pc_home.status_code == 200:
                 pc_home.encoding = "utf-8"
                 text = pc_home.text
-                apollo_idx = text.find("__APOLLO_STATE__")
-                if apollo_idx != -1:
-                    brace_pos = text.find("{", apollo_idx)
-                    state, _ = _json.JSONDecoder().raw_decode(text[brace_pos:])
-                    rq = state.get("ROOT_QUERY", {})
-                    for key, val in rq.items():
-                        if "trips" in key.lower() and isinstance(val, dict):
-                            for ref in val.get("items", []):
-                                ref_key = ref.get("__ref", "")
-                                item = state.get(ref_key, {})
-                                name = item.get("name", "")
-                                category = item.get("category", "")
-                                if name and name not in spots and is_spot_category(category):
-                                    spots.append(name)
+                trip_items = place_parser.extract_trip_items(text)
+                if trip_items is not None:
+                    for item in trip_items:
+                        name = item.get("name", "")
+                        category = item.get("category", "")
+                        if name and name not in spots and is_spot_category(category):
+                            spots.append(name)
                     if spots:
                         method_used = "apollo_root_query"
                         logger.info(f"[PlaceSpots] Apollo ROOT: {len(spots)}개")
@@ -1042,7 +1677,7 @@ def api_fetch_place_spots():
         try:
             x_val, y_val = "", ""
             try:
-                coord_r = req.get(
+                coord_r = naver_http.get(
                     f"https://m.place.naver.com/{cat}/{pid}/home",
                     headers=headers_m, timeout=10,
                 )
@@ -1069,7 +1704,7 @@ def api_fetch_place_spots():
                 variables["input"]["x"] = x_val
                 variables["input"]["y"] = y_val
 
-            gr = req.post(
+            gr = naver_http.post(
                 "https://pcmap-api.place.naver.com/graphql",
                 json=[{"operationName": "getTrips", "variables": variables, "query": gql_query}],
                 headers={
@@ -1080,6 +1715,7 @@ def api_fetch_place_spots():
                 },
                 timeout=15,
             )
+            answered = answered or not _transient_status(gr)
             if gr.status_code == 200:
                 gdata = gr.json()
                 items = (
@@ -1094,12 +1730,41 @@ def api_fetch_place_spots():
         except Exception as e:
             logger.warning(f"[PlaceSpots] GraphQL 실패: {e}")
 
+    if not spots and not answered:
+        raise requests.ConnectionError(f"플레이스 명소 조회 일시 장애 ({cat}/{pid})")
+    return spots, method_used
+
+
+@app.route("/api/fetch-place-spots")
+def api_fetch_place_spots():
+    """플레이스 명소(가볼만한곳) 목록 자동 추출 (place_cache 우선, refresh=1 이면 재조회)
+    ?url=https://m.place.naver.com/restaurant/1326727196/home&nth=15
+    추출 방법/순서 원칙은 _scrape_place_spots 참고
+    """
+    place_url = request.args.get("url", "").strip()
+    nth = max(1, int(request.args.get("nth", 15)))  # nth=0 버그 방지 (0이하 → 1로 처리)
+
+    if not place_url:
+        return jsonify({"ok": False, "error": "url 파라미터 없음"})
+
+    pid, cat = _parse_place_url(place_url, "restaurant")
+    if not pid:
+        return jsonify({"ok": False, "error": "플레이스 ID 추출 실패"})
+
+    entry = None if _want_refresh() else meta_cache.get_place(pid, cat, "spots")
+    cached = entry is not None
+    if not cached:
+        entry = _fresh_place(pid, cat, "spots", _scrape_place_spots)
+    spots = entry["value"] or []
+    method_used = entry["method"] or ""
+
     if not spots:
         return jsonify({
             "ok": False,
             "pid": pid,
-            "error": "명소 목록 추출 실패",
+            "error": "네이버 응답 지연 — 잠시 후 다시 시도" if entry.get("transient") else "명소 목록 추출 실패",
             "hint": "모바일 around / Apollo / GraphQL 모두 실패",
+            "cached": cached,
         })
 
     # nth번째 추출 (15위 미만이면 마지막 항목 반환)
@@ -1118,26 +1783,169 @@ def api_fetch_place_spots():
         "spot_nth_clean": spot_nth_clean,  # 명시적 clean 필드
         "method": method_used,
         "filtered": True,
+        "cached": cached,
+        "fetched_at": entry["fetched_at"],
     })
 
 
-@app.route("/api/check-place-rank", methods=["POST"])
-def api_check_place_rank():
-    """키워드 검색 시 플레이스 구좌 여부 + 10위 내 순위 확인 (다중 방법)
-    
-    방법 우선순위:
-    1. m.map.naver.com/search2 (가장 정확, /place/{id} URL 패턴)
-    2. m.search.naver.com 모바일 검색 (JSON businessId + HTML selector)
-    3. Naver 로컬 검색 API (API 키 있을 때)
-    
-    POST {keywords: ["강남맛집"], url: "https://m.place.naver.com/restaurant/1326727196/home"}
-    Returns: {ok, results: [{keyword, has_section, rank, message, method}], rank_blocked}
+# 플레이스 순위 확인 시 동시에 처리할 키워드 수 (호스트별 상한은 naver_http.HOST_CONCURRENCY)
+PLACE_RANK_WORKERS = 6
+
+_PLACE_HEADERS_M = {
+    "User-Agent": "Mozilla/5.0 (iPhone; CPU iPhone OS 16_0 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/16.0 Mobile/15E148 Safari/604.1",
+    "Accept-Language": "ko-KR,ko;q=0.9,en;q=0.8",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Referer": "https://m.search.naver.com/",
+    "Accept-Encoding": "gzip, deflate",
+}
+
+
+def _place_ids_mmap(kw):
+    """m.map.naver.com/search2 방식 - place ID 추출 (URL + JSON 패턴 이중 확인)"""
+    try:
+        url = f"https://m.map.naver.com/search2/search.naver?query={quote(kw)}&type=PLACE"
+        r = naver_http.get(url, headers=_PLACE_HEADERS_M, timeout=10)
+        if r.status_code != 200:
+            return None, f"HTTP {r.status_code}"
+        # /place/{id} URL 패턴 우선 + "id":숫자 JSON 패턴(Render 서버 봇 환경 대비) 합산
+        return place_parser.parse_mmap(r.text), "mmap"
+    except Exception as e:
+        return None, str(e)[:60]
+
+
+def _place_ids_msearch(kw):
+    """m.search.naver.com 모바일 검색 방식"""
+    try:
+        url = f"https://m.search.naver.com/search.naver?where=m&query={quote(kw)}"
+        r = naver_http.get(url, headers=_PLACE_HEADERS_M, timeout=10)
+        r.encoding = "utf-8"
+        # m.search는 businessId JSON 없음 → place URL 패턴(/restaurant/{id}, /cafe/{id} 등) 우선
+        # + div.place_section 존재 여부를 한 번의 스캔으로 확인
+        all_ids, has_section = place_parser.parse_msearch(r.text)
+        return all_ids, has_section, "msearch"
+    except Exception as e:
+        return None, False, str(e)[:60]
+
+
+def _place_ids_local_api(kw, client_id, client_secret):
+    """Naver 로컬 검색 API 방식"""
+    if not (client_id and client_secret):
+        return None, "API 키 없음"
+    try:
+        api_url = (f"https://openapi.naver.com/v1/search/local.json"
+                   f"?query={quote(kw)}&display=10&start=1")
+        r = naver_http.get(api_url, headers={
+            "X-Naver-Client-Id": client_id,
+            "X-Naver-Client-Secret": client_secret,
+        }, timeout=8)
+        api_keys.record(client_id, "rate_limit" if r.status_code == 429 else None)
+        if r.status_code == 200:
+            items = r.json().get("items", [])
+            ids = []
+            for item in items:
+                lm = re.search(r'/(\d{8,12})', item.get("link", ""))
+                if lm:
+                    ids.append(lm.group(1))
+            return ids, "naver_api"
+        return None, f"API HTTP {r.status_code}"
+    except Exception as e:
+        return None, str(e)[:60]
+
+
+def _check_place_keyword(kw, target_id, client_id, client_secret):
+    """키워드 1개 플레이스 순위 확인 (스레드에서 실행) → (result, blocked)
+
+    검색 결과(place ID 목록)는 대상 업체와 무관하므로 같은 키워드를 동시에 확인하는 요청끼리 singleflight 로 공유
     """
-    import requests as req
-    from bs4 import BeautifulSoup as _BS4
-    import urllib.parse as _ulp
+    result = {"keyword": kw, "has_section": False, "rank": None, "message": "", "method": ""}
+    blocked = False
+
+    try:
+        # ── 방법 1: m.map 방식 (최우선) ─────────────────────
+        mmap_ids, mmap_msg = singleflight.do("place_mmap", kw, lambda: _place_ids_mmap(kw))
+
+        if mmap_ids is not None:
+            # mmap 결과로 순위 확인
+            # has_section은 id가 존재하면 플레이스 구좌 있음
+            has_sec = len(mmap_ids) > 0
+            result["has_section"] = has_sec
+            result["method"] = "m.map"
+
+            if target_id in mmap_ids[:30]:
+                # mmap에서 순위 확인
+                rank = mmap_ids.index(target_id) + 1
+                result["rank"] = rank
+                result["has_section"] = True
+                result["message"] = f"✅ {rank}위 확인 (m.map)"
+                if rank > 10:
+                    result["message"] = f"⚠️ {rank}위 — 10위 밖, 키워드 변경 권장"
+                    blocked = True
+            else:
+                # mmap 30위 밖 or 결과 없음 → m.search로 재확인
+                msearch_ids, has_sec2, msearch_msg = singleflight.do("place_msearch", kw,
+                                                                     lambda: _place_ids_msearch(kw))
+                result["method"] = "m.search(fallback)"
+
+                if msearch_ids and target_id in msearch_ids[:30]:
+                    rank = msearch_ids.index(target_id) + 1
+                    result["rank"] = rank
+                    result["has_section"] = True
+                    result["message"] = f"✅ {rank}위 확인 (검색)"
+                    if rank > 10:
+                        result["message"] = f"⚠️ {rank}위 — 10위 밖"
+                        blocked = True
+                elif has_sec2:
+                    # 구좌는 있으나 30위 밖
+                    total = len(mmap_ids) if mmap_ids else len(msearch_ids or [])
+                    result["has_section"] = True
+                    result["message"] = f"플레이스 구좌 있으나 30위 밖 (총 {total}개) ⚠️"
+                    blocked = True
+                else:
+                    result["has_section"] = has_sec2
+                    result["message"] = "플레이스 구좌 없음 — 키워드 변경 필요 ⚠️"
+                    blocked = True
+        else:
+            # m.map 실패 → m.search 시도
+            logger.warning(f"[PlaceRank] m.map 실패: {mmap_msg}, m.search로 재시도")
+            msearch_ids, has_sec2, msearch_msg = singleflight.do("place_msearch", kw,
+                                                                     lambda: _place_ids_msearch(kw))
+            result["has_section"] = has_sec2
+            result["method"] = "m.search"
+
+            if not has_sec2:
+                result["message"] = "플레이스 구좌 없음 — 키워드 변경 필요 ⚠️"
+                blocked = True
+            elif msearch_ids and target_id in msearch_ids[:30]:
+                rank = msearch_ids.index(target_id) + 1
+                result["rank"] = rank
+                result["message"] = f"✅ {rank}위 확인"
+                if rank > 10:
+                    result["message"] = f"⚠️ {rank}위 — 10위 밖"
+                    blocked = True
+            else:
+                # Naver API로 최종 시도
+                api_ids, api_msg = singleflight.do(
+                    "place_local", kw, lambda: _place_ids_local_api(kw, client_id, client_secret))
+                result["method"] = "naver_api"
+                if api_ids and target_id in api_ids:
+                    rank = api_ids.index(target_id) + 1
+                    result["rank"] = rank
+                    result["has_section"] = True
+                    result["message"] = f"✅ {rank}위 확인 (API)"
+                else:
+                    result["message"] = f"30위 밖 — 키워드 변경 권장 ⚠️ (시도: mmap→search→api)"
+                    blocked = True
+
+    except Exception as e:
+        result["message"] = f"확인 오류: {str(e)[:80]}"
+        logger.error(f"[PlaceRank] 예외: {e}")
 
-    data      = request.get_json(force=True) or {}
+    logger.info(f"[PlaceRank] kw={kw} target={target_id} → rank={result.get('rank')} method={result.get('method')} msg={result.get('message','')[:60]}")
+    return result, blocked
+
+
+def _place_rank_request(data):
+    """check-place-rank 요청 body → (keywords, target_id, error)"""
     keywords_raw = data.get("keywords", [])
     place_url = data.get("url", "")
 
@@ -1154,201 +1962,90 @@ def api_check_place_rank():
     keywords = [_safe_decode_kw(k) for k in keywords_raw]
 
     if not place_url:
-        return jsonify({"ok": False, "error": "url 필요"})
-
+        return keywords, None, "url 필요"
     m = re.search(r'naver\.com/[^/?#]+/(\d+)', place_url)
     if not m:
-        return jsonify({"ok": False, "error": "플레이스 URL에서 ID 추출 실패"})
-    target_id = m.group(1)
-
-    client_id, client_secret = get_api_keys()
-
-    headers_m = {
-        "User-Agent": "Mozilla/5.0 (iPhone; CPU iPhone OS 16_0 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/16.0 Mobile/15E148 Safari/604.1",
-        "Accept-Language": "ko-KR,ko;q=0.9,en;q=0.8",
-        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
-        "Referer": "https://m.search.naver.com/",
-        "Accept-Encoding": "gzip, deflate",
-    }
-
-    results = []
-    rank_blocked = False
+        return keywords, None, "플레이스 URL에서 ID 추출 실패"
+    return keywords, m.group(1), None
 
-    def _extract_place_ids_mmap(kw):
-        """m.map.naver.com/search2 방식 - place ID 추출 (URL + JSON 패턴 이중 확인)"""
-        try:
-            url = f"https://m.map.naver.com/search2/search.naver?query={_ulp.quote(kw)}&type=PLACE"
-            r = req.get(url, headers=headers_m, timeout=10)
-            if r.status_code != 200:
-                return None, f"HTTP {r.status_code}"
-            # 패턴1: /place/{id} URL 패턴 (일반)
-            url_ids = re.findall(r'/place/(\d{8,12})', r.text)
-            # 패턴2: "id":숫자 JSON 패턴 (Render 서버 봇 환경 대비)
-            json_ids = re.findall(r'"id"\s*:\s*(\d{8,12})', r.text)
-            # 합산: URL 패턴 우선 + JSON 전용 ID 추가 (중복 제거)
-            combined = list(dict.fromkeys(url_ids + [i for i in json_ids if i not in url_ids]))
-            return combined, "mmap"
-        except Exception as e:
-            return None, str(e)[:60]
-
-    def _extract_place_ids_msearch(kw):
-        """m.search.naver.com 모바일 검색 방식"""
-        try:
-            url = f"https://m.search.naver.com/search.naver?where=m&query={_ulp.quote(kw)}"
-            r = req.get(url, headers=headers_m, timeout=10)
-            r.encoding = "utf-8"
-            text = r.text
-            
-            # URL 패턴들 (m.search는 businessId JSON 없음, place URL 패턴 사용)
-            # /restaurant/{id}, /cafe/{id}, /place/{id} 등
-            url_ids = re.findall(r'place\.naver\.com/[^/]+/(\d{8,12})', text)
-            html_ids = re.findall(r'naver\.com/[^/?#]+/(\d{8,12})', text)
-            
-            # 통합 및 순서 유지 (URL 패턴 우선)
-            all_ids = list(dict.fromkeys(url_ids + html_ids))
-            
-            # place_section 확인
-            soup = _BS4(r.content, "html.parser", from_encoding="utf-8")
-            has_section = len(soup.select("div.place_section")) > 0
-            
-            return all_ids, has_section, "msearch"
-        except Exception as e:
-            return None, False, str(e)[:60]
 
-    def _check_via_naver_api(kw):
-        """Naver 로컬 검색 API 방식"""
-        if not (client_id and client_secret):
-            return None, "API 키 없음"
-        try:
-            api_url = (f"https://openapi.naver.com/v1/search/local.json"
-                       f"?query={_ulp.quote(kw)}&display=10&start=1")
-            r = req.get(api_url, headers={
-                "X-Naver-Client-Id": client_id,
-                "X-Naver-Client-Secret": client_secret,
-            }, timeout=8)
-            if r.status_code == 200:
-                items = r.json().get("items", [])
-                ids = []
-                for item in items:
-                    lm = re.search(r'/(\d{8,12})', item.get("link", ""))
-                    if lm:
-                        ids.append(lm.group(1))
-                return ids, "naver_api"
-            return None, f"API HTTP {r.status_code}"
-        except Exception as e:
-            return None, str(e)[:60]
+def _iter_place_rank(keywords, target_id):
+    """키워드별 플레이스 순위 확인 — 끝나는 대로 ("result", {...}) yield, 마지막에 ("summary", {...})
 
-    for kw in keywords:
-        if not kw:
+    호스트별 동시 요청 수는 naver_http 가 제한. summary 의 results 는 요청 키워드 순서.
+    """
+    client_id, client_secret = get_api_keys()
+    targets = [kw for kw in keywords if kw]
+    outcomes = [None] * len(targets)
+    check = lambda kw: _check_place_keyword(kw, target_id, client_id, client_secret)
+    for i, outcome in _iter_concurrent(check, targets, PLACE_RANK_WORKERS):
+        if i is None:
+            yield "ping", {}
             continue
-        result = {"keyword": kw, "has_section": False, "rank": None, "message": "", "method": ""}
+        outcomes[i] = outcome
+        result, blocked = outcome
+        yield "result", {"index": i, **result, "blocked": blocked}
+    yield "summary", {
+        "ok": True,
+        "results": [r for r, _ in outcomes],
+        "rank_blocked": any(b for _, b in outcomes),
+    }
 
-        try:
-            # ── 방법 1: m.map 방식 (최우선) ─────────────────────
-            mmap_ids, mmap_msg = _extract_place_ids_mmap(kw)
-            
-            if mmap_ids is not None:
-                # mmap 결과로 순위 확인
-                # has_section은 id가 존재하면 플레이스 구좌 있음
-                has_sec = len(mmap_ids) > 0
-                result["has_section"] = has_sec
-                result["method"] = "m.map"
-                
-                if target_id in mmap_ids[:30]:
-                    # mmap에서 순위 확인
-                    rank = mmap_ids.index(target_id) + 1
-                    result["rank"] = rank
-                    result["has_section"] = True
-                    result["message"] = f"✅ {rank}위 확인 (m.map)"
-                    if rank > 10:
-                        result["message"] = f"⚠️ {rank}위 — 10위 밖, 키워드 변경 권장"
-                        rank_blocked = True
-                else:
-                    # mmap 30위 밖 or 결과 없음 → m.search로 재확인
-                    msearch_ids, has_sec2, msearch_msg = _extract_place_ids_msearch(kw)
-                    result["method"] = "m.search(fallback)"
-                    
-                    if msearch_ids and target_id in msearch_ids[:30]:
-                        rank = msearch_ids.index(target_id) + 1
-                        result["rank"] = rank
-                        result["has_section"] = True
-                        result["message"] = f"✅ {rank}위 확인 (검색)"
-                        if rank > 10:
-                            result["message"] = f"⚠️ {rank}위 — 10위 밖"
-                            rank_blocked = True
-                    elif has_sec2:
-                        # 구좌는 있으나 30위 밖
-                        total = len(mmap_ids) if mmap_ids else len(msearch_ids or [])
-                        result["has_section"] = True
-                        result["message"] = f"플레이스 구좌 있으나 30위 밖 (총 {total}개) ⚠️"
-                        rank_blocked = True
-                    else:
-                        result["has_section"] = has_sec2
-                        result["message"] = "플레이스 구좌 없음 — 키워드 변경 필요 ⚠️"
-                        rank_blocked = True
-            else:
-                # m.map 실패 → m.search 시도
-                logger.warning(f"[PlaceRank] m.map 실패: {mmap_msg}, m.search로 재시도")
-                msearch_ids, has_sec2, msearch_msg = _extract_place_ids_msearch(kw)
-                result["has_section"] = has_sec2
-                result["method"] = "m.search"
-                
-                if not has_sec2:
-                    result["message"] = "플레이스 구좌 없음 — 키워드 변경 필요 ⚠️"
-                    rank_blocked = True
-                elif msearch_ids and target_id in msearch_ids[:30]:
-                    rank = msearch_ids.index(target_id) + 1
-                    result["rank"] = rank
-                    result["message"] = f"✅ {rank}위 확인"
-                    if rank > 10:
-                        result["message"] = f"⚠️ {rank}위 — 10위 밖"
-                        rank_blocked = True
-                else:
-                    # Naver API로 최종 시도
-                    api_ids, api_msg = _check_via_naver_api(kw)
-                    result["method"] = "naver_api"
-                    if api_ids and target_id in api_ids:
-                        rank = api_ids.index(target_id) + 1
-                        result["rank"] = rank
-                        result["has_section"] = True
-                        result["message"] = f"✅ {rank}위 확인 (API)"
-                    else:
-                        result["message"] = f"30위 밖 — 키워드 변경 권장 ⚠️ (시도: mmap→search→api)"
-                        rank_blocked = True
 
-        except Exception as e:
-            result["message"] = f"확인 오류: {str(e)[:80]}"
-            logger.error(f"[PlaceRank] 예외: {e}")
+@app.route("/api/check-place-rank", methods=["POST"])
+def api_check_place_rank():
+    """키워드 검색 시 플레이스 구좌 여부 + 10위 내 순위 확인 (다중 방법)
+    
+    방법 우선순위:
+    1. m.map.naver.com/search2 (가장 정확, /place/{id} URL 패턴)
+    2. m.search.naver.com 모바일 검색 (JSON businessId + HTML selector)
+    3. Naver 로컬 검색 API (API 키 있을 때)
+    
+    POST {keywords: ["강남맛집"], url: "https://m.place.naver.com/restaurant/1326727196/home"}
+    Returns: {ok, results: [{keyword, has_section, rank, message, method}], rank_blocked}
+    """
+    data = request.get_json(force=True) or {}
+    keywords, target_id, error = _place_rank_request(data)
+    if error:
+        return jsonify({"ok": False, "error": error})
 
-        results.append(result)
-        logger.info(f"[PlaceRank] kw={kw} target={target_id} → rank={result.get('rank')} method={result.get('method')} msg={result.get('message','')[:60]}")
+    summary = {}
+    for kind, payload in _iter_place_rank(keywords, target_id):
+        if kind == "summary":
+            summary = payload
+    return jsonify(summary)
 
-    return jsonify({"ok": True, "results": results, "rank_blocked": rank_blocked})
 
+@app.route("/api/check-place-rank/stream", methods=["POST"])
+def api_check_place_rank_stream():
+    """/api/check-place-rank 스트리밍 버전 — 키워드 결과가 나오는 대로 전송
 
+    기본 NDJSON(한 줄 = 이벤트 1개), ?format=sse 또는 Accept: text/event-stream 이면 SSE.
+    이벤트: start {total} → result {index, keyword, has_section, rank, message, method, blocked} ...
+            → summary {ok, results, rank_blocked}  (대기 중 ping, 요청 오류 시 error)
+    """
+    data = request.get_json(force=True) or {}
+    keywords, target_id, error = _place_rank_request(data)
 
+    def events():
+        if error:
+            yield "error", {"ok": False, "error": error}
+            return
+        yield "start", {"total": len([k for k in keywords if k])}
+        yield from _iter_place_rank(keywords, target_id)
+    return _stream_response(events())
 
-@app.route("/api/automation/place-excel-fill", methods=["POST"])
-def api_place_excel_fill():
-    """플레이스 미션 엑셀 다운로드 (템플릿에 채우기)
+
+def _fill_place_workbook(campaigns, use_default=True, start_row=3, start_col_letter="A",
+                         src=None, src_name=None, progress=None):
+    """플레이스 미션 템플릿에 캠페인 채우기 → (워크북, 다운로드 파일명)
     B열=APP, I=키워드, J=미션내용(플레이스), K=정답(명소명), L=네이버앱랜딩, M=업체명블러
     병합: A,C,D,E,F,G,H,N,O / 수식보존: E,F,G,H,O
+    src: 업로드 템플릿 (바이너리 파일 객체) / progress(done, total): 캠페인 단위 진행률 콜백
     """
     import openpyxl
     from openpyxl.styles import Alignment, Border, Side
     from openpyxl.utils import column_index_from_string
-    from io import BytesIO
-    import json as _json
-    import os
-
-    use_default      = request.form.get("use_default", "1") == "1"
-    payload          = request.form.get("payload", "{}")
-    start_row        = int(request.form.get("start_row", 3))
-    start_col_letter = request.form.get("start_col", "A").upper().strip()
-    file             = request.files.get("file")
-
-    data      = _json.loads(payload)
-    campaigns = data.get("campaigns", [])
 
     DEFAULT_TEMPLATE = os.path.join(
         os.path.dirname(__file__),
@@ -1357,13 +2054,13 @@ def api_place_excel_fill():
     if use_default and os.path.exists(DEFAULT_TEMPLATE):
         wb = _load_workbook_safe(DEFAULT_TEMPLATE)
         out_name = "엑셀 다운로드 ( 비상용 ) - 플레이스.xlsx"
-    elif file:
+    elif src is not None:
         try:
-            wb = _load_workbook_safe(BytesIO(file.read()))
+            wb = _load_workbook_safe(src)
         except Exception:
-            file.seek(0)
-            wb = openpyxl.load_workbook(BytesIO(file.read()), read_only=False, data_only=True)
-        out_name = f"filled_{file.filename}"
+            src.seek(0)
+            wb = openpyxl.load_workbook(src, read_only=False, data_only=True)
+        out_name = f"filled_{src_name}"
     else:
         wb = openpyxl.Workbook()
         out_name = "place_campaign.xlsx"
@@ -1384,7 +2081,9 @@ def api_place_excel_fill():
         return Border(left=s, right=s, top=s, bottom=s)
 
     row_num = start_row
-    for camp in campaigns:
+    for ci, camp in enumerate(campaigns):
+        if progress:
+            progress(ci, len(campaigns))
         rows_data = camp.get("rows", [])
         camp_start_row = row_num
 
@@ -1437,39 +2136,43 @@ def api_place_excel_fill():
             except Exception:
                 pass
 
-    output = BytesIO()
-    wb.save(output)
-    output.seek(0)
-    return output.read(), 200, {
-        "Content-Type": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        "Content-Disposition": "attachment; filename*=UTF-8''" + __import__('urllib.parse', fromlist=['quote']).quote(out_name, safe='')
+    return wb, out_name
+
+
+def _fill_form_params(default_use_default):
+    """excel-fill / place-excel-fill 공통 multipart 폼 파싱"""
+    data = json.loads(request.form.get("payload", "{}"))
+    return {
+        "campaigns":        data.get("campaigns", []),
+        "use_default":      request.form.get("use_default", default_use_default) == "1",
+        "start_row":        int(request.form.get("start_row", 3)),
+        "start_col_letter": request.form.get("start_col", "A").upper().strip(),
     }
 
+
+@app.route("/api/automation/place-excel-fill", methods=["POST"])
+def api_place_excel_fill():
+    """플레이스 미션 엑셀 다운로드 (동기) — 큰 작업은 POST /api/jobs/place-excel-fill"""
+    file = request.files.get("file")
+    wb, out_name = _fill_place_workbook(**_fill_form_params("1"),
+                                        src=file.stream if file else None,
+                                        src_name=file.filename if file else None)
+    return _xlsx_response(wb, out_name)
+
 # ════════════════════════════════════════════
 # Excel 기존 파일 채우기 (v15 구조)
 # ════════════════════════════════════════════
-@app.route("/api/automation/excel-fill", methods=["POST"])
-def api_excel_fill():
-    """기존 XLSX(템플릿) 파일에 캠페인 데이터 삽입 — v15 구조
+def _fill_shop_workbook(campaigns, use_default=False, start_row=3, start_col_letter="A",
+                        src=None, src_name=None, progress=None):
+    """기존 XLSX(템플릿)에 캠페인 데이터 삽입 — v15 구조 → (워크북, 다운로드 파일명)
     v15 컬럼: A(1)~O(15), 데이터 시작행=3, 헤더 2행
     병합: A,C,D,E,F,G,H(포인트수식),N(일유입),O(글자수수식)
     수식 보존: E,F,G,H,O (col_offset 4,5,6,7,14)
+    src: 업로드 템플릿 (바이너리 파일 객체) / progress(done, total): 캠페인 단위 진행률 콜백
     """
     import openpyxl
     from openpyxl.styles import Alignment, Font, PatternFill, Border, Side
     from openpyxl.utils import column_index_from_string, get_column_letter
-    from io import BytesIO
-    import json as _json
-    import os
-
-    file             = request.files.get("file")
-    use_default      = request.form.get("use_default", "0") == "1"
-    payload          = request.form.get("payload", "{}")
-    start_row        = int(request.form.get("start_row", 3))
-    start_col_letter = request.form.get("start_col", "A").upper().strip()
-
-    data      = _json.loads(payload)
-    campaigns = data.get("campaigns", [])
 
     DEFAULT_TEMPLATE = os.path.join(
         os.path.dirname(__file__),
@@ -1478,13 +2181,13 @@ def api_excel_fill():
     if use_default and os.path.exists(DEFAULT_TEMPLATE):
         wb = _load_workbook_safe(DEFAULT_TEMPLATE)
         out_name = "엑셀 다운로드 ( 비상용 ) - 쇼핑.xlsx"
-    elif file:
+    elif src is not None:
         try:
-            wb = _load_workbook_safe(BytesIO(file.read()))
+            wb = _load_workbook_safe(src)
         except Exception:
-            file.seek(0)
-            wb = openpyxl.load_workbook(BytesIO(file.read()), read_only=False, data_only=True)
-        out_name = f"filled_{file.filename}"
+            src.seek(0)
+            wb = openpyxl.load_workbook(src, read_only=False, data_only=True)
+        out_name = f"filled_{src_name}"
     else:
         wb = openpyxl.Workbook()
         out_name = "filled_campaign.xlsx"
@@ -1515,6 +2218,8 @@ def api_excel_fill():
 
     row_num = start_row
     for ci, camp in enumerate(campaigns):
+        if progress:
+            progress(ci, len(campaigns))
         rows_data = camp.get("rows", [])
         camp_start_row = row_num
 
@@ -1577,15 +2282,122 @@ def api_excel_fill():
             except Exception:
                 pass
 
-    output = BytesIO()
-    wb.save(output)
-    output.seek(0)
-    import urllib.parse as _uparse
-    safe_name = _uparse.quote(out_name, safe='')
-    return output.read(), 200, {
-        "Content-Type": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        "Content-Disposition": "attachment; filename*=UTF-8''" + safe_name
-    }
+    return wb, out_name
+
+
+@app.route("/api/automation/excel-fill", methods=["POST"])
+def api_excel_fill():
+    """기존 XLSX(템플릿) 파일에 캠페인 데이터 삽입 (동기) — 큰 작업은 POST /api/jobs/excel-fill"""
+    file = request.files.get("file")
+    wb, out_name = _fill_shop_workbook(**_fill_form_params("0"),
+                                       src=file.stream if file else None,
+                                       src_name=file.filename if file else None)
+    return _xlsx_response(wb, out_name)
+
+
+# ════════════════════════════════════════════
+# 백그라운드 작업 API (jobs.py)
+# POST /api/jobs/<kind> → job id 즉시 반환 / GET 상태 폴링 / 완료 후 파일 다운로드
+# 요청 body 는 같은 이름의 동기 엔드포인트와 동일
+# ════════════════════════════════════════════
+def _job_excel_export(job, campaigns, export_type):
+    wb = _build_export_workbook(campaigns, export_type, progress=job.progress)
+    wb.save(job.artifact_path("campaign.xlsx"))
+    return {"campaigns": len(campaigns)}
+
+
+def _job_excel_fill(job, fill, campaigns, use_default, start_row, start_col_letter,
+                    src_path=None, src_name=None):
+    src = open(src_path, "rb") if src_path else None
+    try:
+        wb, out_name = fill(campaigns, use_default, start_row, start_col_letter,
+                            src=src, src_name=src_name, progress=job.progress)
+    finally:
+        if src:
+            src.close()
+    wb.save(job.artifact_path(out_name))
+    return {"campaigns": len(campaigns)}
+
+
+def _job_check_place_rank(job, keywords, target_id):
+    total = len([k for k in keywords if k])
+    done, summary = 0, {}
+    for kind, payload in _iter_place_rank(keywords, target_id):
+        if kind == "result":
+            done += 1
+            job.progress(done, total, payload.get("keyword", ""))
+        elif kind == "summary":
+            summary = payload
+    return summary
+
+
+def _job_params(kind, job_id):
+    """요청 → 작업 함수 인자 (업로드 파일은 요청 스레드에서 작업 디렉터리에 저장)"""
+    if kind == "excel-export":
+        data = request.get_json(force=True) or {}
+        return _job_excel_export, {"campaigns": data.get("campaigns", []),
+                                   "export_type": data.get("type", "shop")}
+    if kind in ("excel-fill", "place-excel-fill"):
+        place = kind == "place-excel-fill"
+        params = _fill_form_params("1" if place else "0")
+        params["fill"] = _fill_place_workbook if place else _fill_shop_workbook
+        file = request.files.get("file")
+        if file:
+            params["src_path"] = os.path.join(jobs.job_dir(job_id), "input.xlsx")
+            params["src_name"] = file.filename
+            file.save(params["src_path"])
+        return _job_excel_fill, params
+    if kind == "check-place-rank":
+        keywords, target_id, error = _place_rank_request(request.get_json(force=True) or {})
+        if error:
+            raise ValueError(error)
+        return _job_check_place_rank, {"keywords": keywords, "target_id": target_id}
+    return None, None
+
+
+JOB_KINDS = ("excel-export", "excel-fill", "place-excel-fill", "check-place-rank")
+
+
+@app.route("/api/jobs/<kind>", methods=["POST"])
+def api_job_submit(kind):
+    """작업 등록 → 202 {ok, job_id, status_url}"""
+    if kind not in JOB_KINDS:
+        return jsonify({"ok": False, "error": f"알 수 없는 작업 종류: {kind}"}), 404
+    try:
+        job_id = jobs.create(kind)
+    except jobs.QueueFull as e:
+        return jsonify({"ok": False, "error": str(e)}), 429
+    try:
+        fn, params = _job_params(kind, job_id)
+    except Exception as e:
+        jobs.discard(job_id)
+        return jsonify({"ok": False, "error": f"요청 오류: {str(e)[:200]}"}), 400
+    jobs.submit(job_id, fn, **params)
+    logger.info(f"[Job] {job_id} 등록 kind={kind}")
+    return jsonify({"ok": True, "job_id": job_id,
+                    "status_url": url_for("api_job_status", job_id=job_id)}), 202
+
+
+@app.route("/api/jobs/<job_id>")
+def api_job_status(job_id):
+    """작업 상태 {ok, id, kind, status, done, total, message, result, error, download_url}"""
+    job = jobs.get(job_id)
+    if job is None:
+        return jsonify({"ok": False, "error": "작업이 없거나 만료되었습니다."}), 404
+    if job.pop("has_artifact"):
+        job["download_url"] = url_for("api_job_download", job_id=job_id)
+    return jsonify({"ok": True, **job})
+
+
+@app.route("/api/jobs/<job_id>/download")
+def api_job_download(job_id):
+    """완료된 작업의 결과 파일"""
+    from flask import send_file
+    path, name = jobs.artifact(job_id)
+    if not path:
+        return jsonify({"ok": False, "error": "다운로드할 결과가 없습니다."}), 404
+    return send_file(path, as_attachment=True, download_name=name,
+                     mimetype=XLSX_MIMETYPE if name.endswith(".xlsx") else None)
 
 
 # 하위 호환 라우트
@@ -1598,9 +2410,8 @@ def add_keyword_compat():
     return redirect(url_for("index"))
 
 
-with app.app_context():
-    init_db()
-
 if __name__ == "__main__":
     port = int(os.environ.get("PORT", 5000))
+    create_app()
+    start_background()
     app.run(debug=False, host="0.0.0.0", port=port)
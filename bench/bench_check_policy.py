@@ -0,0 +1,151 @@
+"""
+check_policy 시뮬레이션 — 전체 탐색(기존) vs 변동성 기반 정책의 API 호출 수 / 순위 정확도 비교
+
+조합 유형별 가상 순위 시계열(하루 1회 추적)을 만들고, 실제 API 대신
+"순위가 있는 페이지까지 호출" 하는 모델로 두 정책의 호출 수를 센다.
+정확도는 매일 대시보드에 보이는 순위(마지막 기록)와 실제 순위의 차이로 비교.
+회차 시각은 매일 11:00 ± --jitter 분 (스케줄러 실행 시각 흔들림) — 미발견 간격(NF_BASE_H 부터 2배씩)과
+안정 조합 전체 탐색(STABLE_FULL_H)이 흔들림 때문에 하루씩 밀리지 않는지도 확인한다.
+
+  stable   : 거의 고정 (±1~2위)
+  drift    : 천천히 이동
+  volatile : 매일 크게 출렁임
+  missing  : 1000위 밖 (가끔 잠깐 진입)
+  jump     : 안정적이다가 어느 날 크게 이동 (probe → 전체 탐색 전환 확인)
+
+사용법:
+  python bench/bench_check_policy.py             # 조합 유형별 40개, 60일
+  python bench/bench_check_policy.py -n 100 -d 90
+  python bench/bench_check_policy.py --jitter 0   # 정각 실행
+"""
+import os
+import sys
+import random
+import math
+import argparse
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import check_policy  # noqa: E402
+from engine import probe_accepts  # noqa: E402
+
+MAX_PAGES = 10
+MISS = 1001   # 정확도 계산용 "미발견" 순위
+
+
+def series(kind, days, rnd):
+    r = rnd.randint(5, 800)
+    out = []
+    for d in range(days):
+        if kind == "stable":
+            r = max(1, r + rnd.choice((-1, 0, 0, 0, 1)))
+        elif kind == "drift":
+            r = max(1, min(1000, r + rnd.randint(-8, 8)))
+        elif kind == "volatile":
+            r = max(1, min(1000, int(r * rnd.uniform(0.5, 1.6))))
+        elif kind == "jump" and d == days // 2:
+            r = max(1, min(1000, r + rnd.choice((-1, 1)) * rnd.randint(100, 300)))
+        out.append(None if kind == "missing" and rnd.random() > 0.05 else r)
+    return out
+
+
+def full_scan(rank):
+    """(호출 수, 결과 순위)"""
+    return (MAX_PAGES if rank is None else (rank - 1) // 100 + 1), rank
+
+
+def run_policy(truth, adaptive, t0, jitter=0, rnd=None, log=None):
+    """log 를 주면 회차마다 (일, 확인 방식, 기록 전 stats) 를 남긴다"""
+    hist, calls, err = [], 0, 0
+    for d, rank in enumerate(truth):
+        now = t0 + timedelta(days=d, minutes=rnd.uniform(-jitter, jitter) if jitter else 0)
+        st = check_policy.summarize(hist) if hist else None
+        mode, hint = check_policy.decide(st, now) if adaptive else ("full", None)
+        scan = mode
+        if log is not None:
+            log.append((d, mode, st))
+        if mode == "probe":
+            calls += 1
+            found = rank if rank is not None and (rank - 1) // 100 == (hint - 1) // 100 else None
+            if probe_accepts(hint, found):
+                got = found
+            else:
+                c, got = full_scan(rank)
+                calls += c
+                scan = "full"
+        elif mode == "full":
+            c, got = full_scan(rank)
+            calls += c
+        if mode != "skip":
+            hist.insert(0, {"rank": got, "scan": scan, "checked_at": now.strftime("%Y-%m-%d %H:%M:%S")})
+            del hist[check_policy.HISTORY_N:]
+        shown = hist[0]["rank"] if hist else None
+        err += abs((shown or MISS) - (rank or MISS))
+    return calls, err / len(truth)
+
+
+def check_schedule(days, t0, jitter, rnd) -> list[str]:
+    """흔들림이 있어도 간격 규칙대로 확인하는지 — 어긋난 회차 설명 목록 (빈 목록 = 정상)"""
+    bad = []
+    # 계속 미발견: NF_STREAK 회 이후 간격 NF_BASE_H, 2배씩, NF_MAX_H 까지 → 일 단위로 올림
+    log = []
+    run_policy([None] * days, True, t0, jitter, rnd, log)
+    checked = [(d, st) for d, mode, st in log if mode != "skip"]
+    for (d0, _), (d1, st) in zip(checked, checked[1:]):
+        if st and st["nf_streak"] >= check_policy.NF_STREAK:
+            interval = min(check_policy.NF_BASE_H * 2 ** (st["nf_streak"] - check_policy.NF_STREAK),
+                           check_policy.NF_MAX_H)
+            want = max(1, math.ceil(interval / 24))
+            if d1 - d0 != want:
+                bad.append(f"미발견 streak {st['nf_streak']}: {d0}일 → {d1}일 (기대 {want}일 간격)")
+    # 고정 순위: probe 사이 STABLE_FULL_H 마다 전체 탐색
+    log = []
+    run_policy([123] * days, True, t0, jitter, rnd, log)
+    fulls = [d for d, mode, st in log if mode == "full" and st and st["samples"] >= check_policy.MIN_SAMPLES]
+    want = max(1, math.ceil(check_policy.STABLE_FULL_H / 24))
+    for d0, d1 in zip(fulls, fulls[1:]):
+        if d1 - d0 != want:
+            bad.append(f"안정 전체 탐색: {d0}일 → {d1}일 (기대 {want}일 간격)")
+    return bad
+
+
+def main():
+    ap = argparse.ArgumentParser(description="check_policy 시뮬레이션")
+    ap.add_argument("-n", type=int, default=40, help="조합 유형별 개수")
+    ap.add_argument("-d", type=int, default=60, help="일 수")
+    ap.add_argument("--seed", type=int, default=7)
+    ap.add_argument("--jitter", type=float, default=15, help="회차 시각 흔들림 ± 분")
+    args = ap.parse_args()
+
+    rnd = random.Random(args.seed)
+    t0 = datetime(2026, 1, 1, 11, 0)
+    print(f"{'유형':<9} {'기존 호출':>9} {'정책 호출':>9} {'절감':>6}   {'기존 오차':>8} {'정책 오차':>8}")
+    tot_base = tot_pol = 0
+    for kind in ("stable", "drift", "volatile", "missing", "jump"):
+        base_calls = pol_calls = base_err = pol_err = 0
+        for _ in range(args.n):
+            truth = series(kind, args.d, rnd)
+            c, e = run_policy(truth, False, t0, args.jitter, rnd)
+            base_calls += c
+            base_err += e
+            c, e = run_policy(truth, True, t0, args.jitter, rnd)
+            pol_calls += c
+            pol_err += e
+        tot_base += base_calls
+        tot_pol += pol_calls
+        print(f"{kind:<9} {base_calls:>9,} {pol_calls:>9,} {1 - pol_calls / base_calls:>6.0%}   "
+              f"{base_err / args.n:>8.1f} {pol_err / args.n:>8.1f}")
+    print(f"{'합계':<9} {tot_base:>9,} {tot_pol:>9,} {1 - tot_pol / tot_base:>6.0%}")
+    print("\n오차 = 매일 대시보드에 보이는 순위와 실제 순위 차이의 평균 (미발견 = 1001위)")
+
+    bad = []
+    for _ in range(20):
+        bad += check_schedule(args.d, t0, args.jitter, rnd)
+    print(f"확인 간격 (11:00 ± {args.jitter:g}분, 20회) : {'정상' if not bad else f'어긋남 {len(bad)}건'}")
+    for line in bad[:10]:
+        print(f"  ✗ {line}")
+    sys.exit(1 if bad else 0)
+
+
+if __name__ == "__main__":
+    main()
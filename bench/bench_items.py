@@ -0,0 +1,213 @@
+"""
+검색 결과 item 표현 비교 — 기존 dict 경로 vs engine.decode_items 압축 레코드(tuple)
+
+쇼핑 API 응답 페이지(JSON 문자열)를 실제 경로처럼 json.loads 한 뒤
+- dict    : 응답 dict 를 그대로 MatchIndex 에 넣고 발견 item 에서 clean_title / int(lprice) (기존 find_rank)
+- records : engine.decode_items 로 페이지당 1회 필드 6개만 tuple 로 → MatchIndex → 발견 item 만 형 변환 (현재 find_rank)
+두 경로의 매칭 위치 / 기록 값이 완전히 같은지 확인하고 다음을 보고한다.
+- CPU 시간 : 페이지당 (파싱 + 색인 + 상품 N개 매칭 + 결과 생성) — 두 경로를 번갈아 --rounds 회 재서 최솟값
+- 메모리   : 페이지 P개를 동시에 들고 있을 때 (순위 확인 화면 / 동시 추적 워커) tracemalloc 기준 페이지당 KB
+
+페이지: --fixtures 로 녹화 응답 {"키워드": [item, ...]} (bench/fake_naver.py 와 같은 형식)을 주면 그것을,
+없으면 fake_naver 합성 결과(실제 응답과 같은 14개 필드)를 100개씩 잘라 사용.
+
+사용법:
+  python bench/bench_items.py                     # 합성 페이지 50개, 50회 × 7라운드
+  python bench/bench_items.py --pages 200 -n 500
+  python bench/bench_items.py --fixtures recorded.json
+"""
+import os
+import re
+import sys
+import json
+import time
+import random
+import argparse
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import fake_naver  # noqa: E402
+from engine import (MatchIndex, decode_items, clean_title, normalize_name,  # noqa: E402
+                    R_PID, R_MALL, R_TITLE, R_LPRICE, R_TYPE)
+
+PAGE_SIZE = 100
+
+
+# ── 기존 dict 경로 (engine.py 에서 그대로 옮겨옴, 비교 기준) ──────────────────
+class LegacyMatchIndex:
+    __slots__ = ("items", "_by_pid", "_links", "_malls")
+
+    def __init__(self, items: list):
+        self.items = items
+        self._by_pid = {}
+        for i, item in enumerate(items):
+            self._by_pid.setdefault(str(item.get("productId", "")).strip(), i)
+        self._links = [item.get("link", "") for item in items]
+        self._malls = None
+
+    def find(self, product: dict) -> int | None:
+        hits = []
+        catalog_id = str(product.get("catalog_id") or "").strip()
+        if catalog_id and catalog_id in self._by_pid:
+            hits.append(self._by_pid[catalog_id])
+        url_pid = str(product.get("url_product_id") or "").strip()
+        if url_pid:
+            for i, link in enumerate(self._links):
+                if url_pid in link:
+                    hits.append(i)
+                    break
+        product_id = str(product.get("product_id") or "").strip()
+        if product_id and product_id in self._by_pid:
+            hits.append(self._by_pid[product_id])
+        t_norm = normalize_name((product.get("mall_name") or "").strip())
+        if t_norm:
+            if self._malls is None:
+                self._malls = [normalize_name(item.get("mallName", "")) for item in self.items]
+            limit = min(hits) if hits else len(self._malls)
+            for i in range(limit):
+                a_norm = self._malls[i]
+                if a_norm and (t_norm in a_norm or a_norm in t_norm):
+                    hits.append(i)
+                    break
+        return min(hits) if hits else None
+
+
+def dict_path(raw: str, products: list) -> list:
+    items = json.loads(raw).get("items", [])
+    index = LegacyMatchIndex(items)
+    out = []
+    for product in products:
+        idx = index.find(product)
+        if idx is None:
+            out.append(None)
+            continue
+        item = items[idx]
+        out.append((idx, clean_title(item.get("title", "")), item.get("mallName", ""),
+                    int(item.get("lprice", 0) or 0), int(item.get("productType", 0) or 0),
+                    str(item.get("productId", ""))))
+    return out
+
+
+def records_path(raw: str, products: list) -> list:
+    items = decode_items(json.loads(raw).get("items", []))
+    index = MatchIndex(items)
+    out = []
+    for product in products:
+        idx = index.find(product)
+        if idx is None:
+            out.append(None)
+            continue
+        item = items[idx]
+        out.append((idx, clean_title(item[R_TITLE]), item[R_MALL] or "", int(item[R_LPRICE] or 0),
+                    int(item[R_TYPE] or 0), str(item[R_PID] or "").strip()))
+    return out
+
+
+# ── 페이지 / 상품 준비 ──────────────────────────────────────────────────────
+def load_pages(args) -> list[str]:
+    if args.fixtures:
+        with open(args.fixtures, encoding="utf-8") as f:
+            recorded = json.load(f)
+        lists = list(recorded.values())
+    else:
+        shop = fake_naver.FakeShop(seed=args.seed)
+        lists = [shop.corpus(f"벤치키워드{q:03d}") for q in range(max(1, args.pages // 10))]
+    pages = []
+    for items in lists:
+        for s in range(0, len(items), PAGE_SIZE):
+            page = items[s:s + PAGE_SIZE]
+            pages.append(json.dumps({"total": len(items), "start": s + 1, "display": len(page), "items": page},
+                                    ensure_ascii=False))
+    return pages[:args.pages] if args.pages else pages
+
+
+def pick_products(raw: str, rnd: random.Random, n: int) -> list:
+    """페이지마다 실제 등록 형태를 돌아가며 — 카탈로그 / 스마트스토어 URL / productId / 스토어명, 절반은 미발견"""
+    items = json.loads(raw).get("items", [])
+    products = []
+    for k in range(n):
+        if not items or rnd.random() < 0.5:
+            products.append({"product_id": str(rnd.randint(10**9, 10**10 - 1)), "catalog_id": None,
+                             "url_product_id": None, "mall_name": ""})
+            continue
+        item = rnd.choice(items)
+        kind = k % 4
+        pid = str(item.get("productId", ""))
+        m = re.search(r"/products/(\d+)", item.get("link", ""))
+        if kind == 0:
+            products.append({"product_id": pid, "catalog_id": pid, "url_product_id": None, "mall_name": ""})
+        elif kind == 1 and m:
+            products.append({"product_id": "0", "catalog_id": None, "url_product_id": m.group(1), "mall_name": ""})
+        elif kind == 3:
+            products.append({"product_id": "0", "catalog_id": None, "url_product_id": None,
+                             "mall_name": item.get("mallName", "")})
+        else:
+            products.append({"product_id": pid, "catalog_id": None, "url_product_id": None, "mall_name": ""})
+    return products
+
+
+# ── 측정 ────────────────────────────────────────────────────────────────────
+def cpu_per_page(fns, cases, repeat, rounds) -> list[float]:
+    """경로마다 페이지당 CPU 시간 — 라운드마다 번갈아 재고 최솟값 (다른 부하의 잡음 제거)"""
+    best = [float("inf")] * len(fns)
+    for _ in range(rounds):
+        for k, fn in enumerate(fns):
+            t0 = time.process_time()
+            for _ in range(repeat):
+                for raw, products in cases:
+                    fn(raw, products)
+            best[k] = min(best[k], (time.process_time() - t0) / (repeat * len(cases)))
+    return best
+
+
+def held_bytes(build, pages) -> int:
+    """페이지 전체를 동시에 들고 있을 때 늘어난 메모리 (색인 + 레코드)"""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    held = [build(raw) for raw in pages]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del held
+    return after - before
+
+
+def main():
+    ap = argparse.ArgumentParser(description="검색 결과 item 표현 비교 (dict vs 레코드 tuple)")
+    ap.add_argument("--pages", type=int, default=50, help="사용할 페이지 수 (0 = 전부)")
+    ap.add_argument("--products", type=int, default=4, help="페이지당 대조할 상품 수")
+    ap.add_argument("-n", "--repeat", type=int, default=50, help="라운드당 반복 수")
+    ap.add_argument("--rounds", type=int, default=7)
+    ap.add_argument("--fixtures", help='녹화 응답 JSON {"키워드": [item, ...]}')
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    pages = load_pages(args)
+    rnd = random.Random(args.seed)
+    cases = [(raw, pick_products(raw, rnd, args.products)) for raw in pages]
+    n_items = sum(len(json.loads(raw)["items"]) for raw in pages)
+
+    mismatches = 0
+    for raw, products in cases:
+        a, b = dict_path(raw, products), records_path(raw, products)
+        if a != b:
+            mismatches += 1
+            print(f"  ✗ 불일치: {a} != {b}")
+    found = sum(r is not None for raw, products in cases for r in records_path(raw, products))
+
+    cpu_dict, cpu_rec = cpu_per_page((dict_path, records_path), cases, args.repeat, args.rounds)
+    mem_dict = held_bytes(lambda raw: LegacyMatchIndex(json.loads(raw).get("items", [])), pages)
+    mem_rec = held_bytes(lambda raw: MatchIndex(decode_items(json.loads(raw).get("items", []))), pages)
+
+    print(f"\n  페이지 {len(pages)}개 (item {n_items:,}개) × 상품 {args.products}개 — 발견 {found}건")
+    print(f"  결과 일치      {len(cases) - mismatches}/{len(cases)}")
+    print(f"  CPU / 페이지   dict {cpu_dict * 1e6:8.1f}µs   records {cpu_rec * 1e6:8.1f}µs"
+          f"   ({(cpu_rec / cpu_dict - 1) * 100:+.1f}%)")
+    print(f"  보유 메모리    dict {mem_dict / len(pages) / 1024:8.1f}KB   records {mem_rec / len(pages) / 1024:8.1f}KB"
+          f"   ({(mem_rec / mem_dict - 1) * 100:+.1f}%) / 페이지")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
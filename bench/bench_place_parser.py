@@ -0,0 +1,93 @@
+"""
+place_parser 정확성 + 성능 비교 (저장된 HTML fixture 기준)
+
+기존 /api/check-place-rank 추출 로직(정규식 2회 + BeautifulSoup html.parser)과
+place_parser 결과가 완전히 같은지 확인한 뒤, 페이지당 처리 시간을 비교한다.
+
+사용법:
+  python bench/bench_place_parser.py            # 기본 200회 반복
+  python bench/bench_place_parser.py -n 1000
+"""
+import os
+import re
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import place_parser  # noqa: E402
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+# ── 기존 추출 로직 (app.py 에서 그대로 옮겨옴, 비교 기준) ──────────────────
+def legacy_mmap(text):
+    url_ids = re.findall(r'/place/(\d{8,12})', text)
+    json_ids = re.findall(r'"id"\s*:\s*(\d{8,12})', text)
+    return list(dict.fromkeys(url_ids + [i for i in json_ids if i not in url_ids]))
+
+
+def legacy_msearch(text):
+    from bs4 import BeautifulSoup as _BS4
+    url_ids = re.findall(r'place\.naver\.com/[^/]+/(\d{8,12})', text)
+    html_ids = re.findall(r'naver\.com/[^/?#]+/(\d{8,12})', text)
+    all_ids = list(dict.fromkeys(url_ids + html_ids))
+    soup = _BS4(text.encode("utf-8"), "html.parser", from_encoding="utf-8")
+    has_section = len(soup.select("div.place_section")) > 0
+    return all_ids, has_section
+
+
+CASES = [
+    ("mmap_search.html",        legacy_mmap,    place_parser.parse_mmap),
+    ("msearch_place.html",      legacy_msearch, place_parser.parse_msearch),
+    ("msearch_no_section.html", legacy_msearch, place_parser.parse_msearch),
+]
+
+
+def _time(fn, text, n):
+    t0 = time.perf_counter()
+    for _ in range(n):
+        fn(text)
+    return (time.perf_counter() - t0) / n * 1000
+
+
+def main():
+    ap = argparse.ArgumentParser(description="place_parser 벤치마크")
+    ap.add_argument("-n", type=int, default=200, help="반복 횟수")
+    args = ap.parse_args()
+
+    failed = 0
+    print(f"{'fixture':<26} {'size':>7} {'legacy ms':>10} {'new ms':>8} {'speedup':>8}  결과")
+    print("-" * 72)
+    for name, legacy, new in CASES:
+        with open(os.path.join(FIXTURES, name), encoding="utf-8") as f:
+            text = f.read()
+        ok = legacy(text) == new(text)
+        failed += not ok
+        t_old = _time(legacy, text, max(1, args.n // 10))
+        t_new = _time(new, text, args.n)
+        print(f"{name:<26} {len(text) // 1024:>5}KB {t_old:>10.3f} {t_new:>8.3f} "
+              f"{t_old / t_new:>7.1f}x  {'일치' if ok else '불일치 ❌'}")
+
+    # 경계 케이스: 비슷한 클래스명 / 다른 태그 / 따옴표 없는 속성
+    edge = [
+        '<div class="place_section_header"></div>',
+        '<span class="place_section"></span>',
+        '<div class=place_section></div>',
+        '<div id="x" data-a="1" class="a place_section b"></div>',
+        '<p>place_section</p>',
+    ]
+    for html in edge:
+        ok = legacy_msearch(html)[1] == place_parser.has_place_section(html)
+        failed += not ok
+        if not ok:
+            print(f"경계 케이스 불일치: {html}")
+
+    if failed:
+        print(f"\n❌ 불일치 {failed}건")
+        sys.exit(1)
+    print("\n✅ 모든 fixture/경계 케이스 결과 일치")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""
+명소 추출 (Apollo State → trips) 정확성 + 성능/메모리 비교
+
+기존 /api/fetch-place-spots 방식(Apollo State 전체 raw_decode + ROOT_QUERY 전체 순회
++ SPOT_KEYWORDS 루프)과 place_parser 방식의 결과가 같은지 확인하고,
+파싱 시간과 tracemalloc 기준 최대 할당량을 비교한다.
+
+사용법:
+  python bench/bench_place_spots.py
+  python bench/bench_place_spots.py -n 200
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import place_parser  # noqa: E402
+from place_parser import SPOT_WHITELIST, SPOT_KEYWORDS, is_spot_category  # noqa: E402
+
+FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                       "fixtures", "place_around_apollo.html")
+
+
+# ── 기존 로직 (app.py 에서 그대로 옮겨옴, 비교 기준) ──────────────────────
+def legacy_is_spot_category(category):
+    if not category:
+        return False
+    parts = [p.strip() for p in category.replace("·", ",").split(",")]
+    for part in parts:
+        if part in SPOT_WHITELIST:
+            return True
+        for kw in SPOT_KEYWORDS:
+            if kw in part:
+                return True
+    return False
+
+
+def legacy_spots(text, use_filter):
+    apollo_idx = text.find("__APOLLO_STATE__")
+    if apollo_idx == -1:
+        return None
+    brace_pos = text.find("{", apollo_idx)
+    state, _ = json.JSONDecoder().raw_decode(text[brace_pos:])
+    rq = state.get("ROOT_QUERY", {})
+    ordered = []
+    for key, val in rq.items():
+        if "trips" in key.lower() and isinstance(val, dict):
+            for ref_item in val.get("items", []):
+                item = state.get(ref_item.get("__ref", ""), {})
+                name, category = item.get("name", ""), item.get("category", "")
+                if not name or name in ordered:
+                    continue
+                if use_filter or legacy_is_spot_category(category):
+                    ordered.append(name)
+    return ordered
+
+
+def new_spots(text, use_filter):
+    items = place_parser.extract_trip_items(text)
+    if items is None:
+        return None
+    ordered = []
+    for item in items:
+        name, category = item.get("name", ""), item.get("category", "")
+        if not name or name in ordered:
+            continue
+        if use_filter or is_spot_category(category):
+            ordered.append(name)
+    return ordered
+
+
+def _measure(fn, text, use_filter, n):
+    t0 = time.perf_counter()
+    for _ in range(n):
+        fn(text, use_filter)
+    elapsed = (time.perf_counter() - t0) / n * 1000
+    tracemalloc.start()
+    fn(text, use_filter)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def check_classifier(samples=20000):
+    """무작위 복합 카테고리로 기존/컴파일 판별 결과 비교 → 불일치 건수"""
+    rnd = random.Random(29)
+    vocab = (list(SPOT_WHITELIST) + SPOT_KEYWORDS
+             + ["한식", "카페", "편의점", "주차장", "약국", "산책", "문화", "예술", "강남", "국밥집"])
+    bad = 0
+    for _ in range(samples):
+        words = [rnd.choice(vocab) for _ in range(rnd.randint(1, 3))]
+        words = [(" " * rnd.randint(0, 1)) + w + (" " * rnd.randint(0, 1)) for w in words]
+        if rnd.random() < 0.3:
+            words.append(rnd.choice(vocab) + rnd.choice(vocab))
+        cat = rnd.choice([",", "·", ", "]).join(words)
+        if legacy_is_spot_category(cat) != is_spot_category(cat):
+            bad += 1
+            print(f"  판별 불일치: {cat!r}")
+    return bad
+
+
+def main():
+    ap = argparse.ArgumentParser(description="명소 추출 벤치마크")
+    ap.add_argument("-n", type=int, default=50, help="반복 횟수")
+    args = ap.parse_args()
+
+    with open(FIXTURE, encoding="utf-8") as f:
+        text = f.read()
+
+    failed = 0
+    print(f"fixture: {os.path.basename(FIXTURE)} ({len(text) // 1024}KB)\n")
+    print(f"{'mode':<10} {'legacy ms':>10} {'new ms':>8} {'legacy peak':>12} {'new peak':>10}  결과")
+    print("-" * 66)
+    for use_filter in (True, False):
+        ok = legacy_spots(text, use_filter) == new_spots(text, use_filter)
+        failed += not ok
+        t_old, m_old = _measure(legacy_spots, text, use_filter, args.n)
+        t_new, m_new = _measure(new_spots, text, use_filter, args.n)
+        mode = "filter100" if use_filter else "filtered"
+        print(f"{mode:<10} {t_old:>10.2f} {t_new:>8.2f} {m_old // 1024:>10}KB {m_new // 1024:>8}KB"
+              f"  {'일치' if ok else '불일치 ❌'}")
+
+    # 카테고리 판별: 기존 루프 vs 컴파일 정규식(+메모이즈)
+    cats = [c for c in (i.get("category", "") for i in place_parser.extract_trip_items(text)) if c]
+    reps = max(1, args.n * 20)
+    t0 = time.perf_counter()
+    for _ in range(reps):
+        for c in cats:
+            legacy_is_spot_category(c)
+    t_old = (time.perf_counter() - t0) / (reps * len(cats)) * 1e6
+    is_spot_category.cache_clear()
+    t0 = time.perf_counter()
+    for _ in range(reps):
+        for c in cats:
+            is_spot_category(c)
+    t_new = (time.perf_counter() - t0) / (reps * len(cats)) * 1e6
+    print(f"\n카테고리 판별: legacy {t_old:.2f}µs → new {t_new:.2f}µs / 건")
+
+    bad = check_classifier()
+    failed += bad
+    print(f"카테고리 판별 무작위 비교: 불일치 {bad}건")
+
+    if failed:
+        print(f"\n❌ 불일치 {failed}건")
+        sys.exit(1)
+    print("\n✅ 기존 방식과 결과 일치")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+웹 앱 기동 시간 벤치마크 — cold start (Render 유휴 후 재기동) 추적용
+
+새 프로세스 + 빈 임시 DB 로 N번 반복해서 구간별 시간을 잰다 (중앙값).
+- import_ms : import app (라우트 정의 + Flask / APScheduler / requests import)
+- create_ms : app.create_app() (DB 스키마 준비, APP_WARMUP=preload 면 워밍업 포함)
+- first_ms  : 첫 요청 GET / (start_background + 템플릿 컴파일 + DB 조회)
+- heavy_ms  : 기동 --delay-ms 뒤 openpyxl / bs4 import 비용 = 첫 엑셀·파싱 요청이 떠안는 시간
+              (워밍업이 끝났으면 ~0)
+
+APP_WARMUP 모드(background / preload / off)별로 비교하고, --importtime 이면
+python -X importtime 기준 누적 import 시간 상위 모듈을 함께 출력한다.
+
+회귀 확인: --save 로 저장해 두고 --baseline 으로 비교하면 import_ms / first_ms 가 +25% 초과 시 종료 코드 1.
+
+사용법:
+  python bench/bench_startup.py
+  python bench/bench_startup.py -n 10 --importtime
+  python bench/bench_startup.py --mode background --save bench/startup_baseline.json
+  python bench/bench_startup.py --mode background --baseline bench/startup_baseline.json
+"""
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODES = ("background", "preload", "off")
+KEYS = ("import_ms", "create_ms", "first_ms", "heavy_ms")
+
+CHILD = r"""
+import sys, time, json, logging
+t0 = time.perf_counter()
+import app
+t1 = time.perf_counter()
+app.create_app()
+t2 = time.perf_counter()
+logging.getLogger().setLevel(logging.WARNING)
+client = app.app.test_client()
+resp = client.get("/")
+t3 = time.perf_counter()
+time.sleep(max(0.0, {delay} - (t3 - t0)))
+t4 = time.perf_counter()
+import openpyxl, bs4
+t5 = time.perf_counter()
+print(json.dumps({{"status": resp.status_code, "import_ms": (t1 - t0) * 1000, "create_ms": (t2 - t1) * 1000,
+                  "first_ms": (t3 - t2) * 1000, "heavy_ms": (t5 - t4) * 1000}}))
+"""
+
+
+def run_once(mode, delay_ms):
+    env = dict(os.environ, APP_WARMUP=mode,
+               DB_PATH=os.path.join(tempfile.mkdtemp(prefix="bench_startup_"), "agency.db"))
+    out = subprocess.run([sys.executable, "-c", CHILD.format(delay=delay_ms / 1000)], cwd=ROOT, env=env,
+                         capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def import_profile(top):
+    """-X importtime 누적 시간 상위 모듈 [(ms, 모듈)]"""
+    env = dict(os.environ, DB_PATH=os.path.join(tempfile.mkdtemp(prefix="bench_startup_"), "agency.db"))
+    out = subprocess.run([sys.executable, "-X", "importtime", "-c", "import app"], cwd=ROOT, env=env,
+                         capture_output=True, text=True, check=True)
+    rows = []
+    for line in out.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cum, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if depth == 0:                   # 자식이 먼저 출력되고 부모가 나중 → app 줄에서 끝
+            if name.strip() == "app":
+                rows.append((int(cum) / 1000, "app (전체)"))
+                break
+            rows = []
+        elif depth == 1:                 # app 이 직접 import 한 모듈 (하위 모듈은 누적에 포함)
+            rows.append((int(cum) / 1000, name.strip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+def compare(result, baseline_path):
+    with open(baseline_path, encoding="utf-8") as f:
+        base = json.load(f)
+    print(f"\n기준선 비교 ({baseline_path})")
+    failed = 0
+    for key in ("import_ms", "first_ms"):
+        ok = result[key] <= base[key] * 1.25
+        failed += not ok
+        print(f"  {key:<10} {base[key]:>8} → {result[key]:>8}  {'✅' if ok else '❌ 회귀'}")
+    return failed
+
+
+def main():
+    ap = argparse.ArgumentParser(description="웹 앱 기동 시간 벤치마크")
+    ap.add_argument("-n", type=int, default=5, help="모드별 반복 횟수")
+    ap.add_argument("--mode", choices=MODES, action="append", help="APP_WARMUP 모드 (기본: 전부)")
+    ap.add_argument("--delay-ms", type=float, default=800, help="기동 후 무거운 요청이 들어오는 시점")
+    ap.add_argument("--importtime", action="store_true", help="import 시간 상위 모듈 출력")
+    ap.add_argument("--save", help="결과 JSON 저장 경로 (첫 번째 모드)")
+    ap.add_argument("--baseline", help="비교할 기준 결과 JSON (첫 번째 모드)")
+    args = ap.parse_args()
+
+    modes = args.mode or list(MODES)
+    print(f"반복 {args.n}회 중앙값 | 무거운 요청 시점 기동 후 {args.delay_ms:.0f}ms\n")
+    print(f"  {'APP_WARMUP':<12}" + "".join(f"{k:>12}" for k in KEYS) + f"{'합계':>10}")
+    results = {}
+    for mode in modes:
+        runs = [run_once(mode, args.delay_ms) for _ in range(args.n)]
+        assert all(r["status"] == 200 for r in runs), runs
+        med = {k: round(statistics.median(r[k] for r in runs), 1) for k in KEYS}
+        results[mode] = med
+        print(f"  {mode:<12}" + "".join(f"{med[k]:>12}" for k in KEYS)
+              + f"{round(sum(med.values()), 1):>10}")
+
+    if args.importtime:
+        print("\nimport app — 누적 import 시간 상위")
+        for ms, name in import_profile(12):
+            print(f"  {ms:>8.1f}ms  {name}")
+
+    first = results[modes[0]]
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump({"mode": modes[0], **first}, f, ensure_ascii=False, indent=2)
+        print(f"\n저장: {args.save}")
+    if args.baseline and compare(first, args.baseline):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
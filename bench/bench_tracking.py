@@ -0,0 +1,255 @@
+"""
+순위 추적 벤치마크 — 가짜 쇼핑 API(bench/fake_naver.py) 위에서 run_all_tracking / track_client 측정
+
+광고주 × 상품 × 키워드 수를 정해 임시 DB 에 등록하고, 조합마다 정답 순위(또는 1000위 밖)를
+가짜 API 결과에 심은 뒤 추적을 돌려 다음을 보고한다.
+- 소요 시간 / 조합당 시간
+- API 호출 수 / 조합당 호출 수 / 429 수
+- 매칭 정확도 (추적 결과 순위 == 심은 순위) / 확인 실패(API 오류) 조합 수
+- 최대 메모리 (tracemalloc peak, 프로세스 max RSS)
+
+상품 종류는 실제 등록 형태를 돌아가며 사용: 가격비교 카탈로그 / 스마트스토어 URL /
+productId 직접 / 스토어명(mall_name) fallback.
+
+회귀 확인: --save 로 결과를 저장해 두고 배포 전 --baseline 으로 비교하면
+조합당 호출 수 +5% / 정확도 하락 / 소요 시간 +25% 초과 시 종료 코드 1.
+
+사용법:
+  python bench/bench_tracking.py                                # 광고주 2 × 상품 3 × 키워드 5
+  python bench/bench_tracking.py -c 5 -p 4 -k 10 --latency-ms 40 --rate-429 0.02
+  python bench/bench_tracking.py --mode engine                  # DB 없이 engine.track_client 만
+  python bench/bench_tracking.py --source schedule              # check_policy 적용 (자동 추적 경로)
+  python bench/bench_tracking.py --keys 3 --key-quota 40        # API 키 풀 3개, 키당 40회 한도 (초과 시 429/010)
+  python bench/bench_tracking.py --save bench/baseline.json
+  python bench/bench_tracking.py --baseline bench/baseline.json
+"""
+import os
+import sys
+import json
+import time
+import random
+import logging
+import argparse
+import resource
+import tempfile
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import fake_naver  # noqa: E402
+
+KINDS = ("catalog", "smartstore", "direct", "mall")
+MAX_RANK = 1000
+MISSING_RATIO = 0.2
+FAILED = "확인실패"       # status=failed 조합 (API 오류 — 미발견과 구분)
+
+
+def build_fixture(n_clients, n_products, n_keywords, rnd):
+    """광고주/상품/키워드 정의 + 심을 정답 순위
+
+    Returns: [{"name", "products": [product], "keywords": [kw], "expected": {(product_id, kw): rank|None}}]
+    """
+    clients = []
+    for c in range(n_clients):
+        products = []
+        for p in range(n_products):
+            kind = KINDS[p % len(KINDS)]
+            uid = str(rnd.randint(10**9, 10**10 - 1))
+            if kind == "catalog":
+                prod = {"product_id": uid, "catalog_id": uid, "url_product_id": None, "mall_name": "",
+                        "product_url": f"https://search.shopping.naver.com/catalog/{uid}"}
+            elif kind == "smartstore":
+                prod = {"product_id": uid, "catalog_id": None, "url_product_id": uid, "mall_name": "",
+                        "product_url": f"https://smartstore.naver.com/bench{c:03d}/products/{uid}"}
+            elif kind == "direct":
+                prod = {"product_id": uid, "catalog_id": None, "url_product_id": None, "mall_name": "",
+                        "product_url": uid}
+            else:
+                prod = {"product_id": uid, "catalog_id": None, "url_product_id": None,
+                        "mall_name": f"벤치스토어{c:03d}{p:03d}", "product_url": uid}
+            prod.update(kind=kind, product_name=f"벤치상품 {c}-{p} ({kind})")
+            products.append(prod)
+
+        keywords = [f"벤치키워드{c:03d}-{k:03d}" for k in range(n_keywords)]
+        expected = {}
+        for kw in keywords:
+            ranks = rnd.sample(range(1, MAX_RANK + 1), len(products))
+            for prod, rank in zip(products, ranks):
+                expected[(prod["product_id"], kw)] = None if rnd.random() < MISSING_RATIO else rank
+        clients.append({"name": f"벤치광고주{c:03d}", "products": products,
+                        "keywords": keywords, "expected": expected})
+    return clients
+
+
+def planted_item(prod, kw):
+    """추적 대상 상품이 검색 결과에 나타나는 모습 (종류별 실제 API 응답 구조)"""
+    rnd = random.Random(f"{prod['product_id']}:{kw}")
+    api_pid = str(rnd.randint(10**10, 10**11 - 1))
+    item = {"title": f"<b>{kw}</b> {prod['product_name']}", "lprice": "19900", "hprice": "",
+            "brand": "", "maker": "", "image": "", "category1": "생활/건강",
+            "category2": "", "category3": "", "category4": ""}
+    if prod["kind"] == "catalog":
+        item.update(productId=prod["catalog_id"], productType="1", mallName="네이버",
+                    link=f"https://search.shopping.naver.com/catalog/{prod['catalog_id']}")
+    elif prod["kind"] == "smartstore":
+        item.update(productId=api_pid, productType="2", mallName="벤치몰",
+                    link=prod["product_url"])
+    elif prod["kind"] == "direct":
+        item.update(productId=prod["product_id"], productType="3", mallName="벤치몰",
+                    link=f"https://smartstore.naver.com/benchx/products/{api_pid[:10]}")
+    else:
+        item.update(productId=api_pid, productType="2", mallName=prod["mall_name"],
+                    link=f"https://smartstore.naver.com/benchm/products/{api_pid[:10]}")
+    return item
+
+
+def run_app(clients, source):
+    """app.run_all_tracking 경로 (DB 기록 포함) → {(product_id, kw): rank}"""
+    import app
+    from db import get_conn
+
+    conn = get_conn()
+    for cl in clients:
+        cid = conn.execute("INSERT INTO clients (name, memo) VALUES (?,?)", (cl["name"], "")).lastrowid
+        for prod in cl["products"]:
+            conn.execute("""
+                INSERT INTO products (client_id, product_url, product_id, catalog_id, url_product_id,
+                                      mall_name, product_name)
+                VALUES (?,?,?,?,?,?,?)
+            """, (cid, prod["product_url"], prod["product_id"], prod["catalog_id"],
+                  prod["url_product_id"], prod["mall_name"], prod["product_name"]))
+        conn.executemany("INSERT INTO keywords (client_id, keyword) VALUES (?,?)",
+                         [(cid, kw) for kw in cl["keywords"]])
+    conn.commit()
+    conn.close()
+
+    app.run_all_tracking(source)
+
+    conn = get_conn()
+    rows = conn.execute("SELECT product_id, keyword, rank, status FROM rank_history ORDER BY id").fetchall()
+    conn.close()
+    return {(r["product_id"], r["keyword"]): (r["rank"] if r["status"] == "ok" else FAILED) for r in rows}
+
+
+def run_engine(clients):
+    """engine.track_client 만 (DB 없이) → {(product_id, kw): rank}"""
+    from engine import track_client
+    got = {}
+    for i, cl in enumerate(clients):
+        for r in track_client("bench-id", "bench-secret", i, cl["products"], cl["keywords"], max_pages=10):
+            got[(r["product_id"], r["keyword"])] = r["rank"] if r["status"] == "ok" else FAILED
+    return got
+
+
+def compare(metrics, baseline_path):
+    with open(baseline_path, encoding="utf-8") as f:
+        base = json.load(f)
+    checks = [
+        ("calls_per_combo", metrics["calls_per_combo"] <= base["calls_per_combo"] * 1.05),
+        ("accuracy",        metrics["accuracy"] >= base["accuracy"]),
+        ("wall_sec",        metrics["wall_sec"] <= base["wall_sec"] * 1.25),
+    ]
+    print(f"\n기준선 비교 ({baseline_path})")
+    failed = 0
+    for key, ok in checks:
+        failed += not ok
+        print(f"  {key:<16} {base[key]:>10} → {metrics[key]:>10}  {'✅' if ok else '❌ 회귀'}")
+    return failed
+
+
+def main():
+    ap = argparse.ArgumentParser(description="순위 추적 벤치마크 (가짜 쇼핑 API)")
+    ap.add_argument("-c", "--clients", type=int, default=2)
+    ap.add_argument("-p", "--products", type=int, default=3)
+    ap.add_argument("-k", "--keywords", type=int, default=5)
+    ap.add_argument("--mode", choices=("app", "engine"), default="app")
+    ap.add_argument("--source", default="manual", help="run_all_tracking source (manual = 항상 전체 탐색)")
+    ap.add_argument("--latency-ms", type=float, default=20)
+    ap.add_argument("--jitter-ms", type=float, default=5)
+    ap.add_argument("--rate-429", type=float, default=0)
+    ap.add_argument("--qps", type=float, default=0)
+    ap.add_argument("--keys", type=int, default=0, help="API 키 풀에 등록할 키 수 (app 모드)")
+    ap.add_argument("--key-quota", type=int, default=0, help="가짜 API 의 키당 호출 한도 (0 = 무제한)")
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--save", help="결과 JSON 저장 경로")
+    ap.add_argument("--baseline", help="비교할 기준 결과 JSON")
+    ap.add_argument("-v", "--verbose", action="store_true")
+    args = ap.parse_args()
+
+    rnd = random.Random(args.seed)
+    clients = build_fixture(args.clients, args.products, args.keywords, rnd)
+    shop = fake_naver.FakeShop(args.latency_ms, args.jitter_ms, args.rate_429, args.qps, seed=args.seed,
+                               key_quota=args.key_quota)
+    for cl in clients:
+        for (pid, kw), rank in cl["expected"].items():
+            if rank:
+                prod = next(p for p in cl["products"] if p["product_id"] == pid)
+                shop.plant(kw, rank, planted_item(prod, kw))
+    for kw in {kw for cl in clients for kw in cl["keywords"]}:
+        shop.corpus(kw)   # 가짜 결과는 미리 생성 → 측정 메모리/시간에서 제외
+    server = fake_naver.serve(shop)
+
+    # engine / db 는 import 시점에 주소/경로를 읽으므로 import 전에 설정
+    os.environ["NAVER_SHOP_API"] = fake_naver.api_url(server)
+    os.environ["NAVER_CLIENT_ID"] = "bench-id"
+    os.environ["NAVER_CLIENT_SECRET"] = "bench-secret"
+    os.environ["DB_PATH"] = os.path.join(tempfile.mkdtemp(prefix="bench_tracking_"), "agency.db")
+    tracemalloc.start()
+    if args.mode == "app":
+        import app
+        app.create_app()   # init_db
+        import api_keys
+        for i in range(args.keys):
+            api_keys.add(f"bench-{i}", f"bench-key-{i}", "bench-secret", "background")
+    logging.getLogger().setLevel(logging.INFO if args.verbose else logging.WARNING)
+
+    expected = {k: v for cl in clients for k, v in cl["expected"].items()}
+    combos = len(expected)
+    print(f"광고주 {args.clients} × 상품 {args.products} × 키워드 {args.keywords} = {combos}개 조합 "
+          f"| mode={args.mode} source={args.source} | 지연 {args.latency_ms}±{args.jitter_ms}ms "
+          f"429 {args.rate_429:.0%} qps {args.qps or '∞'}")
+
+    shop.reset_stats()
+    tracemalloc.reset_peak()
+    t0 = time.perf_counter()
+    got = run_app(clients, args.source) if args.mode == "app" else run_engine(clients)
+    wall = time.perf_counter() - t0
+    _, peak = tracemalloc.get_traced_memory()
+
+    correct = sum(1 for k, v in expected.items() if k in got and got[k] == v)
+    wrong = [(k, v, got.get(k, "—")) for k, v in expected.items() if got.get(k, "—") != v]
+    metrics = {
+        "combos": combos,
+        "wall_sec": round(wall, 2),
+        "sec_per_combo": round(wall / combos, 3),
+        "api_calls": shop.stats["requests"],
+        "calls_per_combo": round(shop.stats["requests"] / combos, 2),
+        "http_429": shop.stats["429"],
+        "accuracy": round(correct / combos, 4),
+        "check_failed": sum(1 for v in got.values() if v == FAILED),
+        "checked": len(got),
+        "peak_py_mb": round(peak / 1e6, 2),
+        "max_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+    print(f"\n  소요 시간      {metrics['wall_sec']}s ({metrics['sec_per_combo']}s/조합)")
+    print(f"  API 호출       {metrics['api_calls']}회 ({metrics['calls_per_combo']}회/조합, 429 {metrics['http_429']}회)")
+    print(f"  매칭 정확도    {correct}/{combos} ({metrics['accuracy']:.1%}) — 확인한 조합 {len(got)}개"
+          f" (확인 실패 {metrics['check_failed']}개)")
+    if len(shop.stats["by_key"]) > 1:
+        print("  키별 호출      " + " / ".join(f"{k} {n}" for k, n in sorted(shop.stats["by_key"].items())))
+    print(f"  최대 메모리    Python {metrics['peak_py_mb']}MB / RSS {metrics['max_rss_mb']}MB")
+    for (pid, kw), want, have in wrong[:5]:
+        print(f"    ✗ {kw} × {pid}: 기대 {want} / 결과 {have}")
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(metrics, f, ensure_ascii=False, indent=2)
+        print(f"\n저장: {args.save}")
+    server.shutdown()
+    if args.baseline and compare(metrics, args.baseline):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
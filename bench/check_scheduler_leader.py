@@ -0,0 +1,117 @@
+"""
+스케줄러 리더 선출 검증 — N개 워커 프로세스가 떠 있어도 예약 작업은 정확히 1번 실행
+
+gunicorn --workers N 과 같은 상황을 흉내 내어 app 을 import + start_background() 한 프로세스 N개를 띄운다.
+각 워커의 (paused) 스케줄러에 같은 예약 작업을 넣고, 실제로 실행된 횟수를 DB 에 기록.
+
+  1) t0+4s  tick1          : 리더 1곳에서만 실행 → 1건
+  2) t0+5s  scheduled_job  : 실제 daily_track 작업 → run_all_tracking 1건
+  3) t0+6s  모든 워커가 scheduled_job 직접 호출 (리더 교체 경합 흉내) → claim_slot 으로 추가 실행 0건
+  4) t0+7.5s 리더 프로세스 강제 종료 → TTL 뒤 다른 워커가 리더 승계
+  5) t0+11s tick2          : 새 리더 1곳에서만 실행 → 1건 (tick1 과 다른 PID)
+
+사용법:
+  python bench/check_scheduler_leader.py          # 워커 4개
+  python bench/check_scheduler_leader.py -n 8
+"""
+import os
+import sys
+import time
+import signal
+import sqlite3
+import argparse
+import tempfile
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LEASE_TTL, LEASE_RENEW = 2.0, 0.5
+
+
+def _record(db_path, tag):
+    conn = sqlite3.connect(db_path, timeout=10)
+    conn.execute("INSERT INTO bench_runs (tag, pid, at) VALUES (?,?,?)", (tag, os.getpid(), time.time()))
+    conn.commit()
+    conn.close()
+
+
+def worker(t0):
+    sys.path.insert(0, ROOT)
+    from datetime import datetime
+    from apscheduler.triggers.date import DateTrigger
+    import app
+    app.start_background()       # gunicorn post_worker_init 과 같은 기동 경로
+
+    db_path = os.environ["DB_PATH"]
+    app.run_all_tracking = lambda source="manual": _record(db_path, "track")
+
+    def at(sec):
+        return DateTrigger(run_date=datetime.fromtimestamp(t0 + sec, app.KST))
+
+    app.scheduler.add_job(_record, at(4), args=[db_path, "tick1"], misfire_grace_time=1)
+    app.scheduler.add_job(app.scheduled_job, at(5), misfire_grace_time=1)
+    app.scheduler.add_job(_record, at(11), args=[db_path, "tick2"], misfire_grace_time=1)
+
+    time.sleep(max(0, t0 + 6 - time.time()))
+    app.scheduled_job()          # 모든 워커가 동시에 "내가 리더" 라고 착각한 상황
+    time.sleep(max(0, t0 + 14 - time.time()))
+
+
+def main():
+    ap = argparse.ArgumentParser(description="스케줄러 리더 선출 검증")
+    ap.add_argument("-n", type=int, default=4, help="워커 프로세스 수")
+    ap.add_argument("--worker", type=float, help=argparse.SUPPRESS)
+    args = ap.parse_args()
+    if args.worker:
+        return worker(args.worker)
+
+    tmp = tempfile.mkdtemp(prefix="leader_check_")
+    db_path = os.path.join(tmp, "agency.db")
+    env = dict(os.environ, DB_PATH=db_path,
+               SCHEDULER_LEASE_TTL_SEC=str(LEASE_TTL), SCHEDULER_LEASE_RENEW_SEC=str(LEASE_RENEW))
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE TABLE bench_runs (tag TEXT, pid INTEGER, at REAL)")
+    conn.commit()
+    conn.close()
+
+    t0 = time.time() + 2   # import 시간 여유
+    procs = [subprocess.Popen([sys.executable, os.path.abspath(__file__), "--worker", str(t0)],
+                              env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+             for _ in range(args.n)]
+    print(f"워커 {args.n}개 시작 (DB: {db_path})")
+
+    time.sleep(max(0, t0 + 7.5 - time.time()))
+    conn = sqlite3.connect(db_path)
+    owner = conn.execute("SELECT owner FROM scheduler_lease WHERE name='scheduler'").fetchone()
+    conn.close()
+    leader_pid = int(owner[0].split(":")[1]) if owner else None
+    if leader_pid:
+        os.kill(leader_pid, signal.SIGKILL)
+        print(f"리더 PID {leader_pid} 강제 종료")
+
+    for p in procs:
+        p.wait()
+
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute("SELECT tag, pid FROM bench_runs ORDER BY at").fetchall()
+    conn.close()
+    by_tag = {}
+    for tag, pid in rows:
+        by_tag.setdefault(tag, []).append(pid)
+
+    failed = 0
+    for tag, expected in (("tick1", 1), ("track", 1), ("tick2", 1)):
+        got = len(by_tag.get(tag, []))
+        ok = got == expected
+        failed += not ok
+        print(f"  {tag:<6} 실행 {got}건 (기대 {expected}) {'✅' if ok else '❌'}  pid={by_tag.get(tag, [])}")
+    takeover = by_tag.get("tick1") and by_tag.get("tick2") and by_tag["tick1"] != by_tag["tick2"]
+    failed += not takeover
+    print(f"  리더 승계 {'✅' if takeover else '❌'}")
+
+    if failed:
+        sys.exit(1)
+    print("\n✅ 워커 수와 관계없이 예약 작업은 정확히 1번 실행")
+
+
+if __name__ == "__main__":
+    main()
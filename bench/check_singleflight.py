@@ -0,0 +1,100 @@
+"""
+동일 요청 합치기(singleflight) 검증 — 같은 검색을 동시에 여러 번 해도 업스트림 호출은 1번
+
+가짜 쇼핑 API(fake_naver, 응답 지연 --latency-ms)를 띄우고 같은 키워드 1페이지 검색을 동시에 보낸다.
+  1) 한 프로세스 스레드 T개                         → 호출 1건 (프로세스 안 공유)
+  2) 캐시 끔(SHOP_CACHE_TTL_SEC=0) 스레드 T개       → 호출 1건 (캐시 없이도 진행 중 호출 공유)
+  3) 워커 프로세스 P개 × 스레드 T개 (같은 DB)        → 호출 1건 (singleflight_locks 로 워커 간 공유)
+  4) 3) 과 같은데 SINGLEFLIGHT_SHARED=0             → 호출 ≤ P건 (비교용, 워커마다 1건)
+모든 호출자가 같은 결과(상위 상품 ID)를 받았는지도 확인한다.
+
+사용법:
+  python bench/check_singleflight.py
+  python bench/check_singleflight.py -p 4 -t 16 --latency-ms 300
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_naver import FakeShop, serve, api_url  # noqa: E402
+
+CHILD = r"""
+import sys, time, json, threading
+from contextlib import redirect_stdout
+from db import init_db
+with redirect_stdout(sys.stderr):
+    init_db()
+import shop_cache
+from engine import search_shopping
+if {no_cache}:
+    shop_cache.SHOP_CACHE_TTL_SEC = 0
+out = []
+def one():
+    data = search_shopping("id", "secret", {query!r}, display=40, start=1)
+    out.append(data["items"][0]["productId"] if data and data.get("items") else None)
+time.sleep(max(0.0, {start_at} - time.time()))
+threads = [threading.Thread(target=one) for _ in range({threads})]
+for t in threads: t.start()
+for t in threads: t.join()
+print(json.dumps(out))
+"""
+
+
+def run(shop, url, procs, threads, query, no_cache=False, shared=True):
+    db_path = os.path.join(tempfile.mkdtemp(prefix="check_sf_"), "agency.db")
+    env = dict(os.environ, DB_PATH=db_path, NAVER_SHOP_API=url, SINGLEFLIGHT_SHARED="1" if shared else "0")
+    shop.reset_stats()
+    start_at = time.time() + 1.5            # 모든 워커가 import 를 끝낸 뒤 동시에 출발
+    code = CHILD.format(no_cache=no_cache, query=query, start_at=start_at, threads=threads)
+    children = [subprocess.Popen([sys.executable, "-c", code], cwd=ROOT, env=env,
+                                 stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+                for _ in range(procs)]
+    answers = []
+    for c in children:
+        stdout, _ = c.communicate(timeout=60)
+        answers += json.loads(stdout.strip().splitlines()[-1])
+    return shop.stats["requests"], answers
+
+
+def main():
+    ap = argparse.ArgumentParser(description="singleflight 검증")
+    ap.add_argument("-p", "--procs", type=int, default=3, help="워커 프로세스 수")
+    ap.add_argument("-t", "--threads", type=int, default=8, help="프로세스당 동시 요청 수")
+    ap.add_argument("--latency-ms", type=float, default=200, help="가짜 API 응답 지연")
+    args = ap.parse_args()
+
+    shop = FakeShop(latency_ms=args.latency_ms)
+    server = serve(shop)
+    url = api_url(server)
+    p, t = args.procs, args.threads
+
+    cases = [
+        (f"프로세스 1 × 스레드 {t}", dict(procs=1, threads=t, query="무선 이어폰"), lambda n: n == 1),
+        (f"캐시 끔, 스레드 {t}", dict(procs=1, threads=t, query="블루투스 스피커", no_cache=True), lambda n: n == 1),
+        (f"워커 {p} × 스레드 {t}", dict(procs=p, threads=t, query="게이밍 마우스"), lambda n: n == 1),
+        (f"워커 {p} × 스레드 {t} (워커 간 공유 끔)", dict(procs=p, threads=t, query="기계식 키보드", shared=False),
+         lambda n: n <= p),
+    ]
+    failed = 0
+    print(f"가짜 API 지연 {args.latency_ms:.0f}ms\n")
+    for name, kw, expect in cases:
+        n, answers = run(shop, url, **kw)
+        same = len(set(answers)) == 1 and answers[0] is not None
+        ok = expect(n) and same and len(answers) == kw["procs"] * kw["threads"]
+        failed += not ok
+        print(f"  {'✅' if ok else '❌'} {name:<32} 요청 {len(answers):>3}건 → API 호출 {n}건"
+              + ("" if same else "  (결과 불일치)"))
+    server.shutdown()
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
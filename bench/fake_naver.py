@@ -0,0 +1,257 @@
+"""
+로컬 가짜 네이버 쇼핑 검색 API (/v1/search/shop.json) — 쿼터 없이 추적 성능 실험용
+
+실제 API 와 같은 형식(query / display / start / sort / exclude, 응답 total·start·display·items)으로
+키워드마다 결정적인(같은 키워드 → 같은 결과) 합성 검색 결과 1100개를 만든다.
+- 가격비교(productType 1): link = search.shopping.naver.com/catalog/{productId}
+- 스마트스토어(productType 2/3): link = smartstore.naver.com/{slug}/products/{상품번호}
+  (API productId 와 URL 상품번호가 다른 실제 구조 그대로)
+- 중고(4~6) / 렌탈(10~12) 상품이 섞여 있어 exclude=used:rental 필터가 의미 있음
+- plant(query, rank, item) 로 특정 순위에 추적 대상 상품을 심을 수 있음 (bench_tracking.py)
+- 녹화해 둔 실제 응답: --fixtures 파일 {"키워드": [item, ...]} 을 주면 해당 키워드는 그 목록 사용
+
+장애 주입: --latency-ms / --jitter-ms (응답 지연), --rate-429 (확률적 429),
+           --qps (초당 요청 상한, 넘으면 429 — 실제 API 의 초당 호출 제한 흉내)
+           --key-quota (Client ID 별 호출 한도, 넘으면 429 errorCode 010 — 일일 한도 초과 흉내)
+인증 헤더(X-Naver-Client-Id / Secret)가 없으면 401.
+
+사용법:
+  python bench/fake_naver.py --port 8765 --latency-ms 40 --rate-429 0.02
+  NAVER_SHOP_API=http://127.0.0.1:8765/v1/search/shop.json  (engine.py 가 이 주소로 호출)
+"""
+import json
+import time
+import random
+import hashlib
+import argparse
+import threading
+from urllib.parse import urlsplit, parse_qs
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+CORPUS_SIZE = 1100          # 키워드당 결과 수 (API 최대 start 1000 + display 100)
+USED_TYPES = (4, 5, 6)
+RENTAL_TYPES = (10, 11, 12)
+
+
+def _seed(query: str) -> int:
+    return int(hashlib.md5(query.encode("utf-8")).hexdigest()[:12], 16)
+
+
+def synth_item(rnd: random.Random, query: str, n: int) -> dict:
+    """합성 검색 결과 1개"""
+    roll = rnd.random()
+    p_type = 1 if roll < 0.35 else (2 if roll < 0.65 else 3)
+    if rnd.random() < 0.03:
+        p_type = rnd.choice(USED_TYPES + RENTAL_TYPES)
+    product_id = str(rnd.randint(10**10, 10**11 - 1))
+    mall = "네이버" if p_type == 1 else f"쇼핑몰{rnd.randint(0, 99999):05d}"
+    if p_type == 1:
+        link = f"https://search.shopping.naver.com/catalog/{product_id}"
+    else:
+        link = f"https://smartstore.naver.com/store{rnd.randint(0, 9999):04d}/products/{rnd.randint(10**9, 10**10 - 1)}"
+    price = rnd.randint(1000, 300000)
+    return {
+        "title": f"<b>{query}</b> 상품 {n}",
+        "link": link,
+        "image": f"https://shopping-phinf.pstatic.net/main_{product_id}/{product_id}.jpg",
+        "lprice": str(price),
+        "hprice": "" if p_type != 1 else str(price + rnd.randint(0, 50000)),
+        "mallName": mall,
+        "productId": product_id,
+        "productType": str(p_type),
+        "brand": "",
+        "maker": "",
+        "category1": "생활/건강",
+        "category2": "",
+        "category3": "",
+        "category4": "",
+    }
+
+
+class FakeShop:
+    """키워드별 결과 목록 + 심어 둔 상품 + 장애 주입 설정 (서버 스레드 간 공유)"""
+
+    def __init__(self, latency_ms=0.0, jitter_ms=0.0, rate_429=0.0, qps=0.0, fixtures=None, seed=0,
+                 key_quota=0):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.rate_429 = rate_429
+        self.qps = qps
+        self.key_quota = key_quota
+        self.seed = seed
+        self.fixtures = fixtures or {}
+        self._planted = {}          # query → {rank: item}
+        self._corpus = {}           # query → [item] (exclude 적용 전)
+        self._lock = threading.Lock()
+        self._rnd = random.Random(seed)
+        self._window = []           # 최근 1초 요청 시각 (qps 제한)
+        self.stats = {"requests": 0, "ok": 0, "429": 0, "401": 0, "by_query": {}, "by_key": {}}
+
+    def plant(self, query: str, rank: int, item: dict):
+        """exclude=used:rental 기준 검색 결과에서 rank 위에 item 이 오도록 심기"""
+        with self._lock:
+            self._planted.setdefault(query, {})[rank] = item
+            self._corpus.pop(query, None)
+
+    def reset_stats(self):
+        with self._lock:
+            self.stats = {"requests": 0, "ok": 0, "429": 0, "401": 0, "by_query": {}, "by_key": {}}
+
+    def corpus(self, query: str) -> list:
+        with self._lock:
+            items = self._corpus.get(query)
+            if items is None:
+                items = self._build(query)
+                self._corpus[query] = items
+            return items
+
+    def _build(self, query: str) -> list:
+        if query in self.fixtures:
+            base = list(self.fixtures[query])
+        else:
+            rnd = random.Random(_seed(query) ^ self.seed)
+            base = [synth_item(rnd, query, n) for n in range(CORPUS_SIZE)]
+        planted = self._planted.get(query, {})
+        if not planted:
+            return base
+        # 심은 순위는 used/rental 제외 목록 기준 → 제외 대상이 아닌 항목 사이에 끼워 넣음
+        normal = [it for it in base if int(it.get("productType", 1)) not in USED_TYPES + RENTAL_TYPES]
+        for rank in sorted(planted):
+            normal.insert(min(rank - 1, len(normal)), planted[rank])
+        others = [it for it in base if int(it.get("productType", 1)) in USED_TYPES + RENTAL_TYPES]
+        # 제외 대상 상품은 원래 비율대로 뒤섞어 둠 (exclude 없이 검색할 때만 보임)
+        out, step = [], max(1, len(normal) // (len(others) + 1))
+        for i, it in enumerate(normal):
+            out.append(it)
+            if others and i % step == step - 1:
+                out.append(others.pop())
+        return out + others
+
+    def _throttled(self) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            if self.rate_429 and self._rnd.random() < self.rate_429:
+                return True
+            if self.qps:
+                self._window = [t for t in self._window if now - t < 1.0]
+                if len(self._window) >= self.qps:
+                    return True
+                self._window.append(now)
+        return False
+
+    def search(self, params: dict, headers) -> tuple[int, dict]:
+        """(HTTP 상태, 응답 JSON)"""
+        with self._lock:
+            self.stats["requests"] += 1
+        if self.latency_ms or self.jitter_ms:
+            time.sleep(max(0.0, self.latency_ms + random.uniform(-self.jitter_ms, self.jitter_ms)) / 1000)
+        if not headers.get("X-Naver-Client-Id") or not headers.get("X-Naver-Client-Secret"):
+            with self._lock:
+                self.stats["401"] += 1
+            return 401, {"errorMessage": "Not Exist Client ID", "errorCode": "024"}
+        key = headers.get("X-Naver-Client-Id")
+        with self._lock:
+            used = self.stats["by_key"][key] = self.stats["by_key"].get(key, 0) + 1
+        if self.key_quota and used > self.key_quota:
+            with self._lock:
+                self.stats["429"] += 1
+            return 429, {"errorMessage": "Request limit exceeded. (호출 한도를 초과했습니다.)", "errorCode": "010"}
+        if self._throttled():
+            with self._lock:
+                self.stats["429"] += 1
+            return 429, {"errorMessage": "Rate limit exceeded. (속도 제한을 초과했습니다.)", "errorCode": "012"}
+
+        query = params.get("query", "")
+        try:
+            display = int(params.get("display", 10))
+            start = int(params.get("start", 1))
+        except ValueError:
+            return 400, {"errorMessage": "Invalid display/start value", "errorCode": "SE01"}
+        if not query or not (1 <= display <= 100) or not (1 <= start <= 1000):
+            return 400, {"errorMessage": "Incorrect query request", "errorCode": "SE01"}
+
+        items = self.corpus(query)
+        excluded = set()
+        for ex in (params.get("exclude") or "").split(":"):
+            excluded |= {"used": set(USED_TYPES), "rental": set(RENTAL_TYPES)}.get(ex, set())
+        if excluded:
+            items = [it for it in items if int(it.get("productType", 1)) not in excluded]
+        page = items[start - 1:start - 1 + display]
+        with self._lock:
+            self.stats["ok"] += 1
+            self.stats["by_query"][query] = self.stats["by_query"].get(query, 0) + 1
+        return 200, {
+            "lastBuildDate": time.strftime("%a, %d %b %Y %H:%M:%S +0900"),
+            "total": len(items),
+            "start": start,
+            "display": len(page),
+            "items": page,
+        }
+
+
+def make_handler(shop: FakeShop):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlsplit(self.path)
+            if url.path != "/v1/search/shop.json":
+                return self._send(404, {"errorMessage": "Not Found"})
+            params = {k: v[0] for k, v in parse_qs(url.query).items()}
+            self._send(*shop.search(params, self.headers))
+
+        def _send(self, code, body):
+            data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, fmt, *args):
+            pass
+
+    return Handler
+
+
+def serve(shop: FakeShop, host="127.0.0.1", port=0) -> ThreadingHTTPServer:
+    """백그라운드 스레드로 서버 시작 → server (server.server_address 로 실제 포트 확인)"""
+    server = ThreadingHTTPServer((host, port), make_handler(shop))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="fake-naver", daemon=True).start()
+    return server
+
+
+def api_url(server: ThreadingHTTPServer) -> str:
+    host, port = server.server_address[:2]
+    return f"http://{host}:{port}/v1/search/shop.json"
+
+
+def main():
+    ap = argparse.ArgumentParser(description="가짜 네이버 쇼핑 검색 API")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--latency-ms", type=float, default=0)
+    ap.add_argument("--jitter-ms", type=float, default=0)
+    ap.add_argument("--rate-429", type=float, default=0, help="429 응답 확률 (0~1)")
+    ap.add_argument("--qps", type=float, default=0, help="초당 요청 상한 (0 = 무제한)")
+    ap.add_argument("--key-quota", type=int, default=0, help="Client ID 별 호출 한도 (0 = 무제한)")
+    ap.add_argument("--fixtures", help='녹화 응답 JSON {"키워드": [item, ...]}')
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    fixtures = None
+    if args.fixtures:
+        with open(args.fixtures, encoding="utf-8") as f:
+            fixtures = json.load(f)
+    shop = FakeShop(args.latency_ms, args.jitter_ms, args.rate_429, args.qps, fixtures, args.seed,
+                    args.key_quota)
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(shop))
+    print(f"가짜 쇼핑 API: http://{args.host}:{args.port}/v1/search/shop.json  (Ctrl+C 종료)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    print(json.dumps({k: v for k, v in shop.stats.items() if k != "by_query"}, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
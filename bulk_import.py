@@ -0,0 +1,204 @@
+"""
+광고주 / 상품 URL / 키워드 일괄 등록 (CSV · XLSX)
+
+신규 광고주 온보딩 때 상품 수백 개를 /clients/<cid>/products/add 로 하나씩 넣지 않도록
+파일 한 번으로 등록한다.
+- read_rows() : CSV(UTF-8 / CP949, 쉼표·탭) 또는 XLSX 첫 시트 → 헤더 이름으로 열 매핑
+- plan()      : 모든 URL 을 parse_product_info 로 한 번에 파싱, 파일 안 / DB 기존 항목과 중복 제거
+- apply()     : executemany 로 한 트랜잭션에 INSERT → 행별 결과 보고
+
+파일 형식 (헤더 1행, 순서 무관 / 없는 열은 비워도 됨):
+  광고주 | 상품URL | 상품명 | 키워드
+  - 광고주 열이 없으면 요청한 광고주(cid)에 등록
+  - 키워드 칸은 쉼표·줄바꿈으로 여러 개 가능, 상품URL 없이 키워드만 있는 행도 가능
+"""
+import os
+import io
+import re
+import csv
+
+from engine import parse_product_info
+
+BULK_IMPORT_MAX_ROWS = int(os.environ.get("BULK_IMPORT_MAX_ROWS", 5000))
+
+# 헤더 이름(소문자, 공백 제거) → 필드
+HEADER_ALIASES = {
+    "client":       ("광고주", "광고주명", "client", "client_name"),
+    "product_url":  ("상품url", "상품주소", "url", "product_url", "상품링크"),
+    "product_name": ("상품명", "별칭", "상품별칭", "product_name", "name", "alias"),
+    "keywords":     ("키워드", "keyword", "keywords"),
+}
+_HEADER_MAP = {alias: field for field, aliases in HEADER_ALIASES.items() for alias in aliases}
+
+
+class ImportFileError(ValueError):
+    """파일 형식 오류 (헤더 없음 / 지원하지 않는 형식 / 행 수 초과)"""
+
+
+# ────────────────────────────────────────────
+# 파일 읽기
+# ────────────────────────────────────────────
+def _decode(data: bytes) -> str:
+    for enc in ("utf-8-sig", "cp949"):     # 엑셀에서 저장한 한글 CSV 는 CP949 인 경우가 많음
+        try:
+            return data.decode(enc)
+        except UnicodeDecodeError:
+            pass
+    raise ImportFileError("CSV 인코딩을 알 수 없습니다 (UTF-8 또는 CP949 로 저장하세요).")
+
+
+def _csv_rows(data: bytes):
+    text = _decode(data)
+    first = text.split("\n", 1)[0]
+    delimiter = "\t" if first.count("\t") > first.count(",") else ","
+    return list(csv.reader(io.StringIO(text), delimiter=delimiter))
+
+
+def _xlsx_rows(data: bytes):
+    import openpyxl
+    from xlsx_safe import sanitize_xlsx
+
+    buf, _ = sanitize_xlsx(io.BytesIO(data))
+    try:
+        wb = openpyxl.load_workbook(buf, read_only=True, data_only=True)
+        try:
+            return [["" if v is None else str(v) for v in row]
+                    for row in wb.worksheets[0].iter_rows(values_only=True)]
+        finally:
+            wb.close()
+    finally:
+        buf.close()
+
+
+def read_rows(data: bytes, filename: str = "") -> list[dict]:
+    """파일 → [{"row": 엑셀 행 번호, "client", "product_url", "product_name", "keywords": [..]}]"""
+    name = filename.lower()
+    if name.endswith((".xlsx", ".xlsm")) or data[:2] == b"PK":
+        raw = _xlsx_rows(data)
+    elif name.endswith((".csv", ".tsv", ".txt")) or not name:
+        raw = _csv_rows(data)
+    else:
+        raise ImportFileError("CSV 또는 XLSX 파일만 지원합니다.")
+
+    header_idx = next((i for i, r in enumerate(raw) if any(c.strip() for c in r)), None)
+    if header_idx is None:
+        raise ImportFileError("빈 파일입니다.")
+    cols = {}
+    for i, h in enumerate(raw[header_idx]):
+        field = _HEADER_MAP.get(re.sub(r"\s+", "", h).lower())
+        if field and field not in cols:
+            cols[field] = i
+    if "product_url" not in cols and "keywords" not in cols:
+        raise ImportFileError("헤더에 '상품URL' 또는 '키워드' 열이 필요합니다.")
+
+    rows = []
+    for n, r in enumerate(raw[header_idx + 1:], start=header_idx + 2):
+        cell = lambda f: r[cols[f]].strip() if f in cols and cols[f] < len(r) else ""
+        item = {"row": n, "client": cell("client"), "product_url": cell("product_url"),
+                "product_name": cell("product_name"),
+                "keywords": [k.strip() for k in re.split(r"[,\n]+", cell("keywords")) if k.strip()]}
+        if item["product_url"] or item["keywords"]:
+            rows.append(item)
+    if len(rows) > BULK_IMPORT_MAX_ROWS:
+        raise ImportFileError(f"한 번에 최대 {BULK_IMPORT_MAX_ROWS}행까지 등록할 수 있습니다 ({len(rows)}행).")
+    return rows
+
+
+# ────────────────────────────────────────────
+# 계획 / 적용
+# ────────────────────────────────────────────
+def product_fields(product_url: str, product_name: str = "") -> dict:
+    """상품 URL → products 행 값 (단건 등록 /clients/<cid>/products/add 와 같은 규칙)"""
+    info = parse_product_info(product_url)
+    product_id = info.get("product_id", "") or product_url
+    return {"product_url": product_url, "product_id": product_id,
+            "catalog_id": info.get("catalog_id", ""), "url_product_id": info.get("product_id", ""),
+            "product_name": product_name or product_id, "url_type": info.get("url_type")}
+
+
+def plan(conn, rows: list[dict], default_cid: int | None = None, create_clients: bool = True) -> dict:
+    """DB 변경 없이 등록 계획 + 행별 보고 작성
+
+    Returns: {"new_clients": [이름], "products": [(client 키, fields)], "keywords": [(client 키, kw)],
+              "report": [{"row", "client", "product", "product_id", "keywords_added", "keywords_duplicate",
+                          "error"}]}
+    product 는 added / duplicate / invalid(URL·상품번호가 아님) / None(상품 열 비어 있음)
+    client 키는 기존 광고주면 id(int), 새로 만들 광고주면 이름(str)
+    """
+    clients = {r["name"]: r["id"] for r in conn.execute("SELECT id, name FROM clients").fetchall()}
+    existing_products = {(r["client_id"], r["product_id"]) for r in
+                         conn.execute("SELECT client_id, product_id FROM products").fetchall()}
+    existing_keywords = {(r["client_id"], r["keyword"]) for r in
+                         conn.execute("SELECT client_id, keyword FROM keywords").fetchall()}
+
+    # 같은 URL 은 한 번만 파싱
+    parsed = {url: product_fields(url) for url in {r["product_url"] for r in rows if r["product_url"]}}
+
+    out = {"new_clients": [], "products": [], "keywords": [], "report": []}
+    seen_products, seen_keywords = set(existing_products), set(existing_keywords)
+    for r in rows:
+        rep = {"row": r["row"], "client": r["client"], "product": None, "product_id": None,
+               "keywords_added": [], "keywords_duplicate": [], "error": None}
+        out["report"].append(rep)
+
+        if r["client"]:
+            key = clients.get(r["client"])
+            if key is None:
+                if not create_clients:
+                    rep["error"] = "존재하지 않는 광고주"
+                    continue
+                key = r["client"]
+                if key not in out["new_clients"]:
+                    out["new_clients"].append(key)
+        elif default_cid is not None:
+            key = default_cid
+        else:
+            rep["error"] = "광고주가 비어 있음"
+            continue
+
+        if r["product_url"]:
+            fields = {**parsed[r["product_url"]]}
+            if r["product_name"]:
+                fields["product_name"] = r["product_name"]
+            rep["product_id"] = fields["product_id"]
+            if fields["url_type"] == "unknown" and not re.match(r"https?://", r["product_url"]):
+                rep["product"] = "invalid"
+            elif (key, fields["product_id"]) in seen_products:
+                rep["product"] = "duplicate"
+            else:
+                seen_products.add((key, fields["product_id"]))
+                out["products"].append((key, fields))
+                rep["product"] = "added"
+
+        for kw in r["keywords"]:
+            if (key, kw) in seen_keywords:
+                rep["keywords_duplicate"].append(kw)
+            else:
+                seen_keywords.add((key, kw))
+                out["keywords"].append((key, kw))
+                rep["keywords_added"].append(kw)
+    return out
+
+
+def apply(conn, p: dict) -> dict:
+    """plan() 결과를 한 트랜잭션으로 기록 → {"clients_added", "products_added", "keywords_added"}"""
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        conn.executemany("INSERT OR IGNORE INTO clients (name, memo) VALUES (?,?)",
+                         [(name, "") for name in p["new_clients"]])
+        ids = {r["name"]: r["id"] for r in conn.execute("SELECT id, name FROM clients").fetchall()}
+        cid = lambda key: key if isinstance(key, int) else ids[key]
+        conn.executemany("""
+            INSERT INTO products
+            (client_id,product_url,product_id,catalog_id,url_product_id,mall_name,product_name)
+            VALUES (?,?,?,?,?,?,?)
+        """, [(cid(key), f["product_url"], f["product_id"], f["catalog_id"], f["url_product_id"], "",
+               f["product_name"]) for key, f in p["products"]])
+        conn.executemany("INSERT OR IGNORE INTO keywords (client_id,keyword) VALUES (?,?)",
+                         [(cid(key), kw) for key, kw in p["keywords"]])
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return {"clients_added": len(p["new_clients"]), "products_added": len(p["products"]),
+            "keywords_added": len(p["keywords"])}
@@ -0,0 +1,128 @@
+"""
+조합(상품×키워드)별 확인 방식 결정 — 최근 순위 변동성 / 미발견 연속 횟수 기반
+
+매 회차 모든 조합을 10페이지(1000위) 전체 탐색하면 순위가 몇 주째 그대로이거나
+1000위 밖(미발견)인 조합에도 같은 API 호출을 쓴다. rank_history 최근 HISTORY_N 건으로:
+- 변동 큼 (volatile)  : 매 회차 전체 탐색 + window 모드에서는 시간대 중간에 한 번 더 (hot pass)
+- 안정 (stable)       : 직전 순위 페이지 1개만 확인하는 probe → 순위가 바뀌었으면 전체 탐색으로 전환
+                        (STABLE_FULL_H 시간마다는 무조건 전체 탐색)
+- 연속 미발견          : NF_STREAK 회 이상이면 확인 간격을 NF_BASE_H → NF_MAX_H 까지 2배씩 늘림
+- 그 외 / 기록 부족    : 전체 탐색
+
+수동 전체 추적은 항상 전체 탐색 — 이 정책은 자동 스케줄(schedule / window / hot)에만 적용.
+"""
+import os
+from datetime import datetime
+
+from db import get_conn
+
+ADAPTIVE       = os.environ.get("TRACK_ADAPTIVE", "1") != "0"
+
+HISTORY_N      = 8       # 조합별로 보는 최근 기록 수
+MIN_SAMPLES    = 3       # 이보다 기록이 적으면 전체 탐색
+VOLATILE_REL   = 0.15    # 평균 |순위 변화| / 평균 순위 ≥ 이 값이면 volatile
+STABLE_REL     = 0.05    # ≤ 이 값이면 stable
+STABLE_FULL_H  = float(os.environ.get("TRACK_STABLE_FULL_H", 72))
+VOLATILE_H     = float(os.environ.get("TRACK_VOLATILE_H", 2))   # hot pass 재확인 최소 간격
+NF_STREAK      = 3
+NF_BASE_H      = 24
+NF_MAX_H       = 168
+# 간격 비교 여유 — 매일 같은 시각 회차도 실행 시각이 몇 초~몇 분씩 흔들리므로 (23.99h < 24h 로
+# 하루씩 밀리지 않게) 간격에서 이만큼 빼고 비교. 짧은 간격(hot pass)은 간격의 1/4 까지만.
+INTERVAL_SLACK_H = float(os.environ.get("TRACK_INTERVAL_SLACK_H", 1))
+
+_TS_FMT = "%Y-%m-%d %H:%M:%S"
+
+
+def load_stats(client_id: int) -> dict:
+    """광고주의 조합별 최근 기록 요약 → {(product_id, keyword): stats}
+
+    stats: {samples, last_rank, last_at, last_full_at, nf_streak, volatility(None=판단 불가)}
+    """
+    conn = get_conn()
+    rows = conn.execute("""
+        SELECT product_id, keyword, rank, scan, checked_at FROM (
+            SELECT product_id, keyword, rank, scan, checked_at,
+                   ROW_NUMBER() OVER (PARTITION BY product_id, keyword ORDER BY checked_at DESC) AS rn
+            FROM rank_history WHERE client_id=? AND status = 'ok'     -- 확인 실패 기록은 판단에서 제외
+        ) WHERE rn <= ? ORDER BY product_id, keyword, checked_at DESC
+    """, (client_id, HISTORY_N)).fetchall()
+    conn.close()
+
+    grouped = {}
+    for r in rows:
+        grouped.setdefault((r["product_id"], r["keyword"]), []).append(r)
+    return {key: summarize(hist) for key, hist in grouped.items()}
+
+
+def summarize(hist: list) -> dict:
+    """최신순 기록 [{rank, scan, checked_at}] → stats"""
+    nf_streak = 0
+    for h in hist:
+        if h["rank"] is not None:
+            break
+        nf_streak += 1
+    ranks = [h["rank"] for h in reversed(hist) if h["rank"] is not None]
+    volatility = None
+    if len(ranks) >= 2:
+        deltas = [abs(b - a) for a, b in zip(ranks, ranks[1:])]
+        volatility = (sum(deltas) / len(deltas)) / (sum(ranks) / len(ranks))
+    last_full = next((h["checked_at"] for h in hist if h["scan"] != "probe"), None)
+    return {
+        "samples": len(hist),
+        "last_rank": hist[0]["rank"],
+        "last_at": hist[0]["checked_at"],
+        "last_full_at": last_full,
+        "nf_streak": nf_streak,
+        "volatility": volatility,
+    }
+
+
+def _hours_since(ts: str | None, now: datetime) -> float:
+    if not ts:
+        return float("inf")
+    return (now - datetime.strptime(ts[:19], _TS_FMT)).total_seconds() / 3600
+
+
+def _due(ts: str | None, now: datetime, interval: float) -> bool:
+    """마지막 확인(ts) 후 interval 시간이 지났는지 — INTERVAL_SLACK_H 만큼 일찍 도래로 본다"""
+    return _hours_since(ts, now) >= interval - min(INTERVAL_SLACK_H, interval / 4)
+
+
+def decide(st: dict | None, now: datetime) -> tuple[str, int | None]:
+    """정기 회차의 확인 방식 → ("full" | "probe" | "skip", probe 할 직전 순위)"""
+    if not st or st["samples"] < MIN_SAMPLES:
+        return "full", None
+    if st["nf_streak"] >= NF_STREAK:
+        interval = min(NF_BASE_H * 2 ** (st["nf_streak"] - NF_STREAK), NF_MAX_H)
+        return ("full" if _due(st["last_at"], now, interval) else "skip"), None
+    if st["last_rank"] is None:
+        return "full", None
+    if st["volatility"] is not None and st["volatility"] <= STABLE_REL:
+        if _due(st["last_full_at"], now, STABLE_FULL_H):
+            return "full", None
+        return "probe", st["last_rank"]
+    return "full", None
+
+
+def decide_hot(st: dict | None, now: datetime) -> tuple[str, int | None]:
+    """hot pass — volatile 조합 중 VOLATILE_H 시간 넘게 확인 안 한 것만 전체 탐색"""
+    if (st and st["nf_streak"] == 0 and st["volatility"] is not None
+            and st["volatility"] >= VOLATILE_REL and _due(st["last_at"], now, VOLATILE_H)):
+        return "full", None
+    return "skip", None
+
+
+def make_decider(client_id: int, hot: bool = False):
+    """engine.track_client(decide=...) 에 넘길 함수 — 호출마다 결정 결과를 .counts 에 집계"""
+    stats = load_stats(client_id)
+    now = datetime.now()
+    rule = decide_hot if hot else decide
+
+    def decider(product_id, keyword):
+        mode, hint = rule(stats.get((str(product_id), keyword)), now)
+        decider.counts[mode] = decider.counts.get(mode, 0) + 1
+        return mode, hint
+
+    decider.counts = {}
+    return decider
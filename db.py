@@ -3,12 +3,53 @@
 """
 import sqlite3
 import os
+import time
+
+import metrics
+import profiling
 
 _default = "/data/agency.db" if os.path.isdir("/data") else "/tmp/agency.db"
 DB_PATH = os.environ.get("DB_PATH", _default)
 
+
+def _sql_op(sql: str) -> str:
+    op = sql.lstrip().split(None, 1)[0].lower() if sql.strip() else ""
+    return op if op in ("select", "insert", "update", "delete", "with", "create", "pragma", "begin") else "other"
+
+
+class TimedConnection(sqlite3.Connection):
+    """execute / executemany / commit 소요 시간을 metrics 에 기록하는 연결"""
+
+    def execute(self, sql, *args):
+        t0 = time.perf_counter()
+        try:
+            return super().execute(sql, *args)
+        finally:
+            dt = time.perf_counter() - t0
+            metrics.DB_QUERY_SECONDS.observe(dt, op=_sql_op(sql))
+            profiling.add("db", dt)
+
+    def executemany(self, sql, *args):
+        t0 = time.perf_counter()
+        try:
+            return super().executemany(sql, *args)
+        finally:
+            dt = time.perf_counter() - t0
+            metrics.DB_QUERY_SECONDS.observe(dt, op=_sql_op(sql))
+            profiling.add("db", dt)
+
+    def commit(self):
+        t0 = time.perf_counter()
+        try:
+            return super().commit()
+        finally:
+            dt = time.perf_counter() - t0
+            metrics.DB_COMMIT_SECONDS.observe(dt)
+            profiling.add("db", dt)
+
+
 def get_conn():
-    conn = sqlite3.connect(DB_PATH)
+    conn = sqlite3.connect(DB_PATH, factory=TimedConnection)
     conn.row_factory = sqlite3.Row
     conn.execute("PRAGMA journal_mode=WAL")
     return conn
@@ -27,6 +68,12 @@ def init_db():
         )
     """)
 
+    # 자동 추적 주기 (window 모드) — daily / hourly (track_schedule.py)
+    try:
+        c.execute("ALTER TABLE clients ADD COLUMN track_cadence TEXT DEFAULT 'daily'")
+    except Exception:
+        pass
+
     # products 테이블: catalog_id + mall_name + url_product_id 추가
     c.execute("""
         CREATE TABLE IF NOT EXISTS products (
@@ -76,12 +123,26 @@ def init_db():
     """)
 
     # rank_history 마이그레이션
-    for col, col_type in [("product_type", "INTEGER"), ("matched_id", "TEXT")]:
+    # scan: full(전체 탐색) / probe(직전 순위 페이지만 확인) — check_policy.py
+    # status: ok(확인 완료 — rank NULL 이면 미발견) / failed(API 실패로 확인 못 함, error = 실패 종류) — engine.py
+    for col, col_type in [("product_type", "INTEGER"), ("matched_id", "TEXT"), ("scan", "TEXT"),
+                          ("status", "TEXT DEFAULT 'ok'"), ("error", "TEXT")]:
         try:
             c.execute(f"ALTER TABLE rank_history ADD COLUMN {col} {col_type}")
         except Exception:
             pass
 
+    # 순위 확인 시 최근 추적 결과 조회용 (/api/check-rank)
+    c.execute("""
+        CREATE INDEX IF NOT EXISTS idx_rank_history_pid_kw
+        ON rank_history (product_id, keyword, checked_at)
+    """)
+    # 자동 추적 시 광고주별 조합 최근 기록 조회용 (check_policy.load_stats)
+    c.execute("""
+        CREATE INDEX IF NOT EXISTS idx_rank_history_client
+        ON rank_history (client_id, product_id, keyword, checked_at)
+    """)
+
     c.execute("""
         CREATE TABLE IF NOT EXISTS settings (
             key   TEXT PRIMARY KEY,
@@ -89,6 +150,153 @@ def init_db():
         )
     """)
 
+    # 네이버 검색 API 키 풀 (애플리케이션별 일일 할당량 / 용도) — api_keys.py
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS api_credentials (
+            id              INTEGER PRIMARY KEY AUTOINCREMENT,
+            label           TEXT,
+            client_id       TEXT    NOT NULL UNIQUE,
+            client_secret   TEXT    NOT NULL,
+            role            TEXT    NOT NULL DEFAULT 'any',     -- any / interactive / background
+            daily_quota     INTEGER NOT NULL DEFAULT 25000,
+            enabled         INTEGER NOT NULL DEFAULT 1,
+            usage_date      TEXT,                               -- KST 날짜 (바뀌면 used_today 0부터)
+            used_today      INTEGER NOT NULL DEFAULT 0,
+            cooldown_until  REAL    DEFAULT 0,                  -- epoch 초 (429 / 인증 오류 후 쉬는 시간)
+            last_error      TEXT,
+            last_used_at    TEXT,
+            created_at      TEXT    DEFAULT (datetime('now','localtime'))
+        )
+    """)
+
+    # 플레이스 메타데이터 캐시 (업체명 / 주변 명소) — meta_cache.py
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS place_cache (
+            place_id    TEXT    NOT NULL,
+            category    TEXT    NOT NULL,   -- restaurant / cafe / place ...
+            kind        TEXT    NOT NULL,   -- name | spots
+            ok          INTEGER NOT NULL,   -- 0 = 실패 결과(negative cache)
+            payload     TEXT,               -- JSON (업체명 문자열 / 명소 이름 목록)
+            method      TEXT,               -- 추출 방법 (apollo, mobile_around_filter100 ...)
+            fetched_at  TEXT    NOT NULL,
+            expires_at  TEXT    NOT NULL,
+            PRIMARY KEY (place_id, category, kind)
+        )
+    """)
+
+    # 스마트스토어 업체명 캐시 (slug, pid → mallName) — meta_cache.py
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS store_name_cache (
+            slug        TEXT    NOT NULL,
+            pid         TEXT    NOT NULL DEFAULT '',
+            ok          INTEGER NOT NULL,   -- 0 = 원부상품/slug 폴백 (negative cache)
+            name        TEXT,
+            source      TEXT,               -- api-kw / api-slug / crawl / crawl-title / 원부상품 / slug
+            is_origin   INTEGER DEFAULT 0,  -- '원부 상품' 여부
+            keyword     TEXT    DEFAULT '', -- negative 항목을 만들 때 시도한 검색어 (meta_cache.get_store)
+            fetched_at  TEXT    NOT NULL,
+            expires_at  TEXT    NOT NULL,
+            PRIMARY KEY (slug, pid)
+        )
+    """)
+    try:
+        c.execute("ALTER TABLE store_name_cache ADD COLUMN keyword TEXT DEFAULT ''")
+    except Exception:
+        pass
+
+    # 쇼핑 API 응답 캐시 — shop_cache.py ([start, start+display) 구간 단위, payload = zlib JSON)
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS shop_cache (
+            qkey        TEXT    NOT NULL,   -- 정규화 검색어 + sort + exclude
+            start       INTEGER NOT NULL,
+            display     INTEGER NOT NULL,
+            payload     BLOB    NOT NULL,
+            bytes       INTEGER NOT NULL,
+            fetched_at  TEXT    NOT NULL,
+            expires_at  TEXT    NOT NULL,
+            last_used   TEXT    NOT NULL,   -- LRU 삭제 기준
+            PRIMARY KEY (qkey, start, display)
+        )
+    """)
+    c.execute("CREATE INDEX IF NOT EXISTS idx_shop_cache_last_used ON shop_cache (last_used)")
+
+    # 워커 간 동일 업스트림 호출 합치기 잠금 (짧은 수명) — singleflight.py
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS singleflight_locks (
+            key         TEXT PRIMARY KEY,    -- kind:sha1(요청 키)
+            owner       TEXT NOT NULL,       -- pid:nonce
+            expires_at  REAL NOT NULL        -- epoch 초
+        )
+    """)
+
+    # 순위 추적 실행 진행 상황 (워커 간 공유) — track_runs.py
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS tracking_runs (
+            id              INTEGER PRIMARY KEY AUTOINCREMENT,
+            source          TEXT,               -- manual / schedule
+            status          TEXT    NOT NULL,   -- running | done | error
+            total           INTEGER DEFAULT 0,  -- 상품×키워드 조합 수
+            done            INTEGER DEFAULT 0,
+            current_client  TEXT,
+            api_calls       INTEGER DEFAULT 0,  -- 쇼핑 API 호출 수
+            errors          INTEGER DEFAULT 0,
+            last_error      TEXT,
+            owner_pid       INTEGER,            -- 추적을 실행하는 프로세스 (웹 워커 / CLI)
+            owner_host      TEXT,               -- 그 프로세스의 호스트명/PID 네임스페이스 — track_runs._HOST
+            started_at      TEXT    NOT NULL,
+            updated_at      TEXT,
+            finished_at     TEXT,
+            heartbeat_at    REAL                -- 실행 중 프로세스의 마지막 heartbeat (epoch 초)
+        )
+    """)
+    for col, col_type in [("heartbeat_at", "REAL"), ("owner_host", "TEXT")]:
+        try:
+            c.execute(f"ALTER TABLE tracking_runs ADD COLUMN {col} {col_type}")
+        except Exception:
+            pass
+
+    # 스케줄러 리더 임대 (gunicorn 워커 중 하나만 APScheduler 실행) — leader.py
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS scheduler_lease (
+            name         TEXT PRIMARY KEY,
+            owner        TEXT NOT NULL,      -- host:pid:nonce
+            expires_at   REAL NOT NULL,      -- epoch 초
+            acquired_at  REAL
+        )
+    """)
+    # 스케줄 작업 회차별 실행권 (리더 교체 시 중복 실행 방지)
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS scheduler_slots (
+            job_id      TEXT NOT NULL,
+            slot        TEXT NOT NULL,       -- 예: 2026-02-26 (daily_track)
+            owner_pid   INTEGER,
+            claimed_at  TEXT,
+            PRIMARY KEY (job_id, slot)
+        )
+    """)
+
+    # 백그라운드 작업 (엑셀 생성 / 플레이스 순위 확인) — jobs.py
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS jobs (
+            id             TEXT    PRIMARY KEY,
+            kind           TEXT    NOT NULL,   -- excel-export / excel-fill / place-excel-fill / check-place-rank
+            status         TEXT    NOT NULL,   -- queued | running | done | error
+            done           INTEGER DEFAULT 0,
+            total          INTEGER DEFAULT 0,
+            message        TEXT,
+            result         TEXT,               -- JSON
+            error          TEXT,
+            artifact_path  TEXT,               -- 결과 파일 (JOBS_DIR/{id}/artifact.xlsx)
+            artifact_name  TEXT,               -- 다운로드 파일명
+            owner_pid      INTEGER,            -- 작업을 실행하는 워커 프로세스
+            created_at     TEXT    NOT NULL,
+            started_at     TEXT,
+            finished_at    TEXT,
+            expires_at     TEXT    NOT NULL
+        )
+    """)
+    c.execute("CREATE INDEX IF NOT EXISTS idx_jobs_expires ON jobs (expires_at)")
+
     conn.commit()
     conn.close()
     print(f"[DB] 초기화 완료: {DB_PATH}")
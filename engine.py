@@ -20,15 +20,60 @@
 2순위: product_id 직접 매칭 (일반 상품)
 3순위: mall_name 부분 일치 (fallback)
 """
+import os
 import re
 import time
+import random
 import requests
 import logging
+import threading
+from operator import itemgetter
 from datetime import datetime
+from email.utils import parsedate_to_datetime
+
+import metrics
+import api_keys
+import naver_http
+import shop_cache
 
 logger = logging.getLogger(__name__)
 
-NAVER_SHOP_API = "https://openapi.naver.com/v1/search/shop.json"
+# 로컬 벤치마크(bench/fake_naver.py) 등에서 다른 주소로 바꿀 수 있음
+NAVER_SHOP_API = os.environ.get("NAVER_SHOP_API", "https://openapi.naver.com/v1/search/shop.json")
+
+# ── API 실패 재시도 / 차단기 (환경변수로 조정 가능) ──
+# 순위 추적(background) — 오래 기다려도 되니 끈질기게 재시도
+SHOP_API_RETRIES          = int(os.environ.get("SHOP_API_RETRIES", 3))            # 첫 호출 외 재시도 횟수
+SHOP_API_TIMEOUT_SEC      = float(os.environ.get("SHOP_API_TIMEOUT_SEC", 10))
+SHOP_API_BACKOFF_SEC      = float(os.environ.get("SHOP_API_BACKOFF_SEC", 0.5))    # 첫 재시도 대기 (2배씩 증가)
+SHOP_API_BACKOFF_MAX_SEC  = float(os.environ.get("SHOP_API_BACKOFF_MAX_SEC", 8))
+SHOP_API_RETRY_AFTER_MAX  = float(os.environ.get("SHOP_API_RETRY_AFTER_MAX", 60)) # Retry-After 상한
+# 화면 요청(interactive) — 요청 스레드를 붙잡고, 다른 워커가 single-flight 로
+# 최대 SINGLEFLIGHT_WAIT_SEC 기다리므로 짧게 1회만 재시도하고 전체 소요를 SHOP_UI_BUDGET_SEC 안으로
+SHOP_UI_RETRIES           = int(os.environ.get("SHOP_UI_RETRIES", 1))
+SHOP_UI_TIMEOUT_SEC       = float(os.environ.get("SHOP_UI_TIMEOUT_SEC", 4))
+SHOP_UI_RETRY_AFTER_MAX   = float(os.environ.get("SHOP_UI_RETRY_AFTER_MAX", 2))   # 더 길면 기다리지 않고 실패
+SHOP_UI_BUDGET_SEC        = float(os.environ.get("SHOP_UI_BUDGET_SEC", 8))
+SHOP_BREAKER_THRESHOLD    = int(os.environ.get("SHOP_BREAKER_THRESHOLD", 5))      # 연속 실패 → 차단
+SHOP_BREAKER_COOLDOWN_SEC = float(os.environ.get("SHOP_BREAKER_COOLDOWN_SEC", 30))
+SHOP_BREAKER_MAX_PAUSE_SEC = float(os.environ.get("SHOP_BREAKER_MAX_PAUSE_SEC", 300))  # 추적 1회 최대 일시정지
+
+RETRYABLE = ("rate_limit", "server", "timeout", "network")
+
+# 호출 용도별 재시도 정책 (budget = 전체 소요 상한 초, None 이면 제한 없음)
+_POLICIES = {
+    "background":  {"retries": SHOP_API_RETRIES, "timeout": SHOP_API_TIMEOUT_SEC,
+                    "retry_after_max": SHOP_API_RETRY_AFTER_MAX, "budget": None},
+    "interactive": {"retries": SHOP_UI_RETRIES, "timeout": SHOP_UI_TIMEOUT_SEC,
+                    "retry_after_max": SHOP_UI_RETRY_AFTER_MAX, "budget": SHOP_UI_BUDGET_SEC},
+}
+
+API_FAILURES = metrics.counter("naver_shop_api_failures_total",
+                               "쇼핑 API 최종 실패 (kind = rate_limit / server / timeout / network / auth / client / "
+                               "circuit_open)")
+API_RETRIES  = metrics.counter("naver_shop_api_retries_total", "쇼핑 API 재시도 (kind = 직전 실패 종류)")
+BREAKER_OPEN = metrics.counter("naver_shop_breaker_open_total",
+                               "쇼핑 API 차단기 열림 횟수 (purpose = interactive / background)")
 
 
 # ─────────────────────────────────────────
@@ -102,31 +147,219 @@ def parse_product_id(url: str) -> str | None:
 # ─────────────────────────────────────────
 # 네이버 쇼핑 API 호출
 # ─────────────────────────────────────────
+class SearchFailure(Exception):
+    """쇼핑 API 호출 실패 (재시도 후)
+
+    kind: rate_limit(429) / server(5xx, 깨진 응답) / timeout / network / auth(401·403) /
+          client(그 외 4xx) / circuit_open(차단기 열림 — 호출하지 않음)
+    """
+
+    def __init__(self, kind: str, message: str = "", status: int | None = None,
+                 retry_after: float | None = None, attempts: int = 0):
+        super().__init__(f"{kind}: {message}" if message else kind)
+        self.kind = kind
+        self.status = status
+        self.retry_after = retry_after
+        self.attempts = attempts
+
+
+class CircuitBreaker:
+    """연속 실패가 threshold 회 이상이면 cooldown 초 동안 호출 차단 (프로세스 안, 호출 용도별 1개)
+
+    cooldown 이 지나면 다시 호출을 허용하고, 그 호출이 또 실패하면 바로 다시 차단 / 성공하면 초기화.
+    """
+
+    def __init__(self, purpose: str, threshold: int = SHOP_BREAKER_THRESHOLD,
+                 cooldown: float = SHOP_BREAKER_COOLDOWN_SEC):
+        self.purpose = purpose
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.open_until = 0.0
+        self._lock = threading.Lock()
+
+    def remaining(self) -> float:
+        """차단 남은 시간(초) — 0 이면 호출 가능"""
+        if self.failures < self.threshold:
+            return 0.0
+        return max(0.0, self.open_until - time.monotonic())
+
+    def allow(self) -> bool:
+        return self.remaining() == 0.0
+
+    def success(self):
+        if self.failures:
+            with self._lock:
+                self.failures = 0
+
+    def failure(self, kind: str):
+        with self._lock:
+            self.failures += 1
+            if self.failures < self.threshold:
+                return
+            was_open = time.monotonic() < self.open_until
+            self.open_until = time.monotonic() + self.cooldown
+        if not was_open:
+            BREAKER_OPEN.inc(purpose=self.purpose)
+            logger.warning(f"[ShopAPI] {self.purpose} 연속 실패 {self.failures}회 ({kind}) — "
+                           f"{self.cooldown:.0f}초 동안 호출 중단")
+
+
+# 추적의 429 폭주가 화면 요청을 막지 않도록 (그 반대도) 용도별로 따로 둠
+breakers = {purpose: CircuitBreaker(purpose) for purpose in _POLICIES}
+breaker = breakers["background"]     # 순위 추적 (track_client 일시정지 판단)
+
+_tls = threading.local()
+
+
+def api_attempts() -> int:
+    """이 스레드가 지금까지 보낸 쇼핑 API 요청 수 (재시도 · 키 교체 포함, 캐시 적중 / 합쳐진 호출 제외)
+
+    호출 측은 전후 차이로 실제 사용한 할당량을 센다 (find_rank 의 api_calls).
+    """
+    return getattr(_tls, "attempts", 0)
+
+
+def _retry_after(resp) -> float | None:
+    """Retry-After 헤더 (초 또는 HTTP 날짜) → 대기 초 / 없으면 None"""
+    value = (resp.headers.get("Retry-After") or "").strip() if resp is not None else ""
+    if not value:
+        return None
+    try:
+        sec = float(value)
+    except ValueError:
+        try:
+            sec = parsedate_to_datetime(value).timestamp() - time.time()
+        except (TypeError, ValueError):
+            return None
+    return min(max(sec, 0.0), SHOP_API_RETRY_AFTER_MAX)
+
+
+def _error_code(resp) -> str | None:
+    """네이버 오픈API 오류 응답의 errorCode (429: 010 = 일일 한도 초과, 012 = 초당 제한)"""
+    try:
+        return str(resp.json().get("errorCode") or "") or None
+    except (ValueError, AttributeError):
+        return None
+
+
+def _classify(resp) -> tuple[str, str]:
+    code = resp.status_code
+    if code == 429:
+        return "rate_limit", "HTTP 429"
+    if code in (401, 403):
+        return "auth", f"HTTP {code}"
+    if code >= 500:
+        return "server", f"HTTP {code}"
+    return "client", f"HTTP {code}"
+
+
+def _backoff(attempt: int, retry_after: float | None) -> float:
+    """지수 백오프 + full jitter, Retry-After 가 있으면 그보다 짧게 기다리지 않음"""
+    delay = random.uniform(0, min(SHOP_API_BACKOFF_MAX_SEC, SHOP_API_BACKOFF_SEC * 2 ** attempt))
+    return max(delay, retry_after or 0.0)
+
+
 def search_shopping(client_id: str, client_secret: str,
-                    query: str, start: int = 1, display: int = 100) -> dict | None:
-    headers = {
-        "X-Naver-Client-Id": client_id,
-        "X-Naver-Client-Secret": client_secret,
-    }
+                    query: str, start: int = 1, display: int = 100,
+                    exclude: str | None = "used:rental", use_cache: bool = True,
+                    raise_errors: bool = False, purpose: str = "interactive") -> dict | None:
+    """
+    Args:
+        exclude: 제외 필터 — 기본은 가격비교 포함, used/rental만 제외
+                 (cbshop=해외직구 포함 여부는 광고주 설정에 따라)
+                 None 이면 필터 없이 검색 (업무 자동화 화면의 상위 30개 확인용)
+        use_cache: False 면 응답 캐시(shop_cache)를 읽지 않고 새로 조회 (결과는 캐시에 저장)
+        raise_errors: True 면 실패 시 SearchFailure 를 올림 (순위 추적 — 실패와 미발견 구분),
+                      False 면 None 반환 (화면용 단건 조회)
+        purpose: interactive(화면 요청 — 짧은 재시도) / background(순위 추적 — 끈질긴 재시도)
+                 재시도 정책 · 차단기 · 동일 요청 합치기(single-flight)를 용도별로 따로 씀
+    """
+    query = shop_cache.normalize_query(query)
+    purpose = purpose if purpose in _POLICIES else "interactive"
+    try:
+        return shop_cache.fetch(
+            lambda s, d: _search_shopping_api(client_id, client_secret, query, s, d, exclude, purpose),
+            query, start, display, exclude=exclude, use_cache=use_cache,
+            flight="shop" if purpose == "interactive" else f"shop_{purpose}")
+    except SearchFailure:
+        if raise_errors:
+            raise
+        return None
+
+
+def _search_shopping_api(client_id: str, client_secret: str, query: str,
+                         start: int, display: int, exclude: str | None,
+                         purpose: str = "interactive") -> dict:
+    """API 1페이지 호출 — 429 / 5xx / 타임아웃 / 연결 오류는 백오프 후 재시도, 최종 실패는 SearchFailure
+
+    재시도 횟수 · 타임아웃 · Retry-After 상한 · 전체 소요 상한은 purpose 별 정책(_POLICIES)
+
+    키 풀(api_keys)에 등록된 키면 호출마다 사용량을 기록하고, 429 / 인증 오류로 그 키가 제외되면
+    같은 용도의 다른 키로 바꿔 바로 다시 호출 (대기·재시도 횟수 차감 없음)
+    """
+    client_id, client_secret = api_keys.route(client_id, client_secret)
     params = {
         "query": query,
         "display": display,
         "start": start,
         "sort": "sim",
-        # 가격비교 포함: used/rental만 제외 (cbshop=해외직구 포함 여부는 광고주 설정에 따라)
-        "exclude": "used:rental",
     }
-    try:
-        resp = requests.get(NAVER_SHOP_API, headers=headers, params=params, timeout=10)
-        resp.raise_for_status()
-        return resp.json()
-    except requests.HTTPError as e:
-        code = e.response.status_code if e.response else 0
-        logger.error(f"API HTTP {code} 오류: {e}")
-        return None
-    except Exception as e:
-        logger.error(f"API 호출 오류: {e}")
-        return None
+    if exclude:
+        params["exclude"] = exclude
+
+    policy, brk = _POLICIES[purpose], breakers[purpose]
+    t0 = time.monotonic()
+    attempt = 0
+    while True:
+        if not brk.allow():
+            API_FAILURES.inc(kind="circuit_open")
+            raise SearchFailure("circuit_open", f"{brk.remaining():.0f}초 뒤 재개", attempts=attempt)
+        status, retry_after, code = None, None, None
+        headers = {
+            "X-Naver-Client-Id": client_id,
+            "X-Naver-Client-Secret": client_secret,
+        }
+        _tls.attempts = api_attempts() + 1
+        try:
+            resp = naver_http.get(NAVER_SHOP_API, headers=headers, params=params, timeout=policy["timeout"])
+            status = resp.status_code
+            if status == 200:
+                data = resp.json()
+                api_keys.record(client_id)
+                brk.success()
+                return data
+            kind, msg = _classify(resp)
+            retry_after = _retry_after(resp)
+            code = _error_code(resp)
+            api_keys.record(client_id, kind, code)
+            if kind in ("rate_limit", "auth"):
+                alt = api_keys.route(client_id, client_secret)
+                if alt[0] != client_id:
+                    logger.warning(f"API {kind} ({msg}{' ' + code if code else ''}) — 다른 키로 재시도 | q={query}")
+                    client_id, client_secret = alt
+                    continue
+        except requests.Timeout as e:
+            kind, msg = "timeout", str(e)[:120]
+        except requests.RequestException as e:
+            kind, msg = "network", str(e)[:120]
+        except ValueError as e:                 # 200 인데 JSON 이 깨진 응답
+            kind, msg = "server", f"응답 파싱 실패: {str(e)[:80]}"
+        attempt += 1
+
+        delay = _backoff(attempt - 1, retry_after)
+        budget = policy["budget"]
+        if (kind not in RETRYABLE or attempt > policy["retries"]
+                or (retry_after or 0) > policy["retry_after_max"]
+                or (budget and time.monotonic() - t0 + delay + policy["timeout"] > budget)):
+            logger.error(f"API 호출 실패 ({kind}, {attempt}회 시도, {purpose}): {msg} | q={query} start={start}")
+            API_FAILURES.inc(kind=kind)
+            if kind != "client":                # 잘못된 요청은 API 장애가 아님
+                brk.failure(kind)
+            raise SearchFailure(kind, msg, status, retry_after, attempt)
+        API_RETRIES.inc(kind=kind)
+        logger.warning(f"API {kind} ({msg}) — {delay:.1f}초 뒤 재시도 {attempt}/{policy['retries']} | q={query}")
+        time.sleep(delay)
 
 
 def clean_title(t: str) -> str:
@@ -194,6 +427,100 @@ def is_match(item: dict, product: dict) -> bool:
     return False
 
 
+# 검색 결과 item 1개의 압축 레코드 — 매칭 / 기록에 쓰는 필드만 담은 tuple (API 원문 값 그대로, 없거나 null 이면 None)
+# API 응답 item(dict 14개 키)에서 image / category / brand 등을 버려 들고 있는 페이지 메모리를 절반 정도로 줄임
+# (CPU 는 dict 경로와 같은 수준 — bench/bench_items.py). 페이지당 한 번 C 수준 itemgetter 로 뽑고
+# 형 변환(str / int / clean_title, None → "")은 색인과 발견된 item 에서만
+RECORD_FIELDS = ("productId", "link", "mallName", "title", "lprice", "productType")
+R_PID, R_LINK, R_MALL, R_TITLE, R_LPRICE, R_TYPE = range(len(RECORD_FIELDS))
+
+_record = itemgetter(*RECORD_FIELDS)
+_record_pid = itemgetter(R_PID)
+
+
+def _int(v) -> int:
+    try:
+        return int(v or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def decode_items(items: list) -> list[tuple]:
+    """API 응답 items(dict 목록) → 레코드 tuple 목록 (페이지당 1회, 두 경로 모두 값은 원문 그대로)"""
+    try:
+        return list(map(_record, items))
+    except KeyError:        # 필드가 빠진 item (녹화 fixture 등) → 느린 경로, 빠진 필드는 None
+        return [tuple(map(item.get, RECORD_FIELDS)) for item in items]
+
+
+_LINK_PID_RE = re.compile(r'/products/(\d+)')
+
+
+class MatchIndex:
+    """검색 결과 한 페이지(decode_items 레코드 목록)를 미리 색인해 여러 상품을 한 번에 매칭
+
+    같은 키워드 결과에 여러 PID 를 대조할 때 상품마다 items 전체를 is_match 로
+    다시 훑지 않도록 productId → 위치, 정규화된 mallName 을 한 번만 만든다.
+    find() 결과는 items 를 순서대로 is_match 한 것과 같다
+    (첫 번째로 어느 순위 조건이든 만족하는 item 위치).
+    product 에 link_product_id 가 있으면 link 의 /products/{id} 와 정확히 같은 item 도 매칭
+    (url_product_id 는 link 부분 문자열 매칭이라 짧은 PID 는 다른 상품에 잘못 걸릴 수 있음)
+    """
+    __slots__ = ("items", "_by_pid", "_by_link", "_malls")
+
+    def __init__(self, items: list[tuple]):
+        self.items = items
+        # 같은 productId 는 첫 위치 — 뒤에서부터 넣어 앞 위치가 남게 (C 수준 한 번에)
+        n = len(items)
+        pids = map(str.strip, map(str, map(_record_pid, reversed(items))))
+        self._by_pid = dict(zip(pids, range(n - 1, -1, -1)))
+        self._by_link = None  # link_product_id 가 필요할 때만 생성
+        self._malls = None    # mall_name fallback 이 필요할 때만 생성
+
+    def find(self, product: dict) -> int | None:
+        """product(is_match 와 같은 구조)가 처음 매칭되는 items 인덱스, 없으면 None"""
+        hits = []
+        catalog_id = str(product.get("catalog_id") or "").strip()
+        if catalog_id and catalog_id in self._by_pid:
+            hits.append(self._by_pid[catalog_id])
+
+        url_pid = str(product.get("url_product_id") or "").strip()
+        if url_pid:
+            # link 는 부분 문자열 매칭이라 색인 대신 순서대로 확인 (첫 위치만)
+            for i, item in enumerate(self.items):
+                if url_pid in (item[R_LINK] or ""):
+                    hits.append(i)
+                    break
+
+        product_id = str(product.get("product_id") or "").strip()
+        if product_id and product_id in self._by_pid:
+            hits.append(self._by_pid[product_id])
+
+        link_pid = str(product.get("link_product_id") or "").strip()
+        if link_pid:
+            if self._by_link is None:
+                self._by_link = {}
+                for i, item in enumerate(self.items):
+                    m = _LINK_PID_RE.search(item[R_LINK] or "")
+                    if m:
+                        self._by_link.setdefault(m.group(1), i)
+            if link_pid in self._by_link:
+                hits.append(self._by_link[link_pid])
+
+        t_norm = normalize_name((product.get("mall_name") or "").strip())
+        if t_norm:
+            if self._malls is None:
+                self._malls = [normalize_name(item[R_MALL]) for item in self.items]
+            limit = min(hits) if hits else len(self._malls)
+            for i in range(limit):
+                a_norm = self._malls[i]
+                if a_norm and (t_norm in a_norm or a_norm in t_norm):
+                    hits.append(i)
+                    break
+
+        return min(hits) if hits else None
+
+
 # ─────────────────────────────────────────
 # 순위 탐색 (단일 키워드 × 단일 상품)
 # ─────────────────────────────────────────
@@ -202,7 +529,8 @@ def find_rank(client_id: str, client_secret: str,
               max_pages: int = 10,
               catalog_id: str = None,
               url_product_id: str = None,
-              mall_name: str = None) -> dict:
+              mall_name: str = None,
+              start_page: int = 0) -> dict:
     """
     특정 키워드에서 특정 상품의 순위를 4중 매칭으로 탐색
 
@@ -211,6 +539,7 @@ def find_rank(client_id: str, client_secret: str,
         catalog_id: 가격비교 카탈로그 ID
         url_product_id: 스마트스토어 products/{숫자} → API link 필드 매칭용 ★
         mall_name: 스토어명 (4순위 fallback)
+        start_page: 탐색 시작 페이지 (0부터) — 직전 순위 페이지만 확인하는 probe 용
     """
     checked_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     product = {
@@ -222,36 +551,49 @@ def find_rank(client_id: str, client_secret: str,
 
     logger.info(f"  탐색: '{keyword}' | PID={product['product_id']} | CatalogID={product['catalog_id']} | UrlPID={product['url_product_id']} | Mall={product['mall_name']}")
 
-    for page in range(max_pages):
+    # api_calls = 실제로 보낸 요청 수 (성공 전 재시도 포함, 캐시 적중 페이지는 0)
+    calls0 = api_attempts()
+    for page in range(start_page, start_page + max_pages):
         start = page * 100 + 1
-        data = search_shopping(client_id, client_secret, keyword, start=start, display=100)
+        try:
+            data = search_shopping(client_id, client_secret, keyword, start=start, display=100,
+                                   raise_errors=True, purpose="background")
+        except SearchFailure as e:
+            # 앞 페이지에 없었다고 미발견은 아님 — 이 조합은 '확인 실패'로 기록
+            logger.warning(f"  ⚠️ 확인 실패: '{keyword}' | {start}위~ 페이지 ({e.kind})")
+            return failed_result(e.kind, checked_at, api_attempts() - calls0)
         if not data:
             break
 
-        items = data.get("items", [])
+        items = decode_items(data.get("items", []))
+        del data     # 원본 응답(dict)은 여기서 놓고 레코드만 유지
         if not items:
             break
 
-        for idx, item in enumerate(items):
-            if is_match(item, product):
-                rank = start + idx
-                p_type = item.get("productType", 0)
-                type_label = "가격비교" if p_type == 1 else "일반상품"
-                logger.info(f"  ✅ 발견! 순위={rank}위 | 타입={type_label}(productType={p_type}) | mallName={item.get('mallName','')} | apiId={item.get('productId','')}")
-                return {
-                    "rank": rank,
-                    "product_name": clean_title(item.get("title", "")),
-                    "mall_name": item.get("mallName", ""),
-                    "lprice": int(item.get("lprice", 0) or 0),
-                    "product_type": p_type,
-                    "matched_id": str(item.get("productId", "")),
-                    "checked_at": checked_at,
-                    "found": True,
-                }
+        idx = MatchIndex(items).find(product)
+        if idx is not None:
+            item = items[idx]
+            rank = start + idx
+            p_type = _int(item[R_TYPE])
+            type_label = "가격비교" if p_type == 1 else "일반상품"
+            logger.info(f"  ✅ 발견! 순위={rank}위 | 타입={type_label}(productType={p_type}) | mallName={item[R_MALL]} | apiId={item[R_PID]}")
+            return {
+                "rank": rank,
+                "product_name": clean_title(item[R_TITLE]),
+                "mall_name": item[R_MALL] or "",
+                "lprice": _int(item[R_LPRICE]),
+                "product_type": p_type,
+                "matched_id": str(item[R_PID] or "").strip(),
+                "checked_at": checked_at,
+                "found": True,
+                "status": "ok",
+                "error": None,
+                "api_calls": api_attempts() - calls0,
+            }
 
         time.sleep(0.12)
 
-    logger.info(f"  ❌ 미발견: '{keyword}' | {max_pages * 100}위 내 없음")
+    logger.info(f"  ❌ 미발견: '{keyword}' | {start_page * 100 + 1}~{(start_page + max_pages) * 100}위 내 없음")
     return {
         "rank": None,
         "product_name": "",
@@ -261,44 +603,112 @@ def find_rank(client_id: str, client_secret: str,
         "matched_id": None,
         "checked_at": checked_at,
         "found": False,
+        "status": "ok",
+        "error": None,
+        "api_calls": api_attempts() - calls0,
+    }
+
+
+def failed_result(kind: str, checked_at: str | None = None, api_calls: int = 0) -> dict:
+    """API 실패로 순위를 확인하지 못한 조합 (status="failed") — 미발견(rank=None, status="ok")과 구분"""
+    return {
+        "rank": None,
+        "product_name": "",
+        "mall_name": "",
+        "lprice": 0,
+        "product_type": None,
+        "matched_id": None,
+        "checked_at": checked_at or datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "found": False,
+        "status": "failed",
+        "error": kind,
+        "api_calls": api_calls,
     }
 
 
 # ─────────────────────────────────────────
 # 광고주 전체 추적
 # ─────────────────────────────────────────
+PROBE_TOL_ABS = 3      # probe 결과를 그대로 인정하는 순위 변동 폭 (절대)
+PROBE_TOL_REL = 0.1    # 〃 (직전 순위 대비 비율)
+
+
+def probe_accepts(hint: int, rank: int | None) -> bool:
+    """probe(직전 순위 페이지 1개) 결과를 전체 탐색 없이 인정할 수 있는지"""
+    return rank is not None and abs(rank - hint) <= max(PROBE_TOL_ABS, hint * PROBE_TOL_REL)
+
+
 def track_client(client_id_naver: str, client_secret: str,
                  client_db_id: int, products: list, keywords: list,
-                 max_pages: int = 10) -> list:
+                 max_pages: int = 10, progress=None, decide=None, keys=None) -> list:
     """
     광고주의 모든 (상품 × 키워드) 조합 순위 추적
 
     products: [{"product_id": "...", "catalog_id": "...", "mall_name": "...", "product_name": "..."}]
+    progress: 조합 1개가 끝날 때마다 progress(done, total, result) 호출 (진행률 표시용)
+    decide:   decide(product_id, keyword) -> (mode, rank_hint) — 조합별 확인 방식 (check_policy.py)
+              "full"  = 전체 max_pages 탐색 (decide 없을 때 기본)
+              "probe" = 직전 순위(rank_hint) 페이지 1개만 확인, 순위가 크게 바뀌었으면 전체 탐색으로 전환
+              "skip"  = 이번 회차는 확인하지 않음 (결과 목록에서 제외)
+    keys:     keys() -> (client_id, client_secret) — 조합마다 키를 새로 고름 (api_keys 풀, 없으면 고정 키)
+
+    API 차단기(breaker)가 열려 있으면 다음 조합 전에 풀릴 때까지 일시정지하고, 일시정지가 누적
+    SHOP_BREAKER_MAX_PAUSE_SEC 를 넘으면 남은 조합은 호출 없이 status="failed"(circuit_open)로 기록.
     """
     results = []
     total = len(products) * len(keywords)
     done = 0
+    paused = 0.0
 
     for product in products:
         for kw in keywords:
             done += 1
-            logger.info(f"[{done}/{total}] '{kw}' × {product.get('product_name', product['product_id'])}")
-            result = find_rank(
-                client_id_naver, client_secret,
+            mode, hint = decide(product["product_id"], kw) if decide else ("full", None)
+            if mode == "skip":
+                if progress:
+                    progress(done, total, {"skipped": True, "api_calls": 0})
+                continue
+            wait = breaker.remaining()
+            if wait and paused + wait <= SHOP_BREAKER_MAX_PAUSE_SEC:
+                logger.warning(f"⏸ 쇼핑 API 장애 — {wait:.0f}초 일시정지 후 재개 ({done}/{total})")
+                time.sleep(wait)
+                paused += wait
+            logger.info(f"[{done}/{total}] '{kw}' × {product.get('product_name', product['product_id'])}"
+                        + (f" (probe {hint}위)" if mode == "probe" else ""))
+            args = dict(
                 keyword=kw,
                 target_product_id=product["product_id"],
                 catalog_id=product.get("catalog_id"),
                 url_product_id=product.get("url_product_id"),
                 mall_name=product.get("mall_name", ""),
-                max_pages=max_pages,
             )
+            if keys:
+                client_id_naver, client_secret = keys()
+            result, scan = None, "full"
+            if not breaker.allow():
+                result = failed_result("circuit_open")
+            elif mode == "probe":
+                result = find_rank(client_id_naver, client_secret, max_pages=1,
+                                   start_page=(hint - 1) // 100, **args)
+                scan = "probe"
+                if result["status"] == "ok" and not probe_accepts(hint, result["rank"]):
+                    logger.info(f"  ↪ probe 결과 변동 ({hint}위 → {result['rank'] or '미발견'}) — 전체 탐색")
+                    probe_calls = result["api_calls"]
+                    result = find_rank(client_id_naver, client_secret, max_pages=max_pages, **args)
+                    result["api_calls"] += probe_calls
+                    scan = "full"
+            else:
+                result = find_rank(client_id_naver, client_secret, max_pages=max_pages, **args)
             result.update({
+                "scan": scan,
                 "client_id": client_db_id,
                 "product_id": product["product_id"],
                 "product_name": result["product_name"] or product.get("product_name", ""),
                 "keyword": kw,
             })
             results.append(result)
+            if progress:
+                progress(done, total, result)
             time.sleep(0.1)
 
     return results
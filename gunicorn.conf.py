@@ -0,0 +1,22 @@
+"""
+gunicorn 설정 — 현재 디렉터리의 gunicorn.conf.py 는 gunicorn 이 자동으로 읽는다 (Procfile)
+
+preload_app : 마스터가 app 을 한 번만 import + create_app() (DB 스키마 준비) 한 뒤 워커를 fork
+              → 워커 기동이 빠르고 import 된 모듈 메모리를 워커끼리 공유 (copy-on-write)
+post_worker_init : fork 이후 워커마다 스케줄러 / 리더 선출 / 워밍업 스레드 시작 (app.start_background)
+"""
+import os
+
+wsgi_app = "app:create_app()"
+preload_app = True
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 5000)}"
+workers = int(os.environ.get("WEB_CONCURRENCY", 2))
+worker_class = "gthread"
+threads = int(os.environ.get("GUNICORN_THREADS", 4))
+timeout = 120
+
+
+def post_worker_init(worker):
+    import app
+    app.start_background()
@@ -0,0 +1,222 @@
+"""
+백그라운드 작업(Job) 실행기 — 엑셀 생성 / 플레이스 순위 확인 등 무거운 자동화 작업
+
+요청 스레드에서 바로 처리하면 gunicorn 워커가 작업 시간 내내 묶이고
+큰 작업은 워커 타임아웃(120초)에 걸려 결과를 잃는다. 그래서:
+- POST 는 작업을 등록하고 job id 만 즉시 반환
+- 실제 처리는 요청 스레드와 분리된 제한된 스레드 풀(JOB_WORKERS)에서 실행
+- 상태/진행률/결과는 SQLite jobs 테이블에 기록 → 어느 워커 프로세스에서든 조회 가능
+- 결과 파일(artifact)은 JOBS_DIR/{job_id}/ 에 저장, JOB_TTL_H 후 삭제
+
+작업 함수 시그니처: fn(job: JobContext, **params) -> dict | None
+  - job.progress(done, total, message) 로 진행률 보고
+  - job.artifact_path(filename) 경로에 파일을 쓰면 다운로드 대상으로 등록
+  - 반환한 dict 는 JSON 으로 저장되어 상태 조회 시 result 로 전달
+"""
+import os
+import json
+import time
+import uuid
+import shutil
+import logging
+import threading
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+
+from db import get_conn, DB_PATH
+
+logger = logging.getLogger(__name__)
+
+JOB_WORKERS   = int(os.environ.get("JOB_WORKERS", 2))       # 프로세스당 동시 실행 작업 수
+JOB_QUEUE_MAX = int(os.environ.get("JOB_QUEUE_MAX", 20))    # 프로세스당 대기+실행 작업 상한
+JOB_TTL_H     = float(os.environ.get("JOB_TTL_H", 24))      # 작업 기록/결과 파일 보관 시간
+JOBS_DIR      = os.environ.get("JOBS_DIR", os.path.join(os.path.dirname(DB_PATH), "jobs"))
+
+_TS_FMT = "%Y-%m-%d %H:%M:%S"
+_PROGRESS_MIN_SEC = 0.5   # 진행률 DB 기록 최소 간격
+
+_executor = ThreadPoolExecutor(max_workers=JOB_WORKERS, thread_name_prefix="job")
+_active = 0               # 이 프로세스에서 대기/실행 중인 작업 수
+_active_lock = threading.Lock()
+
+
+class QueueFull(Exception):
+    """대기 작업이 JOB_QUEUE_MAX 를 넘어 새 작업을 받을 수 없음"""
+
+
+def _now():
+    return datetime.now().strftime(_TS_FMT)
+
+
+def job_dir(job_id: str) -> str:
+    return os.path.join(JOBS_DIR, job_id)
+
+
+class JobContext:
+    """작업 함수에 전달되는 핸들 — 진행률 보고 / 결과 파일 경로"""
+
+    def __init__(self, job_id: str):
+        self.id = job_id
+        self.artifact = None          # (path, filename)
+        self._last_progress = 0.0
+
+    def progress(self, done: int, total: int, message: str = "", force: bool = False):
+        now = time.monotonic()
+        if not force and now - self._last_progress < _PROGRESS_MIN_SEC and done < total:
+            return
+        self._last_progress = now
+        conn = get_conn()
+        conn.execute("UPDATE jobs SET done=?, total=?, message=? WHERE id=?",
+                     (done, total, message, self.id))
+        conn.commit()
+        conn.close()
+
+    def artifact_path(self, filename: str) -> str:
+        path = os.path.join(job_dir(self.id), "artifact" + os.path.splitext(filename)[1])
+        self.artifact = (path, filename)
+        return path
+
+
+def _run(job_id: str, fn, params: dict):
+    global _active
+    ctx = JobContext(job_id)
+    t0 = time.perf_counter()
+    try:
+        # 상태 기록 실패(database is locked 등)도 finally 에서 대기 슬롯을 돌려줘야 함
+        conn = get_conn()
+        conn.execute("UPDATE jobs SET status='running', started_at=? WHERE id=?", (_now(), job_id))
+        conn.commit()
+        conn.close()
+        result = fn(ctx, **params)
+        path, name = ctx.artifact or (None, None)
+        conn = get_conn()
+        conn.execute("""
+            UPDATE jobs SET status='done', finished_at=?, result=?, artifact_path=?, artifact_name=?,
+                            done=MAX(done, total)
+            WHERE id=?
+        """, (_now(), json.dumps(result, ensure_ascii=False) if result is not None else None,
+              path, name, job_id))
+        conn.commit()
+        conn.close()
+        logger.info(f"[Job] {job_id} 완료 ({time.perf_counter() - t0:.1f}s)")
+    except Exception as e:
+        logger.exception(f"[Job] {job_id} 실패: {e}")
+        conn = get_conn()
+        conn.execute("UPDATE jobs SET status='error', finished_at=?, error=? WHERE id=?",
+                     (_now(), str(e)[:300], job_id))
+        conn.commit()
+        conn.close()
+    finally:
+        with _active_lock:
+            _active -= 1
+
+
+def create(kind: str) -> str:
+    """작업 기록과 작업 디렉터리를 만들고 job id 반환 (입력 파일은 submit 전에 저장)
+
+    대기 작업이 가득 찼으면 QueueFull.
+    """
+    global _active
+    with _active_lock:
+        if _active >= JOB_QUEUE_MAX:
+            raise QueueFull(f"대기 중인 작업이 너무 많습니다 ({_active}/{JOB_QUEUE_MAX})")
+        _active += 1
+    purge_expired()
+    job_id = uuid.uuid4().hex
+    os.makedirs(job_dir(job_id), exist_ok=True)
+    conn = get_conn()
+    conn.execute("""
+        INSERT INTO jobs (id, kind, status, owner_pid, created_at, expires_at)
+        VALUES (?,?,?,?,?,?)
+    """, (job_id, kind, "queued", os.getpid(), _now(),
+          (datetime.now() + timedelta(hours=JOB_TTL_H)).strftime(_TS_FMT)))
+    conn.commit()
+    conn.close()
+    return job_id
+
+
+def submit(job_id: str, fn, **params) -> str:
+    """create() 로 만든 작업을 스레드 풀에 넣음"""
+    _executor.submit(_run, job_id, fn, params)
+    return job_id
+
+
+def discard(job_id: str):
+    """create() 후 submit 전에 실패한 작업 정리"""
+    global _active
+    with _active_lock:
+        _active -= 1
+    _delete(job_id)
+
+
+def pid_alive(pid) -> bool:
+    """해당 PID 프로세스가 (같은 호스트에서) 살아 있는지"""
+    if not pid:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def get(job_id: str) -> dict | None:
+    """작업 상태 dict (없거나 만료되면 None)
+
+    Returns: {id, kind, status(queued|running|done|error), done, total, message,
+              result, error, has_artifact, artifact_name, created_at, started_at, finished_at}
+    """
+    conn = get_conn()
+    row = conn.execute("SELECT * FROM jobs WHERE id=? AND expires_at > ?", (job_id, _now())).fetchone()
+    conn.close()
+    if not row:
+        return None
+    job = dict(row)
+    # 작업을 맡은 워커 프로세스가 재시작/종료되어 끝나지 못한 작업
+    if job["status"] in ("queued", "running") and not pid_alive(job["owner_pid"]):
+        job["status"], job["error"] = "error", "작업을 처리하던 서버 프로세스가 종료되었습니다."
+        conn = get_conn()
+        conn.execute("UPDATE jobs SET status='error', error=?, finished_at=? WHERE id=?",
+                     (job["error"], _now(), job_id))
+        conn.commit()
+        conn.close()
+    job["result"] = json.loads(job["result"]) if job["result"] else None
+    job["has_artifact"] = bool(job["artifact_path"]) and os.path.exists(job["artifact_path"])
+    job.pop("artifact_path")
+    job.pop("owner_pid")
+    return job
+
+
+def artifact(job_id: str):
+    """완료된 작업의 (파일 경로, 다운로드 파일명) / 없으면 (None, None)"""
+    conn = get_conn()
+    row = conn.execute("""
+        SELECT artifact_path, artifact_name FROM jobs
+        WHERE id=? AND status='done' AND expires_at > ?
+    """, (job_id, _now())).fetchone()
+    conn.close()
+    if not row or not row["artifact_path"] or not os.path.exists(row["artifact_path"]):
+        return None, None
+    return row["artifact_path"], row["artifact_name"]
+
+
+def _delete(job_id: str):
+    shutil.rmtree(job_dir(job_id), ignore_errors=True)
+    conn = get_conn()
+    conn.execute("DELETE FROM jobs WHERE id=?", (job_id,))
+    conn.commit()
+    conn.close()
+
+
+def purge_expired() -> int:
+    """만료된 작업 기록과 결과 파일 삭제 → 삭제 건수"""
+    conn = get_conn()
+    ids = [r["id"] for r in conn.execute("SELECT id FROM jobs WHERE expires_at <= ?", (_now(),)).fetchall()]
+    conn.close()
+    for job_id in ids:
+        _delete(job_id)
+    if ids:
+        logger.info(f"[Job] 만료 작업 {len(ids)}건 삭제")
+    return len(ids)
@@ -0,0 +1,123 @@
+"""
+스케줄러 리더 선출 — gunicorn 워커가 여러 개여도 APScheduler 는 한 프로세스에서만 동작
+
+각 워커는 import 시 BackgroundScheduler 를 paused 상태로 띄우고,
+SQLite scheduler_lease 행(임대)을 잡은 프로세스만 resume 한다.
+- 리더는 LEASE_RENEW_SEC 마다 만료 시각을 연장 (heartbeat)
+- 리더가 죽으면 LEASE_TTL_SEC 뒤 다른 워커가 임대를 넘겨받고 스케줄러를 resume
+- 임대를 잃은 프로세스는 즉시 pause
+
+리더 교체 순간 양쪽에서 같은 작업이 실행되는 것을 막기 위해
+작업 쪽에서 claim_slot(job_id, slot) 으로 "이 회차는 내가 실행" 을 한 번 더 확인한다.
+검증: python bench/check_scheduler_leader.py
+"""
+import os
+import time
+import uuid
+import socket
+import atexit
+import logging
+import threading
+
+from db import get_conn
+
+logger = logging.getLogger(__name__)
+
+LEASE_TTL_SEC   = float(os.environ.get("SCHEDULER_LEASE_TTL_SEC", 30))
+LEASE_RENEW_SEC = float(os.environ.get("SCHEDULER_LEASE_RENEW_SEC", 10))
+
+
+def try_acquire(name: str, owner: str, ttl: float = LEASE_TTL_SEC) -> bool:
+    """임대 획득/연장 — 비어 있거나 만료됐거나 이미 내 것이면 True"""
+    now = time.time()
+    conn = get_conn()
+    try:
+        conn.execute("""
+            INSERT INTO scheduler_lease (name, owner, expires_at, acquired_at) VALUES (?,?,?,?)
+            ON CONFLICT(name) DO UPDATE SET
+                owner       = excluded.owner,
+                expires_at  = excluded.expires_at,
+                acquired_at = CASE WHEN scheduler_lease.owner = excluded.owner
+                                   THEN scheduler_lease.acquired_at ELSE excluded.acquired_at END
+            WHERE scheduler_lease.owner = excluded.owner OR scheduler_lease.expires_at < ?
+        """, (name, owner, now + ttl, now, now))
+        conn.commit()
+        row = conn.execute("SELECT owner FROM scheduler_lease WHERE name=?", (name,)).fetchone()
+        return bool(row) and row["owner"] == owner
+    except Exception as e:
+        # DB 잠김 등 → 이번 회차는 획득 실패로 처리 (다음 heartbeat 에서 재시도)
+        logger.warning(f"[Leader] 임대 확인 실패: {e}")
+        return False
+    finally:
+        conn.close()
+
+
+def release(name: str, owner: str):
+    conn = get_conn()
+    conn.execute("DELETE FROM scheduler_lease WHERE name=? AND owner=?", (name, owner))
+    conn.commit()
+    conn.close()
+
+
+def current_owner(name: str) -> dict | None:
+    """현재 유효한 임대 {owner, expires_at, acquired_at} / 없으면 None"""
+    conn = get_conn()
+    row = conn.execute("SELECT * FROM scheduler_lease WHERE name=? AND expires_at >= ?",
+                       (name, time.time())).fetchone()
+    conn.close()
+    return dict(row) if row else None
+
+
+def claim_slot(job_id: str, slot: str) -> bool:
+    """job_id 의 slot(예: 날짜) 회차 실행권 — 여러 프로세스 중 처음 한 번만 True"""
+    conn = get_conn()
+    cur = conn.execute("INSERT OR IGNORE INTO scheduler_slots (job_id, slot, owner_pid, claimed_at) "
+                       "VALUES (?,?,?,datetime('now','localtime'))", (job_id, slot, os.getpid()))
+    conn.commit()
+    conn.close()
+    return cur.rowcount == 1
+
+
+class SchedulerLeader:
+    """paused 상태로 시작한 BackgroundScheduler 를 임대 보유 중에만 resume"""
+
+    def __init__(self, scheduler, name: str = "scheduler",
+                 ttl: float = LEASE_TTL_SEC, renew: float = LEASE_RENEW_SEC):
+        self.scheduler = scheduler
+        self.name = name
+        self.ttl = ttl
+        self.renew = renew
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.is_leader = False
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._tick()
+        self._thread = threading.Thread(target=self._loop, name="scheduler-leader", daemon=True)
+        self._thread.start()
+        atexit.register(self.stop)
+
+    def stop(self):
+        self._stop.set()
+        if self.is_leader:
+            self.is_leader = False
+            try:
+                self.scheduler.pause()
+                release(self.name, self.owner)
+            except Exception:
+                pass
+
+    def _loop(self):
+        while not self._stop.wait(self.renew):
+            self._tick()
+
+    def _tick(self):
+        leader = try_acquire(self.name, self.owner, self.ttl)
+        if leader and not self.is_leader:
+            self.scheduler.resume()
+            logger.info(f"[Leader] 스케줄러 리더 획득 — {self.owner}")
+        elif not leader and self.is_leader:
+            self.scheduler.pause()
+            logger.warning(f"[Leader] 스케줄러 리더 상실 — {self.owner}")
+        self.is_leader = leader
@@ -1,131 +1,233 @@
 """
-메인 실행 파일 - 네이버 쇼핑 순위 추적기
+헤드리스 순위 추적 CLI — 웹 서버 없이 cron / 워커 컨테이너에서 추적 실행
 =========================================
+Flask / APScheduler 를 import 하지 않고 tracking.py(engine + db)만 사용한다.
+웹과 같은 DB(DB_PATH)에 기록하므로 결과와 진행 상황이 대시보드에 그대로 보인다.
+API 키는 환경변수 NAVER_CLIENT_ID / NAVER_CLIENT_SECRET → 없으면 설정 화면에 저장한 값.
+
 사용법:
-  python main.py                  # 즉시 1회 추적 + HTML 리포트 생성
-  python main.py --schedule       # 자동 스케줄 모드 (config 설정 간격으로 반복)
-  python main.py --report-only    # 리포트만 재생성
-  python main.py --history [키워드] # 특정 키워드 히스토리 출력
+  python main.py                              # 전체 광고주 1회 추적 (표 출력)
+  python main.py -c 3 -c "광고주명" -w 4        # 광고주 선택 (ID 또는 이름) + 광고주 4곳 병렬
+  python main.py -k 무선이어폰 -k "블루투스 이어폰" # 키워드 선택
+  python main.py --format json -o out.json    # JSON / CSV 출력 (기본: 표)
+  python main.py --adaptive                   # check_policy 적용 (자동 추적과 같은 full / probe / skip)
+  python main.py --dry-run                    # rank_history 에 기록하지 않음
+  python main.py --schedule 6                 # 6시간마다 반복 (cron 대신 상주 실행)
+  python main.py --list                       # 광고주 / 상품 수 / 키워드 수
+  python main.py --history 무선이어폰 [--days 30]
+
+종료 코드: 0 정상 / 1 일부 광고주 오류 또는 확인 실패(API 오류) 조합 있음 / 2 실행 안 됨 (API 키 없음, 대상 없음, 다른 곳에서 추적 중)
 """
-
+import os
 import sys
+import csv
+import json
 import time
-import argparse
 import logging
+import argparse
 from datetime import datetime
 
-# ── 설정 불러오기 ──────────────────────────────────────
-try:
-    import config
-    CLIENT_ID     = config.NAVER_CLIENT_ID
-    CLIENT_SECRET = config.NAVER_CLIENT_SECRET
-    STORE_NAME    = config.MY_STORE_NAME
-    PRODUCT_IDS   = config.MY_PRODUCT_IDS
-    KEYWORDS      = config.KEYWORDS
-    MAX_PAGES     = config.MAX_PAGES
-    SORT          = config.SEARCH_SORT
-    DB_PATH       = config.DB_PATH
-    REPORT_PATH   = config.REPORT_PATH
-    SCHEDULE_H    = config.SCHEDULE_INTERVAL_HOURS
-except ImportError:
-    print("❌ config.py 파일을 찾을 수 없습니다. 같은 폴더에 config.py가 있는지 확인하세요.")
-    sys.exit(1)
-
-from tracker import NaverShoppingRankTracker
-from report import generate_html_report
-
-logger = logging.getLogger(__name__)
-
-
-def run_once():
-    """1회 순위 추적 실행"""
-    print(f"\n{'='*60}")
-    print(f"🛒 네이버 쇼핑 순위 트래커 실행")
-    print(f"   스토어명: {STORE_NAME or '(미설정)'}")
-    print(f"   상품 ID: {PRODUCT_IDS or '(미설정)'}")
-    print(f"   키워드 수: {len(KEYWORDS)}개")
-    print(f"   최대 탐색: {MAX_PAGES * 100}위")
-    print(f"{'='*60}\n")
-
-    # API 키 검증
-    if CLIENT_ID == "여기에_클라이언트_ID_입력":
-        print("⚠️  config.py에서 NAVER_CLIENT_ID와 NAVER_CLIENT_SECRET을 설정하세요!")
-        print("   네이버 개발자 센터: https://developers.naver.com")
-        print("\n[데모 모드] 설정 완료 후 재실행하세요.\n")
-        return False
-
-    if not STORE_NAME and not PRODUCT_IDS:
-        print("⚠️  config.py에서 MY_STORE_NAME 또는 MY_PRODUCT_IDS를 설정하세요!")
-        return False
-
-    tracker = NaverShoppingRankTracker(
-        client_id=CLIENT_ID,
-        client_secret=CLIENT_SECRET,
-        my_store_name=STORE_NAME,
-        my_product_ids=PRODUCT_IDS,
-        db_path=DB_PATH,
-    )
-
-    results = tracker.track_all(KEYWORDS, max_pages=MAX_PAGES, sort=SORT)
-    generate_html_report(DB_PATH, REPORT_PATH, KEYWORDS, days=14)
-
-    print(f"\n🔗 리포트 확인: {REPORT_PATH}")
-    return True
-
-
-def run_schedule():
-    """자동 스케줄 모드"""
-    print(f"\n⏰ 스케줄 모드 시작 - {SCHEDULE_H}시간마다 자동 추적")
-    print("   종료하려면 Ctrl+C 를 누르세요.\n")
-
+logger = logging.getLogger("main")
+
+OUTPUT_FIELDS = ("client", "keyword", "product_id", "product_name", "rank", "lprice",
+                 "mall_name", "scan", "status", "error", "checked_at")
+TRACK_WORKERS = int(os.environ.get("TRACK_WORKERS", 2))
+
+
+# ────────────────────────────────────────────
+# 대상 선택
+# ────────────────────────────────────────────
+def open_db():
+    """스키마 준비 후 연결 (init_db 안내 문구는 stderr 로 — stdout 은 결과 전용)"""
+    from contextlib import redirect_stdout
+    from db import init_db, get_conn
+
+    with redirect_stdout(sys.stderr):
+        init_db()
+    return get_conn()
+
+
+def resolve_clients(conn, selectors):
+    """--client 값(ID 또는 이름) → client id 목록 / 없는 값이 있으면 SystemExit"""
+    rows = conn.execute("SELECT id, name FROM clients").fetchall()
+    by_id = {str(r["id"]): r["id"] for r in rows}
+    by_name = {r["name"]: r["id"] for r in rows}
+    ids, missing = [], []
+    for sel in selectors:
+        cid = by_id.get(sel) or by_name.get(sel)
+        (ids.append(cid) if cid else missing.append(sel))
+    if missing:
+        sys.exit(f"❌ 광고주를 찾을 수 없습니다: {', '.join(missing)}")
+    return ids
+
+
+# ────────────────────────────────────────────
+# 출력
+# ────────────────────────────────────────────
+def _rank_label(r):
+    if r.get("status") == "failed":
+        return "확인실패"
+    return f"{r['rank']}위" if r["rank"] else "미발견"
+
+
+def _rows(results, names):
+    return [{**{k: r.get(k) for k in OUTPUT_FIELDS}, "client": names.get(r["client_id"], r["client_id"])}
+            for r in results]
+
+
+def write_output(rows, fmt, path):
+    f = open(path, "w", encoding="utf-8", newline="") if path else sys.stdout
+    try:
+        if fmt == "json":
+            json.dump(rows, f, ensure_ascii=False, indent=2)
+            f.write("\n")
+        elif fmt == "csv":
+            w = csv.DictWriter(f, fieldnames=OUTPUT_FIELDS)
+            w.writeheader()
+            w.writerows(rows)
+        else:
+            print(f"{'광고주':<14} {'키워드':<18} {'순위':>6}  {'상품명':<28} {'가격':>10}  탐색", file=f)
+            print("-" * 92, file=f)
+            for r in rows:
+                rank = _rank_label(r)
+                price = f"{r['lprice']:,}원" if r["lprice"] else "-"
+                print(f"{str(r['client'])[:13]:<14} {r['keyword'][:17]:<18} {rank:>6}  "
+                      f"{(r['product_name'] or '-')[:27]:<28} {price:>10}  {r['scan'] or ''}", file=f)
+    finally:
+        if path:
+            f.close()
+
+
+# ────────────────────────────────────────────
+# 명령
+# ────────────────────────────────────────────
+def run_once(args) -> int:
+    import tracking
+
+    conn = open_db()
+    client_ids = resolve_clients(conn, args.client) if args.client else None
+    names = {r["id"]: r["name"] for r in conn.execute("SELECT id, name FROM clients").fetchall()}
+    conn.close()
+
+    t0 = time.perf_counter()
+    out = tracking.run_all_tracking("cli", client_ids=client_ids, keywords=args.keyword or None,
+                                    workers=max(1, args.workers), adaptive=args.adaptive,
+                                    dry_run=args.dry_run)
+    if out is None:
+        logger.error("추적을 실행하지 않았습니다 (API 키 미설정 / 대상 광고주 없음 / 다른 곳에서 추적 중)")
+        return 2
+    if not out["results"] and not out["errors"]:
+        logger.warning("추적할 상품×키워드 조합이 없습니다.")
+
+    rows = _rows(out["results"], names)
+    rows.sort(key=lambda r: (str(r["client"]), r["keyword"], r["product_id"] or ""))
+    write_output(rows, args.format, args.output)
+    found = sum(1 for r in rows if r["rank"])
+    failed = sum(1 for r in rows if r["status"] == "failed")
+    logger.info(f"완료 — {len(rows)}개 조합 (순위 확인 {found}, 확인 실패 {failed}) | 오류 {len(out['errors'])}곳 "
+                f"| {time.perf_counter() - t0:.1f}s | run={out['run_id']}"
+                + (" | dry-run" if args.dry_run else ""))
+    return 1 if out["errors"] or failed or out["status"] != "done" else 0
+
+
+def run_schedule(args) -> int:
+    logger.info(f"⏰ 스케줄 모드 — {args.schedule}시간마다 추적 (Ctrl+C 로 종료)")
     while True:
-        run_once()
-        next_run = datetime.now().strftime('%Y-%m-%d %H:%M')
-        print(f"\n💤 {SCHEDULE_H}시간 후 다음 추적 예정... (시작: {next_run})")
-        time.sleep(SCHEDULE_H * 3600)
-
-
-def show_history(keyword: str):
-    """특정 키워드의 히스토리 출력"""
-    tracker = NaverShoppingRankTracker(
-        client_id=CLIENT_ID,
-        client_secret=CLIENT_SECRET,
-        my_store_name=STORE_NAME,
-        my_product_ids=PRODUCT_IDS,
-        db_path=DB_PATH,
-    )
-    rows = tracker.get_history(keyword, days=30)
+        run_once(args)
+        nxt = datetime.fromtimestamp(time.time() + args.schedule * 3600)
+        logger.info(f"💤 다음 추적 {nxt:%Y-%m-%d %H:%M}")
+        time.sleep(args.schedule * 3600)
+
+
+def list_clients(args) -> int:
+    conn = open_db()
+    rows = conn.execute("""
+        SELECT c.id, c.name, COALESCE(c.track_cadence, 'daily') AS cadence,
+               (SELECT COUNT(*) FROM products p WHERE p.client_id=c.id) AS products,
+               (SELECT COUNT(*) FROM keywords k WHERE k.client_id=c.id) AS keywords
+        FROM clients c ORDER BY c.id
+    """).fetchall()
+    conn.close()
+    data = [dict(r) for r in rows]
+    if args.format == "json":
+        json.dump(data, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+        return 0
+    print(f"{'ID':>4}  {'광고주':<20} {'상품':>5} {'키워드':>6}  주기")
+    for r in data:
+        print(f"{r['id']:>4}  {r['name'][:19]:<20} {r['products']:>5} {r['keywords']:>6}  {r['cadence']}")
+    return 0
+
+
+def show_history(args) -> int:
+    conn = open_db()
+    params = [args.history, f"-{args.days} days"]
+    sql = """
+        SELECT rh.checked_at, c.name AS client, rh.product_id, rh.product_name, rh.rank, rh.lprice, rh.scan,
+               rh.status, rh.error
+        FROM rank_history rh LEFT JOIN clients c ON c.id = rh.client_id
+        WHERE rh.keyword=? AND rh.checked_at >= datetime('now','localtime',?)
+    """
+    if args.client:
+        ids = resolve_clients(conn, args.client)
+        sql += f" AND rh.client_id IN ({','.join('?' * len(ids))})"
+        params += ids
+    rows = [dict(r) for r in conn.execute(sql + " ORDER BY rh.checked_at DESC, rh.id DESC", params).fetchall()]
+    conn.close()
     if not rows:
-        print(f"'{keyword}' 키워드의 히스토리가 없습니다.")
-        return
-
-    print(f"\n📅 '{keyword}' 순위 히스토리 (최근 30일)")
-    print("-" * 70)
-    print(f"{'날짜/시간':<20} {'순위':>6}  {'상품명':<25} {'가격':>10}")
-    print("-" * 70)
-    for row in rows:
-        rank_str = f"{row[1]}위" if row[1] else "미발견"
-        name = (row[2] or "-")[:24]
-        price = f"{row[4]:,}원" if row[4] else "-"
-        print(f"{row[0]:<20} {rank_str:>6}  {name:<25} {price:>10}")
+        print(f"'{args.history}' 키워드의 히스토리가 없습니다.")
+        return 0
+    if args.format == "json":
+        json.dump(rows, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+        return 0
+    if args.format == "csv":
+        w = csv.DictWriter(sys.stdout, fieldnames=list(rows[0]))
+        w.writeheader()
+        w.writerows(rows)
+        return 0
+    print(f"\n📅 '{args.history}' 순위 히스토리 (최근 {args.days}일)")
+    print("-" * 78)
+    print(f"{'날짜/시간':<20} {'광고주':<12} {'순위':>6}  {'상품명':<25} {'가격':>10}")
+    print("-" * 78)
+    for r in rows:
+        rank = _rank_label(r)
+        price = f"{r['lprice']:,}원" if r["lprice"] else "-"
+        print(f"{r['checked_at']:<20} {str(r['client'] or '-')[:11]:<12} {rank:>6}  "
+              f"{(r['product_name'] or '-')[:24]:<25} {price:>10}")
+    return 0
 
 
 def main():
-    parser = argparse.ArgumentParser(description="네이버 쇼핑 순위 트래커")
-    parser.add_argument("--schedule", action="store_true", help="자동 스케줄 모드")
-    parser.add_argument("--report-only", action="store_true", help="리포트만 재생성")
-    parser.add_argument("--history", type=str, metavar="키워드", help="히스토리 조회")
+    parser = argparse.ArgumentParser(description="네이버 쇼핑 순위 트래커 (헤드리스 CLI)")
+    parser.add_argument("-c", "--client", action="append", metavar="ID|이름", help="추적할 광고주 (여러 번 지정 가능)")
+    parser.add_argument("-k", "--keyword", action="append", metavar="키워드", help="추적할 키워드 (여러 번 지정 가능)")
+    parser.add_argument("-w", "--workers", type=int, default=TRACK_WORKERS, help="광고주 병렬 수 (기본 %(default)s)")
+    parser.add_argument("--adaptive", action="store_true", help="조합별 full / probe / skip 정책 적용")
+    parser.add_argument("--dry-run", action="store_true", help="결과를 DB 에 기록하지 않음")
+    parser.add_argument("-f", "--format", choices=("table", "json", "csv"), default="table")
+    parser.add_argument("-o", "--output", metavar="파일", help="결과 저장 경로 (기본: 표준 출력)")
+    parser.add_argument("--schedule", type=float, metavar="시간", help="N시간마다 반복 실행")
+    parser.add_argument("--list", action="store_true", help="광고주 목록")
+    parser.add_argument("--history", metavar="키워드", help="키워드 순위 히스토리 조회")
+    parser.add_argument("--days", type=int, default=30, help="--history 조회 기간 (일)")
+    parser.add_argument("-q", "--quiet", action="store_true", help="진행 로그 숨김 (경고/오류만)")
     args = parser.parse_args()
 
+    # 진행 로그는 stderr — stdout 은 결과(JSON/CSV) 전용
+    logging.basicConfig(level=logging.WARNING if args.quiet else logging.INFO, stream=sys.stderr,
+                        format="%(asctime)s [%(levelname)s] %(message)s")
+
+    if args.list:
+        sys.exit(list_clients(args))
     if args.history:
-        show_history(args.history)
-    elif args.report_only:
-        generate_html_report(DB_PATH, REPORT_PATH, KEYWORDS, days=14)
-        print(f"✅ 리포트 재생성 완료: {REPORT_PATH}")
-    elif args.schedule:
-        run_schedule()
-    else:
-        run_once()
+        sys.exit(show_history(args))
+    if args.schedule:
+        try:
+            run_schedule(args)
+        except KeyboardInterrupt:
+            sys.exit(0)
+    sys.exit(run_once(args))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,120 @@
+"""
+플레이스/스토어 메타데이터 영구 캐시 (SQLite)
+- place_cache      : 플레이스 업체명 / 주변 명소 목록
+- store_name_cache : 스마트스토어 slug+pid → 업체명(mallName)
+
+업체명·주변 명소처럼 거의 바뀌지 않는 값을 매 요청마다 다시 스크래핑하지 않도록
+DB에 저장해 두고 TTL 안에서는 네이버를 호출하지 않는다.
+- 성공 결과: 긴 TTL
+- 실패 결과(negative): 짧은 TTL → 일시 장애가 오래 고착되지 않게
+- 라우트에서 ?refresh=1 이면 캐시를 건너뛰고 재조회 후 덮어씀
+"""
+import os
+import json
+from datetime import datetime, timedelta
+
+from db import get_conn
+
+# ── TTL (환경변수로 조정 가능, 단위: 시간) ──
+PLACE_NAME_TTL_H  = float(os.environ.get("PLACE_NAME_TTL_H", 24 * 30))   # 업체명 30일
+PLACE_SPOTS_TTL_H = float(os.environ.get("PLACE_SPOTS_TTL_H", 24 * 3))   # 명소 목록 3일
+PLACE_NEG_TTL_H   = float(os.environ.get("PLACE_NEG_TTL_H", 0.5))        # 실패 결과 30분
+
+_PLACE_TTL = {"name": PLACE_NAME_TTL_H, "spots": PLACE_SPOTS_TTL_H}
+
+_TS_FMT = "%Y-%m-%d %H:%M:%S"
+
+
+def _now():
+    return datetime.now()
+
+
+def _expiry(hours: float) -> str:
+    return (_now() + timedelta(hours=hours)).strftime(_TS_FMT)
+
+
+# ─────────────────────────────────────────
+# 플레이스 (place_id, category, kind) → 업체명 / 명소 목록
+# ─────────────────────────────────────────
+def get_place(place_id: str, category: str, kind: str) -> dict | None:
+    """유효한(만료 전) 캐시 항목 반환, 없으면 None
+
+    Returns: {"ok": bool, "value": str|list|None, "method": str, "fetched_at": str}
+    """
+    conn = get_conn()
+    row = conn.execute("""
+        SELECT ok, payload, method, fetched_at FROM place_cache
+        WHERE place_id=? AND category=? AND kind=? AND expires_at > ?
+    """, (place_id, category, kind, _now().strftime(_TS_FMT))).fetchone()
+    conn.close()
+    if not row:
+        return None
+    return {
+        "ok": bool(row["ok"]),
+        "value": json.loads(row["payload"]) if row["payload"] else None,
+        "method": row["method"] or "",
+        "fetched_at": row["fetched_at"],
+    }
+
+
+def put_place(place_id: str, category: str, kind: str, value, method: str | None) -> dict:
+    """조회 결과 저장 (value 가 비어 있으면 negative 로 짧은 TTL) → 저장된 항목 반환"""
+    ok = bool(value)
+    fetched_at = _now().strftime(_TS_FMT)
+    expires_at = _expiry(_PLACE_TTL[kind] if ok else PLACE_NEG_TTL_H)
+    payload = json.dumps(value, ensure_ascii=False) if ok else None
+    conn = get_conn()
+    conn.execute("""
+        INSERT OR REPLACE INTO place_cache
+        (place_id, category, kind, ok, payload, method, fetched_at, expires_at)
+        VALUES (?,?,?,?,?,?,?,?)
+    """, (place_id, category, kind, int(ok), payload, method or "", fetched_at, expires_at))
+    conn.commit()
+    conn.close()
+    return {"ok": ok, "value": value if ok else None, "method": method or "", "fetched_at": fetched_at}
+
+
+# ─────────────────────────────────────────
+# 스마트스토어 (slug, pid) → 업체명(mallName)
+# ─────────────────────────────────────────
+STORE_NAME_TTL_H = float(os.environ.get("STORE_NAME_TTL_H", 24 * 30))   # 업체명 30일
+STORE_NEG_TTL_H  = float(os.environ.get("STORE_NEG_TTL_H", 12))         # 원부상품/slug 폴백 12시간
+
+
+def get_store(slug: str, pid: str, keyword: str = "", include_expired: bool = False) -> dict | None:
+    """캐시된 업체명 조회 결과
+
+    Returns: {"ok": bool, "result": /api/fetch-store-name 응답 dict, "fetched_at": str}
+    negative 항목은 그때 시도한 검색어와 다른 keyword 로 물으면 None
+    (검색어 없이 / 다른 검색어로 실패한 결과 때문에 keyword+PID 조회를 건너뛰지 않도록)
+    include_expired=True 면 만료된 항목도 반환 (재검증 실패 시 기존 값 유지용)
+    """
+    conn = get_conn()
+    row = conn.execute("""
+        SELECT ok, name, source, is_origin, keyword, fetched_at, expires_at FROM store_name_cache
+        WHERE slug=? AND pid=?
+    """, (slug, pid or "")).fetchone()
+    conn.close()
+    if not row or (not include_expired and row["expires_at"] <= _now().strftime(_TS_FMT)):
+        return None
+    if not row["ok"] and keyword and keyword != (row["keyword"] or ""):
+        return None
+    result = {"ok": bool(row["ok"]), "name": row["name"] or "", "slug": slug, "source": row["source"]}
+    if row["is_origin"]:
+        result["is_origin"] = True
+    return {"ok": bool(row["ok"]), "result": result, "fetched_at": row["fetched_at"]}
+
+
+def put_store(slug: str, pid: str, result: dict, keyword: str = "") -> None:
+    """업체명 조회 결과 저장 (ok=False 인 폴백 결과는 짧은 TTL + 시도한 검색어 기록)"""
+    ok = bool(result.get("ok"))
+    conn = get_conn()
+    conn.execute("""
+        INSERT OR REPLACE INTO store_name_cache
+        (slug, pid, ok, name, source, is_origin, keyword, fetched_at, expires_at)
+        VALUES (?,?,?,?,?,?,?,?,?)
+    """, (slug, pid or "", int(ok), result.get("name", ""), result.get("source", ""),
+          int(bool(result.get("is_origin"))), "" if ok else (keyword or ""), _now().strftime(_TS_FMT),
+          _expiry(STORE_NAME_TTL_H if ok else STORE_NEG_TTL_H)))
+    conn.commit()
+    conn.close()
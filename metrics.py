@@ -0,0 +1,280 @@
+"""
+Prometheus 텍스트 형식 지표 (/metrics) — 외부 호출 / 순위 추적 / Flask 라우트 / SQLite
+
+gunicorn 워커가 여러 개라 프로세스 메모리의 카운터만으로는 /metrics 를 받은 워커 몫만 보인다.
+그래서 각 프로세스가 자기 지표를 METRICS_DIR/{pid}.json 에 주기적으로(METRICS_FLUSH_SEC) 기록하고,
+/metrics 는 모든 파일을 합산해서 내보낸다 (prometheus_client 의 multiprocess 모드와 같은 방식).
+- counter / histogram : 모든 프로세스 합. 종료된 워커 파일은 _dead.json 에 누적 → 재시작해도 감소하지 않음
+- gauge               : 살아 있는 프로세스 값만 (같은 라벨이면 마지막 기록 우선)
+
+사용:
+  REQS = metrics.counter("x_total", "설명")          → REQS.inc(host="...")
+  LAT  = metrics.histogram("x_seconds", "설명")      → LAT.observe(0.12, host="...") / with LAT.time(host=...):
+  LAST = metrics.gauge("x", "설명")                  → LAST.set(3.2, client="...")
+"""
+import os
+import json
+import time
+import atexit
+import fcntl
+import threading
+from contextlib import contextmanager
+
+METRICS_FLUSH_SEC = float(os.environ.get("METRICS_FLUSH_SEC", 5))
+
+# 외부 HTTP / Flask 라우트 (초)
+HTTP_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+# SQLite 쿼리 / 커밋 (초)
+DB_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1, 5)
+# 광고주 1곳 추적 (초)
+TRACK_BUCKETS = (5, 15, 30, 60, 120, 300, 600, 1200, 1800, 3600)
+
+_defs = {}          # name → (type, help, buckets)
+_values = {}        # (name, labels_json) → float | [bucket counts..., sum, count]
+_lock = threading.Lock()
+_flusher = None
+_deferred = False   # True 면 flush 스레드를 만들지 않음 (gunicorn --preload 마스터, fork 전)
+
+
+def _metrics_dir() -> str:
+    from db import DB_PATH   # db 가 이 모듈을 import 하므로 지연 import
+    return os.environ.get("METRICS_DIR", os.path.join(os.path.dirname(DB_PATH), "metrics"))
+
+
+def _key(labels: dict) -> str:
+    return json.dumps(labels, sort_keys=True, ensure_ascii=False)
+
+
+def defer_threads(on: bool = True):
+    """fork 전 프로세스에서 flush 스레드 생성을 미룸 — 값은 계속 쌓이고 종료 시 atexit 으로 기록"""
+    global _deferred
+    _deferred = on
+    if not on and _values:
+        _ensure_flusher()
+
+
+def _ensure_flusher():
+    global _flusher
+    if _deferred:
+        return
+    if _flusher is None or not _flusher.is_alive():
+        _flusher = threading.Thread(target=_flush_loop, name="metrics-flush", daemon=True)
+        _flusher.start()
+
+
+def _flush_loop():
+    while True:
+        time.sleep(METRICS_FLUSH_SEC)
+        try:
+            flush()
+        except Exception:
+            pass
+
+
+class _Metric:
+    def __init__(self, name, help_text, kind, buckets=None):
+        self.name = name
+        _defs[name] = (kind, help_text, tuple(buckets) if buckets else None)
+
+
+class Counter(_Metric):
+    def inc(self, amount: float = 1, **labels):
+        k = (self.name, _key(labels))
+        with _lock:
+            _values[k] = _values.get(k, 0) + amount
+        _ensure_flusher()
+
+
+class Gauge(_Metric):
+    def set(self, value: float, **labels):
+        with _lock:
+            _values[(self.name, _key(labels))] = value
+        _ensure_flusher()
+
+
+class Histogram(_Metric):
+    def observe(self, value: float, **labels):
+        buckets = _defs[self.name][2]
+        k = (self.name, _key(labels))
+        with _lock:
+            v = _values.get(k)
+            if v is None:
+                v = _values[k] = [0] * (len(buckets) + 2)
+            for i, b in enumerate(buckets):
+                if value <= b:
+                    v[i] += 1
+            v[-2] += value
+            v[-1] += 1
+        _ensure_flusher()
+
+    @contextmanager
+    def time(self, **labels):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - t0, **labels)
+
+
+def counter(name: str, help_text: str) -> Counter:
+    return Counter(name, help_text, "counter")
+
+
+def gauge(name: str, help_text: str) -> Gauge:
+    return Gauge(name, help_text, "gauge")
+
+
+def histogram(name: str, help_text: str, buckets=HTTP_BUCKETS) -> Histogram:
+    return Histogram(name, help_text, "histogram", buckets)
+
+
+# ────────────────────────────────────────────
+# 프로세스별 파일 기록 / 합산
+# ────────────────────────────────────────────
+def _snapshot() -> dict:
+    with _lock:
+        out = {}
+        for (name, labels), v in _values.items():
+            out.setdefault(name, {})[labels] = list(v) if isinstance(v, list) else v
+        return out
+
+
+def flush():
+    """이 프로세스 지표를 METRICS_DIR/{pid}.json 에 기록 (원자적 교체)"""
+    d = _metrics_dir()
+    os.makedirs(d, exist_ok=True)
+    path = os.path.join(d, f"{os.getpid()}.json")
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"pid": os.getpid(), "metrics": _snapshot()}, f, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+def _merge(into: dict, src: dict, gauges: bool):
+    for name, series in src.items():
+        kind = _defs.get(name, ("counter",))[0]
+        if kind == "gauge" and not gauges:
+            continue
+        dst = into.setdefault(name, {})
+        for labels, v in series.items():
+            if kind == "gauge":
+                dst[labels] = v
+            elif isinstance(v, list):
+                cur = dst.get(labels)
+                dst[labels] = v[:] if cur is None or len(cur) != len(v) else [a + b for a, b in zip(cur, v)]
+            else:
+                dst[labels] = dst.get(labels, 0) + v
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def collect() -> dict:
+    """모든 워커 파일 합산 → {name: {labels_json: value}}  (종료된 워커 파일은 _dead.json 으로 병합)"""
+    flush()
+    d = _metrics_dir()
+    dead_path = os.path.join(d, "_dead.json")
+    with open(os.path.join(d, ".lock"), "w") as lockf:
+        fcntl.flock(lockf, fcntl.LOCK_EX)
+        dead = {}
+        if os.path.exists(dead_path):
+            with open(dead_path, encoding="utf-8") as f:
+                dead = json.load(f)
+        live, merged_dead = {}, False
+        for fn in os.listdir(d):
+            if not fn.endswith(".json") or fn.startswith("_"):
+                continue
+            path = os.path.join(d, fn)
+            try:
+                with open(path, encoding="utf-8") as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                continue
+            if _pid_alive(data["pid"]):
+                _merge(live, data["metrics"], gauges=True)
+            else:
+                _merge(dead, data["metrics"], gauges=False)
+                os.remove(path)
+                merged_dead = True
+        if merged_dead:
+            with open(f"{dead_path}.tmp", "w", encoding="utf-8") as f:
+                json.dump(dead, f, ensure_ascii=False)
+            os.replace(f"{dead_path}.tmp", dead_path)
+    _merge(live, dead, gauges=False)
+    return live
+
+
+def _fmt_labels(labels: dict, extra: tuple = ()) -> str:
+    items = list(labels.items()) + list(extra)
+    if not items:
+        return ""
+    esc = lambda v: str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return "{" + ",".join(f'{k}="{esc(v)}"' for k, v in items) + "}"
+
+
+def _fmt_num(v) -> str:
+    return repr(float(v)) if isinstance(v, float) else str(v)
+
+
+def render() -> str:
+    """Prometheus text exposition format 0.0.4"""
+    data = collect()
+    lines = []
+    for name in sorted(_defs):
+        kind, help_text, buckets = _defs[name]
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for labels_json, v in sorted(data.get(name, {}).items()):
+            labels = json.loads(labels_json)
+            if kind == "histogram":
+                for b, c in zip(buckets, v):
+                    lines.append(f"{name}_bucket{_fmt_labels(labels, (('le', _fmt_num(float(b))),))} {c}")
+                lines.append(f"{name}_bucket{_fmt_labels(labels, (('le', '+Inf'),))} {v[-1]}")
+                lines.append(f"{name}_sum{_fmt_labels(labels)} {_fmt_num(v[-2])}")
+                lines.append(f"{name}_count{_fmt_labels(labels)} {v[-1]}")
+            else:
+                lines.append(f"{name}{_fmt_labels(labels)} {_fmt_num(v)}")
+    return "\n".join(lines) + "\n"
+
+
+def _reset_after_fork():
+    """fork 된 자식은 부모 값을 이어받지 않음 (부모 몫이 워커 수만큼 중복 합산되지 않도록)"""
+    global _lock, _flusher, _deferred
+    _values.clear()
+    _lock = threading.Lock()
+    _flusher = None
+    _deferred = False
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+atexit.register(lambda: _values and flush())
+
+
+# ════════════════════════════════════════════
+# 공용 지표 정의
+# ════════════════════════════════════════════
+OUTBOUND_SECONDS = histogram("naver_http_request_duration_seconds",
+                             "네이버 외부 호출 소요 시간 (host, endpoint)")
+OUTBOUND_TOTAL = counter("naver_http_requests_total",
+                         "네이버 외부 호출 수 (host, endpoint, status = HTTP 코드 또는 예외 이름)")
+
+ROUTE_SECONDS = histogram("flask_request_duration_seconds",
+                          "Flask 라우트 처리 시간 (응답 반환까지, 스트리밍 본문 제외)")
+
+DB_QUERY_SECONDS = histogram("sqlite_query_duration_seconds",
+                             "SQLite execute/executemany 소요 시간 (op = SQL 첫 단어)", DB_BUCKETS)
+DB_COMMIT_SECONDS = histogram("sqlite_commit_duration_seconds", "SQLite commit 소요 시간", DB_BUCKETS)
+
+TRACK_CLIENT_SECONDS = histogram("tracking_client_duration_seconds",
+                                 "광고주 1곳 순위 추적 소요 시간", TRACK_BUCKETS)
+TRACK_COMBOS = counter("tracking_combos_total", "추적한 조합(상품×키워드) 수 (skip 포함)")
+TRACK_API_CALLS = counter("tracking_api_calls_total", "순위 추적 중 쇼핑 API 호출 수")
+TRACK_COMBOS_PER_SEC = gauge("tracking_combos_per_second", "광고주별 마지막 추적의 초당 조합 처리 수")
+TRACK_RUNS = counter("tracking_runs_total", "순위 추적 실행 수 (source, status)")
@@ -0,0 +1,89 @@
+"""
+네이버 외부 호출 공통 헬퍼 — 호스트별 동시 요청 수 제한
+
+요청 핸들러 안에서 키워드 단위로 병렬 처리할 때, 같은 호스트(m.map, m.search,
+openapi 등)로 한꺼번에 요청이 몰려 차단/429 가 나지 않도록 호스트마다
+세마포어로 동시 요청 수를 묶는다. 인터페이스는 requests.get/post 와 동일.
+호출마다 host / endpoint 별 소요 시간과 상태 코드를 metrics 에 기록한다 (/metrics, 요청 프로파일 http 항목).
+"""
+import time
+import threading
+from urllib.parse import urlsplit
+
+import requests
+
+import metrics
+import profiling
+
+# 호스트별 동시 요청 상한 (프로세스 단위)
+HOST_CONCURRENCY = {
+    "openapi.naver.com":         4,
+    "m.map.naver.com":           3,
+    "m.search.naver.com":        3,
+    "m.place.naver.com":         3,
+    "pcmap.place.naver.com":     3,
+    "pcmap-api.place.naver.com": 2,
+    "smartstore.naver.com":      3,
+}
+DEFAULT_CONCURRENCY = 3
+
+_host_sems = {}
+_host_lock = threading.Lock()
+
+
+def _host_slot(host: str) -> threading.BoundedSemaphore:
+    sem = _host_sems.get(host)
+    if sem is None:
+        with _host_lock:
+            sem = _host_sems.get(host)
+            if sem is None:
+                sem = threading.BoundedSemaphore(HOST_CONCURRENCY.get(host, DEFAULT_CONCURRENCY))
+                _host_sems[host] = sem
+    return sem
+
+
+def endpoint_name(host: str, path: str) -> str:
+    """지표 라벨용 endpoint 이름 — ID 가 들어간 경로를 묶어 라벨 수가 늘지 않도록"""
+    if host == "openapi.naver.com" or path.startswith("/v1/search/"):
+        return path.rsplit("/", 1)[-1].split(".")[0] or "openapi"     # shop / local (가짜 API 포함)
+    if host == "pcmap-api.place.naver.com":
+        return "graphql" if path.startswith("/graphql") else "api"
+    if host == "m.map.naver.com":
+        return "search" if "search" in path else "map"
+    if host in ("m.place.naver.com", "pcmap.place.naver.com"):
+        parts = [p for p in path.split("/") if p and not p.isdigit()]
+        return "/".join(parts[1:2]) or "home"                          # around / home ...
+    if host.endswith("smartstore.naver.com"):
+        return "products" if "/products/" in path else "store"
+    return "search" if host == "m.search.naver.com" else "other"
+
+
+def request(method: str, url: str, **kwargs) -> requests.Response:
+    """requests.request 와 동일, 단 호스트별 동시 요청 수 제한 적용"""
+    parts = urlsplit(url)
+    host = parts.hostname or ""
+    endpoint = endpoint_name(host, parts.path)
+    with _host_slot(host):
+        t0 = time.perf_counter()
+        status = "error"
+        try:
+            resp = requests.request(method, url, **kwargs)
+            status = str(resp.status_code)
+            return resp
+        except Exception as e:
+            status = type(e).__name__
+            raise
+        finally:
+            dt = time.perf_counter() - t0
+            metrics.OUTBOUND_SECONDS.observe(dt, host=host, endpoint=endpoint)
+            profiling.add("http", dt)
+            metrics.OUTBOUND_TOTAL.inc(host=host, endpoint=endpoint, status=status)
+
+
+def get(url: str, **kwargs) -> requests.Response:
+    kwargs.setdefault("allow_redirects", True)
+    return request("GET", url, **kwargs)
+
+
+def post(url: str, **kwargs) -> requests.Response:
+    return request("POST", url, **kwargs)
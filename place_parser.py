@@ -0,0 +1,200 @@
+"""
+네이버 플레이스 페이지 경량 파서
+
+[1] 순위 확인용 — /api/check-place-rank 에서 쓰는 m.map / m.search HTML 에서
+"순서가 유지된 place ID 목록"과 "플레이스 구좌 존재 여부"만 DOM 생성 없이 뽑는다.
+(기존: BeautifulSoup html.parser 로 전체 DOM 생성 + 정규식 2회씩 전체 텍스트 스캔)
+성능 비교/정확성 검증: python bench/bench_place_parser.py
+
+ID 순서 규칙은 기존 추출 로직과 동일하게 유지:
+  - m.map   : /place/{id} URL 패턴 우선 → "id": 숫자 JSON 패턴 중 새 ID 추가
+  - m.search: place.naver.com/{cat}/{id} 패턴 우선 → 그 외 naver.com/{x}/{id} 패턴 추가
+
+[2] 명소 추출용 — /api/fetch-place-spots
+around 페이지 Apollo State 에서 ROOT_QUERY trips 항목과 참조 엔트리만 디코딩하고,
+명소 카테고리 판별은 화이트리스트+키워드를 하나로 컴파일한 정규식 + 메모이즈로 처리.
+(python bench/bench_place_spots.py)
+"""
+import re
+import json
+from functools import lru_cache
+
+import profiling
+
+# m.map: 리터럴 접두어가 있는 패턴 2개를 각각 스캔
+# (대안 패턴 하나로 합치면 접두어 최적화가 꺼져 fixture 기준 약 4배 느려짐)
+_MMAP_URL_RE = re.compile(r'/place/(\d{8,12})')
+_MMAP_JSON_RE = re.compile(r'"id"\s*:\s*(\d{8,12})')
+
+# m.search: naver.com/{x}/{id} 하나로 스캔 후 앞이 "place." 인지로 우선순위 구분
+_MSEARCH_ID_RE = re.compile(r'naver\.com/[^/?#]+/(\d{8,12})')
+_PLACE_PREFIX = "place."
+
+# place_section 토큰이 div 의 class 속성 안에 있는지 확인 (태그 시작 '<' ~ 토큰 위치)
+_SECTION_TOKEN = "place_section"
+_DIV_CLASS_RE = re.compile(r'<div\b[^>]*\bclass\s*=\s*["\']?[^"\'>]*$', re.IGNORECASE)
+_TOKEN_BEFORE = " \t\r\n\"'="
+_TOKEN_AFTER = " \t\r\n\"'>/"
+
+
+@profiling.timed("parse")
+def parse_mmap(text: str) -> list:
+    """m.map.naver.com/search2 응답 → 순서 유지된 place ID 목록"""
+    url_ids = dict.fromkeys(_MMAP_URL_RE.findall(text))
+    return list(url_ids) + [i for i in dict.fromkeys(_MMAP_JSON_RE.findall(text)) if i not in url_ids]
+
+
+def has_place_section(text: str) -> bool:
+    """<div class="... place_section ..."> 존재 여부 (DOM 생성 없이 토큰 위치만 검사)"""
+    n = len(text)
+    pos = text.find(_SECTION_TOKEN)
+    while pos != -1:
+        end = pos + len(_SECTION_TOKEN)
+        if (pos > 0 and text[pos - 1] in _TOKEN_BEFORE) and (end >= n or text[end] in _TOKEN_AFTER):
+            lt = text.rfind("<", 0, pos)
+            if lt > text.rfind(">", 0, pos) and _DIV_CLASS_RE.match(text, lt, pos):
+                return True
+        pos = text.find(_SECTION_TOKEN, end)
+    return False
+
+
+@profiling.timed("parse")
+def parse_msearch(text: str):
+    """m.search.naver.com 응답 → (순서 유지된 place ID 목록, 플레이스 구좌 여부)"""
+    place_ids, other_ids = {}, {}
+    for m in _MSEARCH_ID_RE.finditer(text):
+        s = m.start() - len(_PLACE_PREFIX)
+        if s >= 0 and text.startswith(_PLACE_PREFIX, s):
+            place_ids[m.group(1)] = None
+        else:
+            other_ids[m.group(1)] = None
+    ids = list(place_ids) + [i for i in other_ids if i not in place_ids]
+    return ids, has_place_section(text)
+
+
+# ─────────────────────────────────────────
+# Apollo State → trips 항목 (명소 목록)
+# ─────────────────────────────────────────
+_APOLLO_MARK = "__APOLLO_STATE__"
+_ROOT_QUERY_RE = re.compile(r'"ROOT_QUERY"\s*:\s*(?=\{)')
+_decoder = json.JSONDecoder()
+
+
+def _decode_entities(text: str, start: int, refs: list) -> dict:
+    """Apollo State 최상위 "ref": {...} 엔트리 중 refs 에 해당하는 것만 디코딩
+
+    refs 의 타입명(예: TripSummary)으로 키 패턴을 만들어 텍스트를 한 번만 훑고,
+    모두 찾으면 즉시 중단한다. {"__ref": "..."} 처럼 값으로 등장한 경우는
+    뒤에 ':' 이 없으므로 패턴에 걸리지 않는다.
+    """
+    wanted = set(refs)
+    types = sorted({r.split(":", 1)[0] for r in wanted})
+    key_re = re.compile(r'"((?:' + "|".join(map(re.escape, types)) + r'):[^"\\]*)"\s*:\s*(?=\{)')
+    found = {}
+    for m in key_re.finditer(text, start):
+        ref = m.group(1)
+        if ref in wanted and ref not in found:
+            obj, _ = _decoder.raw_decode(text, m.end())
+            found[ref] = obj if isinstance(obj, dict) else {}
+            if len(found) == len(wanted):
+                break
+    return found
+
+
+@profiling.timed("parse")
+def extract_trip_items(text: str):
+    """around 페이지 Apollo State 에서 ROOT_QUERY trips items 를 순서대로 반환
+
+    수백 KB 짜리 Apollo State 전체를 디코딩하지 않고
+    ROOT_QUERY 객체 + trips items 가 참조하는 엔트리(TripSummary 등)만 디코딩한다.
+    순서는 ROOT_QUERY 의 trips 키 순서 → items 순서 (= 네이버 명소 순위).
+
+    Returns: [{"name": ..., "category": ..., ...}]  /  Apollo State 자체가 없으면 None
+    """
+    apollo_idx = text.find(_APOLLO_MARK)
+    if apollo_idx == -1:
+        return None
+    brace_pos = text.find("{", apollo_idx)
+    if brace_pos == -1:
+        return None
+    m = _ROOT_QUERY_RE.search(text, brace_pos)
+    if not m:
+        return []
+    root, _ = _decoder.raw_decode(text, m.end())
+
+    refs = []
+    for key, val in root.items():
+        if "trips" in key.lower() and isinstance(val, dict):
+            for ref_item in val.get("items", []):
+                refs.append(ref_item.get("__ref", "") if isinstance(ref_item, dict) else "")
+    entities = _decode_entities(text, brace_pos, [r for r in refs if r]) if any(refs) else {}
+    return [entities.get(r, {}) for r in refs]
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# 네이버 플레이스 "주변 > 명소" 카테고리 화이트리스트 (v2 - 누락 카테고리 보완)
+# 실제 네이버 TripSummary category 값 기준으로 필터링
+# ──────────────────────────────────────────────────────────────────────────────
+SPOT_WHITELIST = {
+    # 공원류
+    "근린공원", "자연공원", "도시공원", "체육공원", "소공원", "어린이공원",
+    "문화공원", "역사공원", "수변공원", "생태공원", "국립공원", "도립공원",
+    "도시,테마공원", "테마공원",
+    # 광장·산책·체험
+    "광장", "산책로", "체험마을", "농어촌체험마을",
+    # 문화시설
+    "미술관", "박물관", "갤러리", "갤러리,화랑", "갤러리·화랑",
+    "전시관", "전시장", "공연장", "콘서트홀", "아트센터", "아트홀",
+    "복합문화공간", "문화센터", "문화회관", "시민회관",
+    "도서관", "기념관", "이벤트홀",
+    # 역사·유적·유산
+    "사찰", "절", "성당", "교회", "전통사찰",
+    "세계문화유산", "유적지", "문화재", "역사유적지", "사적지",
+    "향교", "서원", "궁궐", "왕릉",
+    "국가유산", "국가문화유산", "국가문화재", "천연기념물", "사적",
+    # 종교시설 (관광명소로서)
+    "천주교", "기독교", "개신교", "불교", "원불교",
+    # 지역명소·관광
+    "지역명소", "관광명소", "랜드마크", "관광안내소", "관광지",
+    # 자연
+    "산", "계곡", "폭포", "해수욕장", "강", "호수", "저수지", "연못",
+    "수목원", "식물원", "수족관", "동물원", "자연보호구역", "생태관",
+    "섬", "갯벌", "습지", "온천",
+    # 테마·체험
+    "테마파크", "워터파크", "아쿠아리움", "과학관", "천문대", "어린이과학관",
+    # 기타 명소
+    "등대", "전망대", "케이블카", "모노레일",
+}
+
+SPOT_KEYWORDS = [
+    "공원", "미술관", "박물관", "갤러리", "공연장", "전시",
+    "문화센터", "문화회관", "도서관", "기념관",
+    "유산", "유적", "문화재", "사찰", "향교", "궁궐", "왕릉",
+    "수목원", "식물원", "동물원",
+    "테마파크", "워터파크", "아쿠아리움", "과학관", "천문대",
+    "명소", "관광", "랜드마크", "이벤트홀",
+    "체험마을", "전망대",
+]
+
+# 화이트리스트 + 키워드를 정규식 하나로 컴파일
+# - 화이트리스트: 콤마로 나눈 부분(part) 전체가 일치해야 함 → (^|,)공백*(이름)공백*(,|$)
+# - 키워드: part 안 부분 문자열 → 키워드에 구분자가 없으므로 전체 문자열 검색과 동일
+# 콤마/중점이 들어간 화이트리스트 항목은 분리 후 part 로 나올 수 없어 제외
+_SPOT_PART_NAMES = sorted((w for w in SPOT_WHITELIST if "," not in w and "·" not in w),
+                          key=len, reverse=True)
+_SPOT_CATEGORY_RE = re.compile(
+    r"(?:^|,)\s*(?:" + "|".join(map(re.escape, _SPOT_PART_NAMES)) + r")\s*(?=,|$)"
+    + "|" + "|".join(map(re.escape, SPOT_KEYWORDS))
+)
+
+
+@lru_cache(maxsize=4096)
+def is_spot_category(category: str) -> bool:
+    """네이버 '주변 > 명소' 탭에 표시되는 카테고리인지 판별 (v2)
+
+    복합 카테고리(예: "절,사찰", "호수,연못,저수지", "갤러리·화랑")는 콤마/중점 기준으로
+    나눠 판단한다. 같은 카테고리 문자열은 반복 등장하므로 결과를 메모이즈.
+    """
+    if not category:
+        return False
+    return _SPOT_CATEGORY_RE.search(category.replace("·", ",")) is not None
@@ -0,0 +1,268 @@
+"""
+요청 단위 프로파일링 (opt-in) — 시간 분해 + 느린 요청 스택 샘플 저장
+
+PROFILE_REQUESTS=1 일 때만 동작. 꺼져 있으면 계측 지점(db / naver_http / place_parser 등)은
+thread-local 조회 한 번으로 끝나 오버헤드가 사실상 없다.
+
+켜져 있으면 요청마다:
+- 시간 분해 : db / http(네이버 외부 호출) / parse(HTML·JSON 파싱) / excel(워크북 로드·저장) / render(템플릿)
+              → 응답 헤더 Server-Timing 으로 전달 (브라우저 개발자 도구 Network → Timing 에 표시)
+- 스택 샘플 : 공용 샘플러 스레드가 PROFILE_INTERVAL_MS 마다 요청 스레드(+ bind() 로 넘긴 작업 스레드)의
+              스택을 수집. 요청이 PROFILE_SLOW_MS 이상 걸렸거나 PROFILE_SAMPLE 확률에 걸렸거나
+              ?_profile=1 이면 PROFILE_DIR/{id}.json 으로 저장 (최근 PROFILE_KEEP 개 유지)
+- 저장된 프로파일은 /debug/profiles 에서 확인 (collapsed stack 은 speedscope / flamegraph.pl 로 열 수 있음)
+
+병렬 작업(ThreadPoolExecutor)에 넘기는 함수는 bind(fn) 으로 감싸야 그 스레드 시간도 요청에 합산된다
+(병렬 구간이 있으면 분해 합계가 전체 시간보다 클 수 있다).
+"""
+import os
+import sys
+import json
+import time
+import uuid
+import random
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+from functools import wraps
+
+ENABLED             = os.environ.get("PROFILE_REQUESTS", "0") == "1"
+PROFILE_SLOW_MS     = float(os.environ.get("PROFILE_SLOW_MS", 1000))
+PROFILE_SAMPLE      = float(os.environ.get("PROFILE_SAMPLE", 0))        # 0~1, 속도와 무관하게 저장할 확률
+PROFILE_INTERVAL_MS = float(os.environ.get("PROFILE_INTERVAL_MS", 5))
+PROFILE_KEEP        = int(os.environ.get("PROFILE_KEEP", 200))
+
+CATEGORIES = ("db", "http", "parse", "excel", "render")
+
+_local = threading.local()
+_active = {}                 # id → RequestProfile (샘플링 대상)
+_active_lock = threading.Lock()
+_sampler = None
+
+
+def profile_dir() -> str:
+    from db import DB_PATH
+    return os.environ.get("PROFILE_DIR", os.path.join(os.path.dirname(DB_PATH), "profiles"))
+
+
+class RequestProfile:
+    __slots__ = ("id", "method", "path", "started_at", "t0", "breakdown", "threads", "samples",
+                 "force", "lock")
+
+    def __init__(self, method: str, path: str, force: bool):
+        self.id = f"{datetime.now():%Y%m%d-%H%M%S}-{uuid.uuid4().hex[:6]}"
+        self.method = method
+        self.path = path
+        self.started_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        self.t0 = time.perf_counter()
+        self.breakdown = dict.fromkeys(CATEGORIES, 0.0)
+        self.threads = {threading.get_ident()}
+        self.samples = Counter()
+        self.force = force
+        self.lock = threading.Lock()
+
+
+# ────────────────────────────────────────────
+# 계측 지점
+# ────────────────────────────────────────────
+def add(category: str, seconds: float):
+    """현재 요청의 category 시간에 더함 (요청 밖이거나 꺼져 있으면 무시)"""
+    rec = getattr(_local, "rec", None)
+    if rec is not None:
+        with rec.lock:
+            rec.breakdown[category] = rec.breakdown.get(category, 0.0) + seconds
+
+
+@contextmanager
+def span(category: str):
+    if getattr(_local, "rec", None) is None:
+        yield
+        return
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        add(category, time.perf_counter() - t0)
+
+
+def timed(category: str):
+    """함수 실행 시간을 category 로 합산하는 데코레이터"""
+    def deco(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if getattr(_local, "rec", None) is None:
+                return fn(*args, **kwargs)
+            t0 = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                add(category, time.perf_counter() - t0)
+        return wrapper
+    return deco
+
+
+def bind(fn):
+    """작업 스레드에서 실행될 fn 을 현재 요청에 연결 (시간 분해 + 스택 샘플 대상)"""
+    rec = getattr(_local, "rec", None)
+    if rec is None:
+        return fn
+
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        tid = threading.get_ident()
+        prev = getattr(_local, "rec", None)
+        _local.rec = rec
+        with rec.lock:
+            rec.threads.add(tid)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            with rec.lock:
+                rec.threads.discard(tid)
+            _local.rec = prev
+    return wrapper
+
+
+# ────────────────────────────────────────────
+# 요청 시작 / 종료
+# ────────────────────────────────────────────
+def begin(method: str, path: str, force: bool = False) -> RequestProfile | None:
+    if not ENABLED:
+        return None
+    rec = RequestProfile(method, path, force)
+    _local.rec = rec
+    with _active_lock:
+        _active[rec.id] = rec
+    _ensure_sampler()
+    return rec
+
+
+def end(rec: RequestProfile, route: str, status: int) -> tuple[float, str | None]:
+    """요청 종료 → (전체 ms, 저장된 프로파일 id | None)"""
+    _local.rec = None
+    with _active_lock:
+        _active.pop(rec.id, None)
+    total_ms = (time.perf_counter() - rec.t0) * 1000
+    if not (rec.force or total_ms >= PROFILE_SLOW_MS
+            or (PROFILE_SAMPLE and random.random() < PROFILE_SAMPLE)):
+        return total_ms, None
+    try:
+        _save(rec, route, status, total_ms)
+        return total_ms, rec.id
+    except OSError:
+        return total_ms, None
+
+
+def server_timing(rec: RequestProfile, total_ms: float) -> str:
+    parts = [f"{k};dur={v * 1000:.1f}" for k, v in rec.breakdown.items() if v]
+    return ", ".join(parts + [f"total;dur={total_ms:.1f}"])
+
+
+def _ensure_sampler():
+    global _sampler
+    if _sampler is None or not _sampler.is_alive():
+        _sampler = threading.Thread(target=_sample_loop, name="profile-sampler", daemon=True)
+        _sampler.start()
+
+
+_ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+def _frame_name(filename: str, func: str) -> str:
+    """프로젝트 파일은 파일명, 라이브러리는 "패키지/파일명" (flask/app.py 와 app.py 구분)"""
+    if os.path.dirname(filename) == _ROOT:
+        return f"{os.path.basename(filename)}:{func}"
+    return f"{os.path.basename(os.path.dirname(filename))}/{os.path.basename(filename)}:{func}"
+
+
+def _stack_key(frame) -> str:
+    parts = []
+    while frame is not None:
+        code = frame.f_code
+        parts.append(_frame_name(code.co_filename, code.co_name))
+        frame = frame.f_back
+    return ";".join(reversed(parts))
+
+
+def _sample_loop():
+    interval = PROFILE_INTERVAL_MS / 1000
+    while True:
+        time.sleep(interval)
+        with _active_lock:
+            recs = list(_active.values())
+        if not recs:
+            continue
+        frames = sys._current_frames()
+        for rec in recs:
+            with rec.lock:
+                tids = list(rec.threads)
+            for tid in tids:
+                frame = frames.get(tid)
+                if frame is not None:
+                    rec.samples[_stack_key(frame)] += 1
+
+
+# ────────────────────────────────────────────
+# 저장 / 조회
+# ────────────────────────────────────────────
+def _save(rec: RequestProfile, route: str, status: int, total_ms: float):
+    d = profile_dir()
+    os.makedirs(d, exist_ok=True)
+    data = {
+        "id": rec.id,
+        "method": rec.method,
+        "path": rec.path,
+        "route": route,
+        "status": status,
+        "started_at": rec.started_at,
+        "total_ms": round(total_ms, 1),
+        "breakdown_ms": {k: round(v * 1000, 1) for k, v in rec.breakdown.items()},
+        "interval_ms": PROFILE_INTERVAL_MS,
+        "samples": dict(rec.samples.most_common()),
+    }
+    with open(os.path.join(d, f"{rec.id}.json"), "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+    files = sorted(fn for fn in os.listdir(d) if fn.endswith(".json"))
+    for fn in files[:-PROFILE_KEEP]:
+        try:
+            os.remove(os.path.join(d, fn))
+        except OSError:
+            pass
+
+
+def list_profiles(limit: int = 100) -> list[dict]:
+    """최근 저장된 프로파일 요약 (최신순)"""
+    d = profile_dir()
+    if not os.path.isdir(d):
+        return []
+    out = []
+    for fn in sorted((fn for fn in os.listdir(d) if fn.endswith(".json")), reverse=True)[:limit]:
+        p = load(fn[:-5])
+        if p:
+            p.pop("samples")
+            out.append(p)
+    return out
+
+
+def load(profile_id: str) -> dict | None:
+    if not profile_id.replace("-", "").isalnum():
+        return None
+    try:
+        with open(os.path.join(profile_dir(), f"{profile_id}.json"), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def top_functions(samples: dict, limit: int = 30) -> list[dict]:
+    """collapsed stack → 함수별 self / inclusive 샘플 수 (inclusive 순)"""
+    incl, self_ = Counter(), Counter()
+    for stack, n in samples.items():
+        funcs = stack.split(";")
+        self_[funcs[-1]] += n
+        for fn in set(funcs):
+            incl[fn] += n
+    total = sum(samples.values()) or 1
+    return [{"func": fn, "inclusive": c, "self": self_[fn], "pct": round(c / total * 100, 1)}
+            for fn, c in incl.most_common(limit)]
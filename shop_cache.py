@@ -0,0 +1,209 @@
+"""
+네이버 쇼핑 검색 API 응답 캐시 (SQLite, 모든 기능 공용)
+
+순위 추적(engine) / 상품 검색 / 노출 순위 확인 / 업체명 조회가 같은 (검색어, start, display, 정렬, 제외 필터)
+요청을 몇 분 간격으로 반복해서 API 할당량과 요청당 ~200ms 를 쓰지 않도록 응답을 저장해 둔다.
+- 키         : 정규화한 검색어(NFC, 공백 정리) + sort + exclude(항목 정렬), 페이지는 [start, start+display) 구간
+- 상위 구간  : 요청 구간을 포함하는 캐시 페이지가 있으면 잘라서 응답 (display=30 ← 같은 start 의 display=100,
+               start=21 display=20 ← start=1 display=100)
+- 넓혀 받기  : 캐시가 없으면 같은 start 로 display=100 을 받아 저장 (호출 수는 같고 다음 페이지 요청이 캐시 적중)
+- TTL        : SHOP_CACHE_TTL_SEC (0 이면 캐시 끔), 크기 상한 SHOP_CACHE_MAX_MB 초과 시 오래 안 쓴 항목부터 삭제 (LRU)
+- 동시 요청  : 캐시가 없는 같은 구간을 여러 스레드/워커가 동시에 요청하면 singleflight 로 API 한 번만 호출
+- 지표       : naver_shop_cache_total{result=hit|hit_superset|miss|bypass} (/metrics)
+"""
+import os
+import json
+import zlib
+import logging
+import sqlite3
+import unicodedata
+from datetime import datetime, timedelta
+
+import metrics
+import singleflight
+from db import get_conn
+
+logger = logging.getLogger(__name__)
+
+SHOP_CACHE_TTL_SEC = float(os.environ.get("SHOP_CACHE_TTL_SEC", 600))
+SHOP_CACHE_MAX_MB  = float(os.environ.get("SHOP_CACHE_MAX_MB", 64))
+SHOP_CACHE_WIDEN   = os.environ.get("SHOP_CACHE_WIDEN", "1") == "1"
+
+MAX_DISPLAY = 100          # 쇼핑 API display 상한
+_EVICT_EVERY = 50          # put 이 이만큼 쌓일 때마다 크기 확인
+
+CACHE_TOTAL = metrics.counter("naver_shop_cache_total",
+                              "쇼핑 API 응답 캐시 조회 결과 (result = hit / hit_superset / miss / bypass)")
+
+_TS_FMT = "%Y-%m-%d %H:%M:%S"
+
+_puts = 0
+
+
+def _ts(seconds_from_now: float = 0) -> str:
+    return (datetime.now() + timedelta(seconds=seconds_from_now)).strftime(_TS_FMT)
+
+
+def enabled() -> bool:
+    return SHOP_CACHE_TTL_SEC > 0
+
+
+def normalize_query(query: str) -> str:
+    """NFC + 앞뒤/연속 공백 정리 — API 호출과 캐시 키에 같은 값을 써야 응답과 키가 어긋나지 않음"""
+    return " ".join(unicodedata.normalize("NFC", query or "").split())
+
+
+def cache_key(query: str, sort: str = "sim", exclude: str | None = None) -> str:
+    q = normalize_query(query)
+    ex = ":".join(sorted(p for p in (exclude or "").split(":") if p))
+    return f"{q}\x1f{sort}\x1f{ex}"
+
+
+# ────────────────────────────────────────────
+# 조회 / 저장
+# ────────────────────────────────────────────
+def get(key: str, start: int, display: int, count: bool = True) -> dict | None:
+    """[start, start+display) 를 포함하는 유효한 페이지 → API 응답 형태로 잘라서 반환 / 없으면 None
+
+    count=False 면 지표에 넣지 않음 (singleflight 가 다른 워커 결과를 읽을 때)
+    """
+    now = _ts()
+    conn = get_conn()
+    try:
+        row = conn.execute("""
+            SELECT rowid, start, display, payload FROM shop_cache
+            WHERE qkey=? AND start<=? AND start + display >= ? AND expires_at > ?
+            ORDER BY display DESC LIMIT 1
+        """, (key, start, start + display, now)).fetchone()
+        if row is None:
+            if count:
+                CACHE_TOTAL.inc(result="miss")
+            return None
+        conn.execute("UPDATE shop_cache SET last_used=? WHERE rowid=?", (now, row["rowid"]))
+        conn.commit()
+    finally:
+        conn.close()
+
+    data = json.loads(zlib.decompress(row["payload"]))
+    exact = row["start"] == start and row["display"] == display
+    if count:
+        CACHE_TOTAL.inc(result="hit" if exact else "hit_superset")
+    if not exact:
+        off = start - row["start"]
+        data["items"] = data.get("items", [])[off:off + display]
+        data["start"], data["display"] = start, len(data["items"])
+    return data
+
+
+def put(key: str, start: int, display: int, data: dict):
+    """API 응답 저장 — 항목이 display 보다 적으면(결과 끝) 그 구간에 더 없다는 뜻이라 그대로 재사용 가능"""
+    global _puts
+    if not enabled() or not data:
+        return
+    payload = zlib.compress(json.dumps(data, ensure_ascii=False).encode("utf-8"), 6)
+    now = _ts()
+    conn = get_conn()
+    try:
+        conn.execute("""
+            INSERT OR REPLACE INTO shop_cache (qkey, start, display, payload, bytes, fetched_at, expires_at, last_used)
+            VALUES (?,?,?,?,?,?,?,?)
+        """, (key, start, display, payload, len(payload), now, _ts(SHOP_CACHE_TTL_SEC), now))
+        conn.commit()
+    finally:
+        conn.close()
+    _puts += 1
+    if _puts % _EVICT_EVERY == 0:
+        evict()
+
+
+def evict(max_bytes: float | None = None) -> int:
+    """만료 항목 삭제 + 총 크기가 상한을 넘으면 last_used 오래된 순으로 90% 까지 삭제 → 삭제 수"""
+    max_bytes = SHOP_CACHE_MAX_MB * 1024 * 1024 if max_bytes is None else max_bytes
+    conn = get_conn()
+    try:
+        removed = conn.execute("DELETE FROM shop_cache WHERE expires_at <= ?", (_ts(),)).rowcount
+        total = conn.execute("SELECT COALESCE(SUM(bytes), 0) FROM shop_cache").fetchone()[0]
+        if total > max_bytes:
+            target, drop = total - max_bytes * 0.9, []
+            for r in conn.execute("SELECT rowid, bytes FROM shop_cache ORDER BY last_used"):
+                if target <= 0:
+                    break
+                drop.append((r["rowid"],))
+                target -= r["bytes"]
+            conn.executemany("DELETE FROM shop_cache WHERE rowid=?", drop)
+            removed += len(drop)
+        conn.commit()
+        return removed
+    finally:
+        conn.close()
+
+
+def _lookup(key: str, start: int, display: int) -> dict | None:
+    try:
+        return get(key, start, display, count=False)
+    except sqlite3.Error:
+        return None
+
+
+def fetch(fetch_fn, query: str, start: int, display: int, sort: str = "sim",
+          exclude: str | None = None, use_cache: bool = True, flight: str = "shop") -> dict | None:
+    """캐시 적중이면 캐시, 아니면 fetch_fn(start, display) 호출 후 저장 (None = 실패, 저장 안 함)
+
+    use_cache=False 면 캐시를 읽지 않고 새로 받아 덮어씀 (?refresh=1)
+    같은 구간을 받는 중인 호출이 있으면 새로 호출하지 않고 그 응답을 공유 (singleflight)
+    flight: singleflight kind — 재시도 정책이 다른 호출(화면 / 추적)끼리는 서로 기다리지 않도록 구분
+    """
+    key = cache_key(query, sort, exclude)
+    if not enabled():
+        return singleflight.do(flight, f"{key}\x1f{start}\x1f{display}", lambda: fetch_fn(start, display))
+    if use_cache:
+        try:
+            hit = get(key, start, display)
+        except sqlite3.Error as e:      # 캐시 장애가 검색 자체를 막지 않도록
+            logger.warning(f"[ShopCache] 조회 실패: {e}")
+            hit = None
+        if hit is not None:
+            return hit
+    else:
+        CACHE_TOTAL.inc(result="bypass")
+
+    wide = MAX_DISPLAY if SHOP_CACHE_WIDEN and display < MAX_DISPLAY else display
+
+    def load():
+        data = fetch_fn(start, wide)
+        if data is not None:
+            try:
+                put(key, start, wide, data)
+            except sqlite3.Error as e:
+                logger.warning(f"[ShopCache] 저장 실패: {e}")
+        return data
+
+    # 다른 워커가 같은 구간을 받는 중이면 끝난 뒤 캐시에서 읽음
+    data = singleflight.do(flight, f"{key}\x1f{start}\x1f{wide}", load,
+                           lookup=lambda: _lookup(key, start, wide))
+    if data is None:
+        return None
+    if wide != display:
+        items = data.get("items", [])[:display]
+        data = {**data, "items": items, "display": len(items)}
+    return data
+
+
+def stats() -> dict:
+    conn = get_conn()
+    row = conn.execute("""
+        SELECT COUNT(*) AS entries, COALESCE(SUM(bytes), 0) AS bytes,
+               COALESCE(SUM(expires_at > ?), 0) AS live
+        FROM shop_cache
+    """, (_ts(),)).fetchone()
+    conn.close()
+    return {"entries": row["entries"], "live": row["live"], "mb": round(row["bytes"] / 1024 / 1024, 2),
+            "ttl_sec": SHOP_CACHE_TTL_SEC, "max_mb": SHOP_CACHE_MAX_MB}
+
+
+def clear() -> int:
+    conn = get_conn()
+    n = conn.execute("DELETE FROM shop_cache").rowcount
+    conn.commit()
+    conn.close()
+    return n
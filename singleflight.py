@@ -0,0 +1,167 @@
+"""
+동일 요청 합치기 (single-flight) — 같은 업스트림 호출이 동시에 여러 번 나가지 않도록
+
+대시보드 / 업무 자동화 화면에서 여러 명이 같은 키워드를 동시에 확인하거나, 자동 추적 스레드가
+받고 있는 페이지를 사용자가 같이 요청하면 호출마다 네이버로 따로 나간다.
+do(kind, key, fn) 은 같은 (kind, key) 호출이 진행 중이면 새로 호출하지 않고 그 결과를 기다려 공유한다.
+- 프로세스 안 : 먼저 온 스레드(리더)만 fn() 실행, 나머지는 Event 대기 후 같은 결과 / 같은 예외
+- 워커 간     : lookup(캐시 조회 함수)을 넘기면 SQLite singleflight_locks 의 짧은 잠금으로
+                다른 워커가 같은 호출 중인지 확인 → 끝날 때까지 기다렸다가 lookup() 으로 결과를 읽음
+                (lookup 이 None = 상대가 실패해 캐시에 없음 → 직접 호출)
+- 잠금은 SINGLEFLIGHT_LOCK_SEC 뒤 만료 (워커가 죽어도 고착되지 않음),
+  SINGLEFLIGHT_WAIT_SEC 넘게 기다리면 포기하고 직접 호출
+- 지표 : singleflight_total{kind, result=leader|joined|remote|timeout} (/metrics)
+"""
+import os
+import time
+import uuid
+import hashlib
+import logging
+import sqlite3
+import threading
+
+import metrics
+from db import get_conn
+
+logger = logging.getLogger(__name__)
+
+SINGLEFLIGHT_SHARED   = os.environ.get("SINGLEFLIGHT_SHARED", "1") == "1"
+SINGLEFLIGHT_LOCK_SEC = float(os.environ.get("SINGLEFLIGHT_LOCK_SEC", 15))
+SINGLEFLIGHT_WAIT_SEC = float(os.environ.get("SINGLEFLIGHT_WAIT_SEC", 10))
+
+_POLL_SEC = 0.05
+
+FLIGHT_TOTAL = metrics.counter("singleflight_total",
+                               "동일 업스트림 호출 합치기 (result = leader 직접 호출 / joined 프로세스 내 공유 / "
+                               "remote 다른 워커 결과 공유 / timeout 대기 포기)")
+
+
+class _Flight:
+    __slots__ = ("event", "result", "error")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+_flights: dict[tuple, _Flight] = {}
+_lock = threading.Lock()
+
+
+# ────────────────────────────────────────────
+# 워커 간 잠금 (SQLite)
+# ────────────────────────────────────────────
+def _lock_key(kind: str, key: str) -> str:
+    return f"{kind}:{hashlib.sha1(key.encode('utf-8')).hexdigest()}"
+
+
+def _try_lock(lock_key: str, owner: str) -> bool | None:
+    """비어 있거나 만료된 잠금이면 획득 → True / 다른 워커가 잡고 있음 → False / DB 오류 → None"""
+    now = time.time()
+    conn = get_conn()
+    try:
+        cur = conn.execute("""
+            INSERT INTO singleflight_locks (key, owner, expires_at) VALUES (?,?,?)
+            ON CONFLICT(key) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at
+            WHERE singleflight_locks.expires_at < ?
+        """, (lock_key, owner, now + SINGLEFLIGHT_LOCK_SEC, now))
+        conn.commit()
+        return cur.rowcount == 1
+    except sqlite3.Error as e:
+        logger.warning(f"[SingleFlight] 잠금 실패 → 직접 호출: {e}")
+        return None
+    finally:
+        conn.close()
+
+
+def _locked(lock_key: str) -> bool:
+    conn = get_conn()
+    try:
+        return conn.execute("SELECT 1 FROM singleflight_locks WHERE key=? AND expires_at >= ?",
+                            (lock_key, time.time())).fetchone() is not None
+    except sqlite3.Error:
+        return False
+    finally:
+        conn.close()
+
+
+def _unlock(lock_key: str, owner: str):
+    conn = get_conn()
+    try:
+        conn.execute("DELETE FROM singleflight_locks WHERE key=? AND owner=?", (lock_key, owner))
+        conn.commit()
+    except sqlite3.Error as e:
+        logger.warning(f"[SingleFlight] 잠금 해제 실패 (만료 후 자동 해제): {e}")
+    finally:
+        conn.close()
+
+
+def _remote(kind: str, key: str, lookup, owner: str):
+    """잠금 획득 → (True, None) / 다른 워커 결과 → (False, 결과) / 대기 시간 초과·DB 오류 → (False, None)"""
+    lock_key = _lock_key(kind, key)
+    deadline = time.monotonic() + SINGLEFLIGHT_WAIT_SEC
+    while True:
+        # 잠금이 풀렸는데 결과가 캐시에 없는 경우(상대 실패 / 잠금 경합)도 대기 시간 안에서만 반복
+        if time.monotonic() > deadline:
+            FLIGHT_TOTAL.inc(kind=kind, result="timeout")
+            return False, None
+        got = _try_lock(lock_key, owner)
+        if got is not False:
+            return bool(got), None
+        while _locked(lock_key):
+            if time.monotonic() > deadline:
+                FLIGHT_TOTAL.inc(kind=kind, result="timeout")
+                return False, None
+            time.sleep(_POLL_SEC)
+        value = lookup()
+        if value is not None:
+            FLIGHT_TOTAL.inc(kind=kind, result="remote")
+            return False, value
+
+
+# ────────────────────────────────────────────
+# 진입점
+# ────────────────────────────────────────────
+def do(kind: str, key: str, fn, lookup=None):
+    """(kind, key) 가 같은 진행 중 호출이 있으면 그 결과를 공유, 없으면 fn() 실행
+
+    kind   : 호출 종류 (shop / place_name / place_mmap ...) — 지표 라벨 겸 키 공간
+    lookup : 워커 간 공유용 — 다른 워커의 호출이 끝난 뒤 결과를 읽는 함수 (보통 캐시 조회, 없으면 None)
+    결과 객체는 대기자 모두에게 그대로 전달되므로 호출 측에서 수정하지 말 것
+    """
+    fkey = (kind, key)
+    with _lock:
+        flight = _flights.get(fkey)
+        leader = flight is None
+        if leader:
+            flight = _flights[fkey] = _Flight()
+    if not leader:
+        FLIGHT_TOTAL.inc(kind=kind, result="joined")
+        flight.event.wait()
+        if flight.error is not None:
+            raise flight.error
+        return flight.result
+
+    owner = None
+    try:
+        if lookup is not None and SINGLEFLIGHT_SHARED:
+            owner = f"{os.getpid()}:{uuid.uuid4().hex[:8]}"
+            locked, value = _remote(kind, key, lookup, owner)
+            if not locked:
+                owner = None
+                if value is not None:
+                    flight.result = value
+                    return value
+        FLIGHT_TOTAL.inc(kind=kind, result="leader")
+        flight.result = fn()
+        return flight.result
+    except BaseException as e:
+        flight.error = e
+        raise
+    finally:
+        if owner is not None:
+            _unlock(_lock_key(kind, key), owner)
+        with _lock:
+            _flights.pop(fkey, None)
+        flight.event.set()
@@ -0,0 +1,184 @@
+"""
+순위 추적 실행(run) 진행 상황 — SQLite tracking_runs 테이블
+
+gunicorn 워커가 여러 개면 상태 조회 요청을 받은 워커가 실제로 추적을 돌리는
+워커가 아닐 수 있어, 프로세스 메모리(dict) 대신 DB 에 진행 상황을 기록한다.
+- start()   : 실행 중인 run 이 없을 때만 새 run 등록 (워커 간 중복 실행 방지)
+- advance() : 조합(상품×키워드) 단위 진행률 / 현재 광고주 / API 호출 수 / 오류 수
+- finish()  : 종료 상태 기록
+- status()  : /track/status, /track/events 응답 (ETA 포함)
+
+실행 중 여부는 PID 가 아니라 heartbeat(heartbeat_at, epoch 초)로 판단한다 —
+cron / 별도 컨테이너의 CLI 는 PID 네임스페이스나 호스트가 달라 os.kill 로 확인할 수 없다.
+run 을 돌리는 프로세스는 RUN_HEARTBEAT_SEC 마다 heartbeat 를 갱신하고
+(조합 하나가 오래 걸리거나 circuit breaker 로 쉬는 동안에도),
+RUN_STALE_SEC 넘게 갱신이 없으면 그 run 은 중단된 것으로 본다.
+owner_host(호스트명 + PID 네임스페이스)가 이 프로세스와 같을 때만 owner_pid 로
+프로세스 종료를 바로 확인한다 (웹 워커가 죽은 경우 RUN_STALE_SEC 를 기다리지 않음).
+"""
+import os
+import time
+import socket
+import logging
+import sqlite3
+import threading
+from datetime import datetime
+
+from db import get_conn
+from jobs import pid_alive
+
+logger = logging.getLogger(__name__)
+
+RUN_HEARTBEAT_SEC = float(os.environ.get("RUN_HEARTBEAT_SEC", 10))
+RUN_STALE_SEC     = float(os.environ.get("RUN_STALE_SEC", 60))
+
+_TS_FMT = "%Y-%m-%d %H:%M:%S"
+_WRITE_MIN_SEC = 1.0   # 진행률 DB 기록 최소 간격
+
+_last_write = {}       # run_id → 마지막 기록 시각 (이 프로세스)
+_beats = {}            # run_id → heartbeat 스레드 종료 Event (이 프로세스)
+
+
+def _host_id() -> str:
+    """PID 를 비교해도 되는 범위 — 호스트명 + PID 네임스페이스 (컨테이너마다 다름)"""
+    try:
+        ns = os.readlink("/proc/self/ns/pid")
+    except OSError:
+        ns = ""
+    return f"{socket.gethostname()}/{ns}" if ns else socket.gethostname()
+
+
+_HOST = _host_id()
+
+
+def _now():
+    return datetime.now().strftime(_TS_FMT)
+
+
+def _alive(row) -> bool:
+    """status='running' run 의 heartbeat 가 RUN_STALE_SEC 안에 갱신됐는지 (같은 호스트면 PID 도 확인)"""
+    if time.time() - (row["heartbeat_at"] or 0) > RUN_STALE_SEC:
+        return False
+    return row["owner_host"] != _HOST or pid_alive(row["owner_pid"])
+
+
+def _heartbeat(run_id: int, stop: threading.Event):
+    while not stop.wait(RUN_HEARTBEAT_SEC):
+        try:
+            conn = get_conn()
+            try:
+                conn.execute("UPDATE tracking_runs SET heartbeat_at=? WHERE id=? AND status='running'",
+                             (time.time(), run_id))
+                conn.commit()
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            # 한두 번 실패는 RUN_STALE_SEC 안에서 다음 heartbeat 가 만회
+            logger.warning(f"[TrackRuns] heartbeat 기록 실패 (run={run_id}): {e}")
+
+
+def start(source: str, total: int) -> int | None:
+    """새 run 등록 → run_id / 다른 프로세스에서 이미 실행 중이면 None"""
+    conn = get_conn()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        row = conn.execute(
+            "SELECT id, owner_pid, owner_host, heartbeat_at FROM tracking_runs WHERE status='running' ORDER BY id DESC LIMIT 1"
+        ).fetchone()
+        if row and _alive(row):
+            conn.rollback()
+            return None
+        if row:
+            conn.execute("""
+                UPDATE tracking_runs SET status='error', finished_at=?, last_error=?
+                WHERE status='running'
+            """, (_now(), f"추적하던 프로세스가 종료되었거나 {RUN_STALE_SEC:.0f}초 넘게 응답이 없어 중단된 것으로 처리했습니다."))
+        now = _now()
+        cur = conn.execute("""
+            INSERT INTO tracking_runs (source, status, total, owner_pid, owner_host, started_at, updated_at,
+                                       heartbeat_at)
+            VALUES (?,?,?,?,?,?,?,?)
+        """, (source, "running", total, os.getpid(), _HOST, now, now, time.time()))
+        conn.commit()
+        run_id = cur.lastrowid
+    except sqlite3.OperationalError:
+        conn.rollback()
+        return None
+    finally:
+        conn.close()
+    stop = _beats[run_id] = threading.Event()
+    threading.Thread(target=_heartbeat, args=(run_id, stop), daemon=True,
+                     name=f"track-run-{run_id}-heartbeat").start()
+    return run_id
+
+
+def advance(run_id: int, done: int, client_name: str, api_calls: int, errors: int,
+            last_error: str | None = None, force: bool = False):
+    """진행률 기록 (프로세스당 _WRITE_MIN_SEC 간격으로 묶어서 기록)"""
+    now = time.monotonic()
+    if not force and now - _last_write.get(run_id, 0) < _WRITE_MIN_SEC:
+        return
+    _last_write[run_id] = now
+    conn = get_conn()
+    conn.execute("""
+        UPDATE tracking_runs
+        SET done=?, current_client=?, api_calls=?, errors=?,
+            last_error=COALESCE(?, last_error), updated_at=?, heartbeat_at=?
+        WHERE id=?
+    """, (done, client_name, api_calls, errors, last_error, _now(), time.time(), run_id))
+    conn.commit()
+    conn.close()
+
+
+def finish(run_id: int, status: str = "done", last_error: str | None = None):
+    _last_write.pop(run_id, None)
+    stop = _beats.pop(run_id, None)
+    if stop:
+        stop.set()
+    conn = get_conn()
+    conn.execute("""
+        UPDATE tracking_runs
+        SET status=?, current_client=NULL, last_error=COALESCE(?, last_error),
+            finished_at=?, updated_at=?
+        WHERE id=?
+    """, (status, last_error, _now(), _now(), run_id))
+    conn.commit()
+    conn.close()
+
+
+def status() -> dict:
+    """최근 run 기준 추적 상태
+
+    Returns: {running, last_run, run_id, source, done, total, current_client,
+              api_calls, errors, last_error, started_at, eta_sec}
+    """
+    conn = get_conn()
+    row = conn.execute("SELECT * FROM tracking_runs ORDER BY id DESC LIMIT 1").fetchone()
+    last = conn.execute(
+        "SELECT finished_at FROM tracking_runs WHERE status='done' ORDER BY id DESC LIMIT 1"
+    ).fetchone()
+    conn.close()
+
+    st = {"running": False, "last_run": last["finished_at"][:16] if last else None, "run_id": None}
+    if not row:
+        return st
+    running = row["status"] == "running" and _alive(row)
+    st.update({
+        "running": running,
+        "run_id": row["id"],
+        "source": row["source"],
+        "status": row["status"] if running or row["status"] != "running" else "error",
+        "done": row["done"],
+        "total": row["total"],
+        "current_client": row["current_client"] if running else None,
+        "api_calls": row["api_calls"],
+        "errors": row["errors"],
+        "last_error": row["last_error"],
+        "started_at": row["started_at"],
+        "finished_at": row["finished_at"],
+        "eta_sec": None,
+    })
+    if running and row["done"]:
+        elapsed = (datetime.now() - datetime.strptime(row["started_at"], _TS_FMT)).total_seconds()
+        st["eta_sec"] = int(elapsed / row["done"] * (row["total"] - row["done"]))
+    return st
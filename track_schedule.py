@@ -0,0 +1,151 @@
+"""
+자동 추적 스케줄 — burst(매일 11:00 일괄) / window(시간대 분산) 모드
+
+burst 모드는 모든 광고주를 11:00 에 한꺼번에 추적해 그 시각에 API 호출이 몰린다
+(429/쿼터 오류, 대시보드 지연). window 모드는 설정한 시간대(예: 09:00–13:00)를
+1시간 단위 슬롯으로 나누고 광고주 단위 작업을 슬롯에 고르게 배치한다.
+- daily  광고주 : 하루 1회 — 조합 수(상품×키워드) 기준으로 가장 한가한 슬롯에 배정 (마감 = 시간대 종료)
+- hourly 광고주 : 시간대 안에서 매 슬롯마다 1회 (마감 = 해당 슬롯 종료)
+- 슬롯 안에서는 앞선 작업들의 조합 수에 비례해 시작 시각을 띄워 분당 호출 수를 평평하게 유지
+
+스케줄러는 1분마다 due_units() 로 시작 시각이 지난 작업을 찾고,
+leader.claim_slot(unit_job_id(cid), slot) 으로 회차별 실행권을 확인한 뒤 실행한다.
+"""
+import os
+from datetime import datetime, timedelta
+
+from db import get_conn
+
+MODES     = ("burst", "window")
+CADENCES  = ("daily", "hourly")
+SLOT_MIN  = 60                       # 슬롯 길이 (분)
+
+DEFAULTS = {
+    "track_mode":         os.environ.get("TRACK_MODE", "burst"),
+    "track_window_start": os.environ.get("TRACK_WINDOW_START", "09:00"),
+    "track_window_end":   os.environ.get("TRACK_WINDOW_END", "13:00"),
+}
+
+
+def _parse_hhmm(s: str) -> tuple[int, int]:
+    h, m = (int(x) for x in s.strip().split(":"))
+    if not (0 <= h < 24 and 0 <= m < 60):
+        raise ValueError(s)
+    return h, m
+
+
+def get_config() -> dict:
+    """{mode, start, end} — settings 테이블 값 우선, 없으면 환경변수/기본값"""
+    conn = get_conn()
+    rows = {r["key"]: r["value"] for r in conn.execute(
+        "SELECT key,value FROM settings WHERE key IN (?,?,?)", tuple(DEFAULTS)).fetchall()}
+    conn.close()
+    cfg = {k: rows.get(k) or v for k, v in DEFAULTS.items()}
+    return {"mode": cfg["track_mode"], "start": cfg["track_window_start"], "end": cfg["track_window_end"]}
+
+
+def save_config(mode: str, start: str, end: str):
+    """설정 저장 — 잘못된 값이면 ValueError"""
+    if mode not in MODES:
+        raise ValueError(f"알 수 없는 모드: {mode}")
+    try:
+        if _parse_hhmm(start) >= _parse_hhmm(end):
+            raise ValueError
+    except ValueError:
+        raise ValueError("시간대는 HH:MM 형식이며 시작 < 종료여야 합니다.")
+    conn = get_conn()
+    for key, value in (("track_mode", mode), ("track_window_start", start), ("track_window_end", end)):
+        conn.execute("INSERT OR REPLACE INTO settings (key,value) VALUES (?,?)", (key, value))
+    conn.commit()
+    conn.close()
+
+
+def unit_job_id(cid: int) -> str:
+    """claim_slot 용 작업 ID (광고주별)"""
+    return f"track:{cid}"
+
+
+def _slots(day: datetime, cfg: dict) -> list[tuple[datetime, datetime]]:
+    """day 의 시간대를 SLOT_MIN 분 단위 [(시작, 끝)] 로 분할 (마지막 슬롯은 짧을 수 있음)"""
+    sh, sm = _parse_hhmm(cfg["start"])
+    eh, em = _parse_hhmm(cfg["end"])
+    t   = day.replace(hour=sh, minute=sm, second=0, microsecond=0)
+    end = day.replace(hour=eh, minute=em, second=0, microsecond=0)
+    slots = []
+    while t < end:
+        nxt = min(t + timedelta(minutes=SLOT_MIN), end)
+        slots.append((t, nxt))
+        t = nxt
+    return slots
+
+
+def current_slot(now: datetime, cfg: dict) -> tuple[datetime, datetime] | None:
+    """now 가 속한 슬롯 (시작, 끝) / 시간대 밖이면 None"""
+    return next(((s, e) for s, e in _slots(now, cfg) if s <= now < e), None)
+
+
+def plan(units: list[dict], day: datetime, cfg: dict) -> list[dict]:
+    """하루 실행 계획
+
+    Args:
+        units: [{cid, name, cadence, weight}]  (weight = 상품×키워드 조합 수)
+        day:   기준 날짜 (tz-aware datetime, 날짜만 사용)
+    Returns: [{cid, name, cadence, weight, slot, due, deadline}] — due 순 정렬
+             slot 은 claim_slot 회차 키 (daily: 날짜 / hourly: 날짜 + 슬롯 시작 시각)
+    """
+    slots = _slots(day, cfg)
+    if not slots:
+        return []
+    date = day.strftime("%Y-%m-%d")
+    buckets = [[] for _ in slots]
+
+    hourly = sorted((u for u in units if u["cadence"] == "hourly"), key=lambda u: u["cid"])
+    for i, (s, _) in enumerate(slots):
+        buckets[i] += [dict(u, slot=f"{date} {s:%H:%M}") for u in hourly]
+
+    # daily: 무거운 광고주부터 현재 부하가 가장 적은 슬롯에 배정 (LPT)
+    # 부하는 슬롯 길이로 나눈 값 — 짧은 마지막 슬롯에 작업이 몰리지 않도록
+    load = [sum(u["weight"] for u in b) for b in buckets]
+    length = [(e - s).total_seconds() for s, e in slots]
+    daily = sorted((u for u in units if u["cadence"] != "hourly"), key=lambda u: (-u["weight"], u["cid"]))
+    for u in daily:
+        i = min(range(len(slots)), key=lambda j: ((load[j] + u["weight"]) / length[j], j))
+        buckets[i].append(dict(u, slot=date))
+        load[i] += u["weight"]
+
+    out = []
+    for (s, e), bucket, total in zip(slots, buckets, load):
+        bucket.sort(key=lambda u: (u["cadence"] != "hourly", u["cid"]))
+        done = 0
+        for u in bucket:
+            due = s + (e - s) * (done / total if total else 0)
+            deadline = e if u["cadence"] == "hourly" else slots[-1][1]
+            out.append(dict(u, due=due.replace(microsecond=0), deadline=deadline))
+            done += u["weight"]
+    out.sort(key=lambda u: (u["due"], u["cid"]))
+    return out
+
+
+def due_units(now: datetime, units: list[dict], cfg: dict) -> list[dict]:
+    """지금 실행할 작업 — 시작 시각이 지난 daily 작업(밀린 것 포함) + 현재 슬롯의 hourly 작업
+
+    이미 실행한 회차는 호출 쪽에서 claim_slot 으로 걸러낸다.
+    지나간 슬롯의 hourly 작업은 다음 슬롯이 곧 대신하므로 다시 실행하지 않는다.
+    """
+    out = []
+    for u in plan(units, now, cfg):
+        if u["due"] > now:
+            continue
+        if u["cadence"] == "hourly" and now >= u["deadline"]:
+            continue
+        out.append(u)
+    return out
+
+
+def next_due(now: datetime, units: list[dict], cfg: dict) -> datetime | None:
+    """다음 작업 시작 시각 (오늘 남은 작업이 없으면 내일 첫 작업)"""
+    for u in plan(units, now, cfg):
+        if u["due"] > now:
+            return u["due"]
+    tomorrow = plan(units, now + timedelta(days=1), cfg)
+    return tomorrow[0]["due"] if tomorrow else None
@@ -0,0 +1,169 @@
+"""
+순위 추적 실행 — 웹(app.py) / CLI(main.py) 공용
+
+Flask / APScheduler 없이 engine + db 만으로 돈다. 그래서 cron 이나 워커 컨테이너에서
+`python main.py` 로 바로 추적을 돌릴 수 있고, 웹 대시보드는 같은 tracking_runs 기록으로 진행 상황을 본다.
+- run_all_tracking() : 광고주(들) 추적 → rank_history 기록, 진행률은 track_runs 에 기록
+- API 키는 api_keys 풀의 background 용도 키를 조합마다 골라 씀 (풀이 비어 있으면 기존 단일 키)
+"""
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from db import get_conn
+from engine import track_client
+import api_keys
+import track_runs
+import check_policy
+import metrics
+
+logger = logging.getLogger(__name__)
+
+tracking_status = {}   # cid → "running" / "done" / "error:..." (이 프로세스)
+
+
+def load_work(client_ids=None, keywords=None):
+    """추적 대상 → (clients, [(client, prods, kws)])  상품·키워드가 모두 있는 광고주만 work 에 포함
+
+    keywords 를 주면 그 키워드만 추적 (광고주에 등록된 키워드 중에서)
+    """
+    conn = get_conn()
+    clients = conn.execute("SELECT id,name FROM clients").fetchall()
+    if client_ids is not None:
+        clients = [cl for cl in clients if cl["id"] in set(client_ids)]
+    work = []
+    for cl in clients:
+        prods = [dict(r) for r in conn.execute(
+            "SELECT product_id,catalog_id,url_product_id,mall_name,product_name FROM products WHERE client_id=?", (cl["id"],)
+        ).fetchall()]
+        kws = [r["keyword"] for r in conn.execute(
+            "SELECT keyword FROM keywords WHERE client_id=?", (cl["id"],)
+        ).fetchall()]
+        if keywords is not None:
+            kws = [kw for kw in kws if kw in set(keywords)]
+        if prods and kws:
+            work.append((cl, prods, kws))
+    conn.close()
+    return clients, work
+
+
+def save_results(results):
+    conn = get_conn()
+    conn.executemany("""
+        INSERT INTO rank_history
+        (client_id,product_id,product_name,keyword,rank,
+         lprice,mall_name,product_type,matched_id,scan,status,error,checked_at)
+        VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?)
+    """, [(r["client_id"], r["product_id"], r["product_name"],
+           r["keyword"], r["rank"], r.get("lprice"), r.get("mall_name"),
+           r.get("product_type"), r.get("matched_id"), r.get("scan", "full"),
+           r.get("status", "ok"), r.get("error"), r["checked_at"])
+          for r in results])
+    conn.commit()
+    conn.close()
+
+
+def run_all_tracking(source="manual", client_ids=None, hot=False, keywords=None, workers=1,
+                     adaptive=None, dry_run=False):
+    """전체 광고주 순위 추적 — 진행 상황은 track_runs(SQLite)에 기록되어 모든 워커에서 조회 가능
+
+    client_ids 를 주면 해당 광고주만 추적 (window 모드 분산 실행 / CLI --client)
+    자동 실행(source != manual)은 check_policy 로 조합별 full / probe / skip 결정,
+    hot=True 면 변동이 큰 조합만 다시 확인. adaptive 를 주면 source 와 관계없이 그 값을 따른다.
+    workers > 1 이면 광고주 단위로 병렬 추적 (외부 호출 동시 수는 naver_http 호스트 상한이 묶음)
+    dry_run=True 면 rank_history 에 기록하지 않음
+
+    Returns: {"run_id", "status", "results": [...], "errors": {광고주: 메시지}}
+             / API 키가 없거나 다른 워커에서 실행 중이면 None
+    """
+    if adaptive is None:
+        adaptive = source != "manual" and check_policy.ADAPTIVE
+    api_id, api_secret = api_keys.get_api_keys("background")
+    if not api_id:
+        logger.warning("[추적] API 키 미설정")
+        return None
+
+    clients, work = load_work(client_ids, keywords)
+    if not clients:
+        return None
+
+    run_id = track_runs.start(source, sum(len(p) * len(k) for _, p, k in work))
+    if run_id is None:
+        logger.info(f"[추적] 다른 워커에서 이미 실행 중 — {source} 건너뜀")
+        return None
+
+    logger.info(f"[추적 시작] {source} | {len(clients)}개 광고주 | run={run_id}"
+                + (f" | 병렬 {workers}" if workers > 1 else ""))
+    lock = threading.Lock()
+    done_by_client = {}
+    counters = {"api_calls": 0, "errors": 0}
+    out = {"run_id": run_id, "status": "done", "results": [], "errors": {}}
+
+    def advance(name, **kw):
+        track_runs.advance(run_id, sum(done_by_client.values()), name,
+                           counters["api_calls"], counters["errors"], **kw)
+
+    def track_one(cl, prods, kws):
+        cid, name = cl["id"], cl["name"]
+        tracking_status[cid] = "running"
+
+        def on_progress(done, total, result):
+            with lock:
+                done_by_client[cid] = done
+                counters["api_calls"] += result.get("api_calls", 0)
+                if result.get("status") == "failed":
+                    # 확인 실패 조합도 오류로 집계 (미발견과 구분해 rank_history 에 status=failed 로 기록)
+                    counters["errors"] += 1
+                    advance(name, last_error=f"{name}: '{result['keyword']}' 확인 실패 ({result['error']})")
+                else:
+                    advance(name)
+            metrics.TRACK_COMBOS.inc(client=name, source=source)
+            metrics.TRACK_API_CALLS.inc(result.get("api_calls", 0), client=name, source=source)
+
+        with lock:
+            advance(name, force=True)
+        try:
+            decide = check_policy.make_decider(cid, hot=hot) if adaptive or hot else None
+            t0 = time.perf_counter()
+            results = track_client(api_id, api_secret, cid, prods, kws, max_pages=10,
+                                   progress=on_progress, decide=decide,
+                                   keys=(lambda: api_keys.get_api_keys("background")) if api_keys.pool_size() else None)
+            elapsed = time.perf_counter() - t0
+            metrics.TRACK_CLIENT_SECONDS.observe(elapsed, client=name, source=source)
+            metrics.TRACK_COMBOS_PER_SEC.set(round(len(prods) * len(kws) / max(elapsed, 1e-6), 3),
+                                             client=name)
+            if not dry_run:
+                save_results(results)
+            with lock:
+                out["results"].extend(results)
+            tracking_status[cid] = "done"
+            failed = sum(1 for r in results if r.get("status") == "failed")
+            logger.info(f"  ✅ {name} 완료 ({len(results)}건"
+                        + (f" | 확인 실패 {failed}건" if failed else "")
+                        + (f" | {decide.counts}" if decide else "") + ")")
+        except Exception as e:
+            tracking_status[cid] = f"error:{e}"
+            with lock:
+                counters["errors"] += 1
+                done_by_client[cid] = len(prods) * len(kws)
+                out["errors"][name] = str(e)
+                advance(name, last_error=f"{name}: {str(e)[:200]}", force=True)
+            logger.error(f"  ❌ {name} 오류: {e}")
+
+    try:
+        if workers > 1 and len(work) > 1:
+            with ThreadPoolExecutor(max_workers=min(workers, len(work))) as ex:
+                list(ex.map(lambda w: track_one(*w), work))
+        else:
+            for w in work:
+                track_one(*w)
+    except Exception as e:
+        out["status"] = "error"
+        logger.exception(f"[추적] 중단: {e}")
+    finally:
+        advance(None, force=True)
+        api_keys.flush()
+        track_runs.finish(run_id, out["status"])
+        metrics.TRACK_RUNS.inc(source=source, status=out["status"])
+    return out
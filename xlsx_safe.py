@@ -0,0 +1,149 @@
+"""
+업로드 XLSX 템플릿 정리 — 스트리밍 방식 조건부 서식 제거
+
+[배경]
+일부 고객 템플릿은 openpyxl이 읽지 못하는 <conditionalFormatting> 요소를 포함함.
+기존 방식은 업로드 전체 + 시트 XML 전체를 메모리에 올린 뒤 정규식으로 치환해서
+큰 템플릿 한 개로도 워커 메모리가 수 배로 튀었음.
+
+[방식]
+- zip 멤버를 청크 단위로 읽어 ConditionalFormattingFilter 에 흘려보냄
+- 필터는 태그 경계가 청크 사이에 걸리는 경우만 대비한 작은 꼬리 버퍼만 유지
+- 결과는 SpooledTemporaryFile 로 바로 기록 (일정 크기 초과 시 디스크로 넘어감)
+"""
+import time
+import zipfile
+import tempfile
+
+CHUNK_SIZE = 64 * 1024              # zip 멤버 읽기 단위
+SPOOL_MAX_SIZE = 8 * 1024 * 1024    # 이 크기까지는 메모리, 초과 시 임시파일
+MAX_START_TAG = 64 * 1024           # 여는 태그 하나의 최대 길이 (비정상 XML 방어)
+
+_CF_OPEN = b"<conditionalFormatting"
+_CF_CLOSE = b"</conditionalFormatting>"
+_NAME_END = (b" ", b"\t", b"\r", b"\n", b">", b"/")
+
+
+class ConditionalFormattingFilter:
+    """워크시트 XML 바이트 스트림에서 <conditionalFormatting> 요소를 제거하는 필터
+
+    feed() 로 청크를 넣으면 안전하게 내보낼 수 있는 바이트만 반환하고,
+    태그가 잘렸을 가능성이 있는 꼬리만 내부 버퍼에 남긴다.
+    마커가 모두 ASCII 이므로 UTF-8 디코딩 없이 바이트 단위로 처리한다.
+    """
+
+    def __init__(self):
+        self._buf = b""
+        self._skipping = False
+        self.removed = 0
+
+    def feed(self, chunk: bytes) -> bytes:
+        buf = self._buf + chunk
+        out = []
+        while True:
+            if self._skipping:
+                i = buf.find(_CF_CLOSE)
+                if i == -1:
+                    # 요소 내부는 버리고, 닫는 태그가 걸쳐 있을 수 있는 꼬리만 보존
+                    buf = buf[-(len(_CF_CLOSE) - 1):]
+                    break
+                buf = buf[i + len(_CF_CLOSE):]
+                self._skipping = False
+                self.removed += 1
+                continue
+
+            i = buf.find(_CF_OPEN)
+            if i == -1:
+                keep = len(_CF_OPEN) - 1
+                if len(buf) > keep:
+                    out.append(buf[:-keep])
+                    buf = buf[-keep:]
+                break
+
+            j = buf.find(b">", i)
+            if j == -1:
+                # 여는 태그가 아직 다 안 들어옴 → 태그 앞까지만 내보내고 대기
+                if len(buf) - i > MAX_START_TAG:
+                    raise ValueError("conditionalFormatting 여는 태그가 비정상적으로 김")
+                out.append(buf[:i])
+                buf = buf[i:]
+                break
+
+            name_end = buf[i + len(_CF_OPEN):i + len(_CF_OPEN) + 1]
+            if name_end not in _NAME_END:
+                # 이름만 비슷한 다른 태그 → 그대로 통과
+                out.append(buf[:i + 1])
+                buf = buf[i + 1:]
+                continue
+
+            out.append(buf[:i])
+            if buf[j - 1:j] == b"/":
+                self.removed += 1          # <conditionalFormatting .../>
+            else:
+                self._skipping = True
+            buf = buf[j + 1:]
+
+        self._buf = buf
+        return b"".join(out)
+
+    def close(self) -> bytes:
+        if self._skipping:
+            raise ValueError("닫히지 않은 conditionalFormatting 요소")
+        rest, self._buf = self._buf, b""
+        return rest
+
+
+def _is_worksheet(name: str) -> bool:
+    return name.startswith("xl/worksheets/") and name.endswith(".xml")
+
+
+def sanitize_xlsx(src, chunk_size: int = CHUNK_SIZE,
+                  spool_max_size: int = SPOOL_MAX_SIZE):
+    """XLSX에서 조건부 서식을 제거한 사본을 스풀 임시파일로 생성
+
+    Args:
+        src: 파일 경로(str) 또는 seek 가능한 바이너리 파일 객체
+             (werkzeug FileStorage.stream 그대로 전달 가능)
+
+    Returns: (spooled_file, stats)
+      spooled_file: 처음 위치로 되감긴 SpooledTemporaryFile (호출측에서 close)
+      stats: {"members", "sheets", "bytes_in", "bytes_out", "removed", "elapsed_ms"}
+    """
+    t0 = time.perf_counter()
+    stats = {"members": 0, "sheets": 0, "bytes_in": 0, "bytes_out": 0, "removed": 0}
+    out = tempfile.SpooledTemporaryFile(max_size=spool_max_size)
+    try:
+        with zipfile.ZipFile(src, "r") as zin, \
+                zipfile.ZipFile(out, "w", zipfile.ZIP_DEFLATED) as zout:
+            for item in zin.infolist():
+                zi = zipfile.ZipInfo(item.filename, item.date_time)
+                zi.compress_type = item.compress_type
+                zi.external_attr = item.external_attr
+                flt = ConditionalFormattingFilter() if _is_worksheet(item.filename) else None
+
+                with zin.open(item, "r") as fin, zout.open(zi, "w") as fout:
+                    while True:
+                        chunk = fin.read(chunk_size)
+                        if not chunk:
+                            break
+                        stats["bytes_in"] += len(chunk)
+                        if flt is not None:
+                            chunk = flt.feed(chunk)
+                        fout.write(chunk)
+                        stats["bytes_out"] += len(chunk)
+                    if flt is not None:
+                        rest = flt.close()
+                        fout.write(rest)
+                        stats["bytes_out"] += len(rest)
+
+                stats["members"] += 1
+                if flt is not None:
+                    stats["sheets"] += 1
+                    stats["removed"] += flt.removed
+    except Exception:
+        out.close()
+        raise
+
+    out.seek(0)
+    stats["elapsed_ms"] = round((time.perf_counter() - t0) * 1000, 1)
+    return out, stats